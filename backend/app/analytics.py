@@ -0,0 +1,313 @@
+"""
+Hiring-funnel analytics kept current from candidate status histories.
+
+Each candidate carries a `status_history` of `[status, seconds since the
+epoch]` pairs, starting with its application; status changes append one
+pair. Funnels count the furthest stage each candidate reached, those
+rejected at each stage and the time from application to selection, per
+job, per department and overall. They are built in one pass on startup
+and then updated from change events, so queries never read candidates.
+"""
+import heapq
+import math
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.events import ChangeEvent, change_feed
+from app.models.candidate import CandidateStatus
+
+# Funnel stages in order; Rejected ends an application at any of them.
+STAGES = [
+    CandidateStatus.APPLIED.value,
+    CandidateStatus.SHORTLISTED.value,
+    CandidateStatus.INTERVIEW.value,
+    CandidateStatus.SELECTED.value,
+]
+_STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+_SELECTED = CandidateStatus.SELECTED.value
+_REJECTED = CandidateStatus.REJECTED.value
+
+# The candidate fields funnels are computed from.
+HISTORY_PROJECTION = {"job_id": 1, "status": 1, "status_history": 1, "applied_at": 1, "updated_at": 1}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def timestamp(value: Optional[datetime]) -> Optional[int]:
+    """Whole seconds since the epoch of a naive UTC or aware datetime."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((value - _EPOCH).total_seconds())
+
+
+def from_timestamp(value: int) -> datetime:
+    return _EPOCH + timedelta(seconds=value)
+
+
+def history_entry(status: str, at: datetime) -> list:
+    return [status, timestamp(at)]
+
+
+def initial_history(status: str, applied_at: datetime, updated_at: Optional[datetime]) -> list:
+    """
+    The history of a candidate that already has a status, such as an
+    imported one: its application, then its status as of `updated_at`.
+    """
+    history = [history_entry(CandidateStatus.APPLIED.value, applied_at)]
+    if status and status != CandidateStatus.APPLIED.value:
+        history.append(history_entry(status, updated_at or applied_at))
+    return history
+
+
+def history_of(candidate: dict) -> list:
+    """A candidate's status history, derived for candidates saved before histories were kept."""
+    history = candidate.get("status_history")
+    if history:
+        return history
+    return initial_history(candidate.get("status"), candidate.get("applied_at"), candidate.get("updated_at"))
+
+
+def summarize(history: list) -> Optional[Tuple[int, bool, Optional[int]]]:
+    """
+    What a history counts for: the index of the furthest stage reached,
+    whether it ends rejected and the seconds from application to the first
+    selection, if any. None for an empty history.
+    """
+    if not history:
+        return None
+    furthest, selected_at = 0, None
+    for status, at in history:
+        index = _STAGE_INDEX.get(status, 0)
+        if index > furthest:
+            furthest = index
+        if status == _SELECTED and selected_at is None:
+            selected_at = at
+    applied_at = history[0][1]
+    duration = None
+    if selected_at is not None and applied_at is not None:
+        duration = max(selected_at - applied_at, 0)
+    return furthest, history[-1][0] == _REJECTED, duration
+
+
+class Funnel:
+    """Stage counts and selection times of a group of candidates."""
+    __slots__ = ("reached", "rejected", "durations")
+
+    def __init__(self):
+        # Candidates who got at least as far as each stage.
+        self.reached = [0] * len(STAGES)
+        # Candidates rejected after getting as far as each stage.
+        self.rejected = [0] * len(STAGES)
+        # Seconds from application to selection, sorted.
+        self.durations = []
+
+    @property
+    def total(self) -> int:
+        return self.reached[0]
+
+    def add(self, summary, sign: int = 1):
+        """Count a candidate in (sign 1) or out (sign -1) of the funnel."""
+        furthest, rejected, duration = summary
+        for index in range(furthest + 1):
+            self.reached[index] += sign
+        if rejected:
+            self.rejected[furthest] += sign
+        if duration is not None:
+            if sign > 0:
+                insort(self.durations, duration)
+            else:
+                index = bisect_left(self.durations, duration)
+                if index < len(self.durations) and self.durations[index] == duration:
+                    del self.durations[index]
+
+    def merge(self, other: "Funnel", sign: int = 1):
+        """Add (sign 1) or remove (sign -1) the candidates of another funnel."""
+        for index in range(len(STAGES)):
+            self.reached[index] += sign * other.reached[index]
+            self.rejected[index] += sign * other.rejected[index]
+        if sign > 0:
+            self.durations = list(heapq.merge(self.durations, other.durations))
+        else:
+            removed = Counter(other.durations)
+            kept = []
+            for duration in self.durations:
+                if removed[duration] > 0:
+                    removed[duration] -= 1
+                else:
+                    kept.append(duration)
+            self.durations = kept
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """Nearest-rank percentile of the selection times, in seconds."""
+        if not self.durations:
+            return None
+        rank = max(math.ceil(fraction * len(self.durations)), 1)
+        return self.durations[rank - 1]
+
+
+def _combined(funnels: Iterable[Funnel]) -> Funnel:
+    combined = Funnel()
+    durations = []
+    for funnel in funnels:
+        for index in range(len(STAGES)):
+            combined.reached[index] += funnel.reached[index]
+            combined.rejected[index] += funnel.rejected[index]
+        durations.extend(funnel.durations)
+    durations.sort()
+    combined.durations = durations
+    return combined
+
+
+class FunnelIndex:
+    """
+    Funnels per job, per department and overall.
+
+    A status change appends exactly one history entry, so an update event
+    carrying a history counts the candidate out as of the history without
+    its last entry and back in as of the whole history.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.overall = Funnel()
+        self._jobs: Dict[str, Funnel] = {}
+        self._departments: Dict[str, Funnel] = {}
+        self._job_departments: Dict[str, str] = {}
+
+    def funnel(self, job_id: Optional[str] = None, department: Optional[str] = None) -> Funnel:
+        """The funnel of a job, of a department or, by default, of all candidates."""
+        if job_id is not None:
+            return self._jobs.get(job_id) or Funnel()
+        if department is not None:
+            return self._departments.get(department) or Funnel()
+        return self.overall
+
+    def departments(self) -> Dict[str, Funnel]:
+        return {name: funnel for name, funnel in sorted(self._departments.items()) if funnel.total}
+
+    def _add(self, job_id: Optional[str], summary, sign: int):
+        if summary is None:
+            return
+        self.overall.add(summary, sign)
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = Funnel()
+        job.add(summary, sign)
+        department = self._job_departments.get(job_id)
+        if department is not None:
+            self._department(department).add(summary, sign)
+
+    def _department(self, name: str) -> Funnel:
+        funnel = self._departments.get(name)
+        if funnel is None:
+            funnel = self._departments[name] = Funnel()
+        return funnel
+
+    def _set_department(self, job_id: str, department: Optional[str]):
+        previous = self._job_departments.get(job_id)
+        if previous == department:
+            return
+        job = self._jobs.get(job_id)
+        if job is not None and previous is not None:
+            self._department(previous).merge(job, -1)
+        if department is None:
+            self._job_departments.pop(job_id, None)
+            return
+        self._job_departments[job_id] = department
+        if job is not None:
+            self._department(department).merge(job)
+
+    def apply(self, event: ChangeEvent, doc: dict):
+        """Account for a change published by the storage layer."""
+        if event.collection == "jobs":
+            # A deleted job keeps its department until its candidates are gone.
+            if event.op == "insert":
+                self._set_department(event.id, doc.get("department"))
+            elif event.op == "update" and "department" in event.data:
+                self._set_department(event.id, event.data["department"])
+            return
+        if event.collection != "candidates":
+            return
+        if event.op == "insert":
+            self._add(event.job_id, summarize(history_of(doc)), 1)
+        elif event.op == "delete":
+            self._add(event.job_id, summarize(history_of(doc)), -1)
+        elif "status_history" in event.data:
+            history = event.data["status_history"]
+            self._add(event.job_id, summarize(history[:-1]), -1)
+            self._add(event.job_id, summarize(history), 1)
+
+    def load(self, departments: Dict[str, Optional[str]], jobs: Dict[str, Funnel]):
+        """Replace every funnel with per-job funnels computed in bulk."""
+        by_department = defaultdict(list)
+        for job_id, funnel in jobs.items():
+            if departments.get(job_id) is not None:
+                by_department[departments[job_id]].append(funnel)
+        self._jobs = dict(jobs)
+        self._job_departments = {job_id: name for job_id, name in departments.items() if name is not None}
+        self._departments = {name: _combined(funnels) for name, funnels in by_department.items()}
+        self.overall = _combined(jobs.values())
+
+
+class FunnelTally:
+    """
+    Per-job funnels computed in bulk, for startup and backfills.
+
+    Candidates are tallied by job, furthest stage and rejection; the stage
+    counts are then accumulated once per job and the selection times sorted
+    once per job, rather than updating funnels candidate by candidate.
+    """
+    def __init__(self):
+        self.count = 0
+        self._tally = Counter()
+        self._durations = defaultdict(list)
+
+    def add(self, candidate: dict):
+        summary = summarize(history_of(candidate))
+        if summary is None:
+            return
+        self.count += 1
+        furthest, rejected, duration = summary
+        job_id = candidate.get("job_id")
+        self._tally[job_id, furthest, rejected] += 1
+        if duration is not None:
+            self._durations[job_id].append(duration)
+
+    def funnels(self) -> Dict[str, Funnel]:
+        jobs = defaultdict(Funnel)
+        for (job_id, furthest, rejected), count in self._tally.items():
+            funnel = jobs[job_id]
+            funnel.reached[furthest] += count
+            if rejected:
+                funnel.rejected[furthest] += count
+        for job_id, funnel in jobs.items():
+            # Reaching a stage means reaching every earlier one.
+            for index in range(len(STAGES) - 2, -1, -1):
+                funnel.reached[index] += funnel.reached[index + 1]
+            funnel.durations = sorted(self._durations.get(job_id, ()))
+        return dict(jobs)
+
+
+funnel_index = FunnelIndex()
+change_feed.listeners.append(funnel_index.apply)
+
+
+async def build_funnels(db) -> int:
+    """
+    Rebuild every funnel from the database in one pass over the candidates.
+
+    Changes made while the candidates are read may be missed or counted
+    twice, so backfills are best run while the data is idle. Returns the
+    number of candidates read.
+    """
+    departments = {str(job["_id"]): job.get("department") async for job in db.jobs.find({}, {"department": 1})}
+    tally = FunnelTally()
+    async for candidate in db.candidates.find({}, HISTORY_PROJECTION):
+        tally.add(candidate)
+    funnel_index.load(departments, tally.funnels())
+    return tally.count
@@ -0,0 +1,72 @@
+"""Serialized response caching with ETags for read-heavy endpoints."""
+import hashlib
+from collections import OrderedDict
+
+from fastapi import Request, Response, status
+
+from app.config import RESPONSE_CACHE_SIZE
+
+
+class CachedResponse:
+    """Pre-serialized JSON body with its strong ETag and extra headers."""
+    def __init__(self, body: bytes, headers: dict = None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.headers = headers or {}
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses tied to a collection's version.
+
+    Every write to the collection bumps its version; the first lookup that
+    sees a new version drops all entries, so a cached body is never served
+    for data that has changed since it was built. A None version, for
+    backends whose writes cannot all be seen, disables caching.
+    """
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+
+    def get(self, version, key):
+        if version is None:
+            return None
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def clear(self):
+        self.version = None
+        self._entries.clear()
+
+    def put(self, version, key, entry):
+        # Skip bodies built while the collection was changing underneath.
+        if version is None or version != self.version or self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header matches the ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def cached_response(request: Request, entry: CachedResponse) -> Response:
+    """Serve a cached body, or 304 Not Modified if the client already has it."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
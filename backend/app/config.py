@@ -4,5 +4,88 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Directory holding data.json, data.wal and data.db for the local backends.
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), ".."))
+
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "hr_management")
+
+# Storage backend: "memory" for the JSON-file backed in-memory database used
+# in development and tests, "sqlite" for a single SQLite file, or "mongodb"
+# for a MongoDB server at MONGODB_URL.
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "memory")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(DATA_DIR, "data.db"))
+SQLITE_WORKERS = int(os.getenv("SQLITE_WORKERS", "4"))
+
+# Persistence mode for the in-memory database: "json" rewrites data.json on
+# every change, "wal" appends each change to a log that is compacted into
+# data.json in the background, and "background" coalesces changes into
+# periodic data.json rewrites from a background task. "shared" is "wal" for
+# several server processes (uvicorn --workers): writes are appended under a
+# file lock and every worker follows the log, at the latest every
+# FOLLOW_INTERVAL_MS milliseconds and before each query.
+PERSISTENCE_MODE = os.getenv("PERSISTENCE_MODE", "json")
+WAL_FSYNC = os.getenv("WAL_FSYNC", "true").lower() == "true"
+WAL_COMPACT_THRESHOLD = int(os.getenv("WAL_COMPACT_THRESHOLD", "1000"))
+WAL_COMPACT_INTERVAL = float(os.getenv("WAL_COMPACT_INTERVAL", "30"))
+FLUSH_INTERVAL_MS = int(os.getenv("FLUSH_INTERVAL_MS", "200"))
+FLUSH_MAX_PENDING = int(os.getenv("FLUSH_MAX_PENDING", "100"))
+FOLLOW_INTERVAL_MS = int(os.getenv("FOLLOW_INTERVAL_MS", "100"))
+# Store in-memory documents as compact slot-based records instead of dicts:
+# smaller at large sizes, slightly slower to read field by field.
+COMPACT_RECORDS = os.getenv("COMPACT_RECORDS", "false").lower() == "true"
+
+# Resume uploads are streamed to disk in chunks and rejected once they
+# exceed the maximum size.
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads/resumes")
+MAX_RESUME_SIZE = int(os.getenv("MAX_RESUME_SIZE", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+# Resumes are stored once per distinct content. Files no candidate refers
+# to are swept every RESUME_GC_INTERVAL seconds (0 disables the sweep) once
+# they are older than RESUME_GC_GRACE seconds.
+RESUME_GC_INTERVAL = int(os.getenv("RESUME_GC_INTERVAL", "0"))
+RESUME_GC_GRACE = int(os.getenv("RESUME_GC_GRACE", "3600"))
+
+# Deleting a job removes its candidates in the background, DELETE_CHUNK_SIZE
+# at a time with one persistence write per chunk.
+DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", "500"))
+
+# Bulk imports read and validate IMPORT_BATCH_SIZE rows at a time and save
+# each batch with one persistence write; the first IMPORT_MAX_ERRORS failed
+# rows are reported.
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "10000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# Resume post-processing after an application: RESUME_WORKERS concurrent
+# resumes (0 disables processing), checksums and text extraction in a pool
+# of RESUME_PROCESSES processes (0 uses threads), failed attempts retried up
+# to RESUME_MAX_ATTEMPTS times. RESUME_SCAN_COMMAND, such as
+# "clamscan --no-summary", is run with the file path as a virus scan.
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", "2"))
+RESUME_PROCESSES = int(os.getenv("RESUME_PROCESSES", "1"))
+RESUME_MAX_ATTEMPTS = int(os.getenv("RESUME_MAX_ATTEMPTS", "3"))
+RESUME_SCAN_COMMAND = os.getenv("RESUME_SCAN_COMMAND", "")
+
+# Change events for GET /api/events: the last EVENTS_BUFFER_SIZE are kept for
+# reconnecting clients to resume from, each subscriber may fall up to
+# EVENTS_QUEUE_SIZE events behind before it is disconnected, and idle
+# streams get a comment every EVENTS_HEARTBEAT seconds.
+EVENTS_BUFFER_SIZE = int(os.getenv("EVENTS_BUFFER_SIZE", "1000"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+# Instrumentation: METRICS_ENABLED records request, storage and upload
+# metrics served at /metrics; SERVER_TIMING adds per-stage timings to every
+# response's Server-Timing header.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Encode list responses and persisted data with orjson (or compact stdlib
+# json if it is not installed), skipping response-model validation of
+# documents that are already in response shape.
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+# Maximum number of serialized job responses kept per collection version;
+# 0 disables the cache. ETags and conditional requests work either way.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
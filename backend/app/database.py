@@ -1,52 +1,465 @@
 """In-memory database for HR Management System."""
+import asyncio
+import heapq
+import itertools
 import json
 import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
-DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "data.json")
+from app.config import (
+    DATA_DIR,
+    DATABASE_BACKEND,
+    DATABASE_NAME,
+    MONGODB_URL,
+    MONGODB_MAX_POOL_SIZE,
+    SQLITE_PATH,
+    SQLITE_WORKERS,
+    PERSISTENCE_MODE,
+    WAL_FSYNC,
+    WAL_COMPACT_THRESHOLD,
+    WAL_COMPACT_INTERVAL,
+    FLUSH_INTERVAL_MS,
+    FLUSH_MAX_PENDING,
+    FOLLOW_INTERVAL_MS,
+    COMPACT_RECORDS,
+    FAST_JSON,
+)
+from app import metrics
+from app.events import change_feed
+from app.indexes import HashIndex, CountIndex, SortedIndex
+from app.query import matches, sort_key, sort_spec, update_fields
+from app.records import record_type
+from app.serialization import dumps, loads
+from app.wal import WriteAheadLog, SharedLog, lock_file, write_snapshot
 
-# In-memory storage
+DATA_FILE = os.path.join(DATA_DIR, "data.json")
+WAL_FILE = os.path.join(DATA_DIR, "data.wal")
+# Held shared by every worker in PERSISTENCE_MODE=shared and exclusively
+# otherwise, so a single-process mode never runs on data in use elsewhere.
+LOCK_FILE = os.path.join(DATA_DIR, "data.lock")
+# Held by the one shared-mode worker that compacts the log and runs
+# startup recovery and periodic maintenance.
+LEADER_FILE = os.path.join(DATA_DIR, "leader.lock")
+SHARED = PERSISTENCE_MODE == "shared"
+
+# In-memory storage: collection name -> {str(_id): document}
 _data = {
-    "jobs": [],
-    "candidates": []
+    "jobs": {},
+    "candidates": {},
+    "operations": {}
 }
 
 
+_wal = None
+_background_task = None
+_flush_lock = asyncio.Lock()
+_data_lock = None
+_leader_lock = None
+_follow_task = None
+# The fsync of the write-ahead log in progress, shared by waiting writers.
+_sync_task = None
+# Orders this process's writers before they take the shared log's lock.
+_write_mutex = asyncio.Lock()
+
+# Callables taking a change record written by another process and the
+# stored document it produced (None for deletes), called once it has been
+# applied. Used in PERSISTENCE_MODE=shared to keep in-process state, such
+# as the search index, in step with other workers.
+remote_listeners = []
+
+# Background persistence state: number of unsaved changes, set when any are
+# pending, and set when enough are pending to flush without waiting.
+_pending_changes = 0
+_dirty = asyncio.Event()
+_flush_now = asyncio.Event()
+
+
+def _restore_types(doc):
+    """Turn timestamps serialized as strings back into datetimes."""
+    for key, value in doc.items():
+        if key.endswith("_at") and isinstance(value, str):
+            try:
+                doc[key] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return doc
+
+
 def _load_data():
-    """Load data from JSON file if exists."""
+    """
+    Load data from JSON file if exists.
+
+    Refuses to start on a file that cannot be read, rather than starting
+    empty and overwriting it at the next save.
+    """
     global _data
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                _data = json.load(f)
-        except:
-            pass
+    if not os.path.exists(DATA_FILE):
+        return 0
+    try:
+        with open(DATA_FILE, 'rb') as f:
+            loaded = loads(f.read()) if FAST_JSON else json.load(f)
+        seq = loaded.pop("_wal_seq", 0)
+        data = {
+            name: {str(doc["_id"]): _stored(name, _restore_types(doc)) for doc in docs}
+            for name, docs in loaded.items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise RuntimeError(
+            f"Cannot load {DATA_FILE}: {exc!r}; restore it from a backup "
+            "or move it aside to start with an empty database"
+        ) from exc
+    _data = data
+    # Collections added since the file was written start out empty.
+    for collection in db.collections:
+        _data.setdefault(collection.name, {})
+    return seq
+
+
+def _stored(name, doc):
+    """Convert a loaded document to the form its collection stores."""
+    collection = getattr(db, name, None)
+    return doc if collection is None else collection._stored(doc)
+
+
+def _serialize():
+    """Return the stored documents as lists, the on-disk format."""
+    if COMPACT_RECORDS:
+        # Records are mappings but not dicts, which json needs.
+        return {name: [dict(doc) for doc in docs.values()] for name, docs in _data.items()}
+    return {name: list(docs.values()) for name, docs in _data.items()}
 
 
 def _save_data():
     """Save data to JSON file."""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(_data, f, indent=2, default=str)
+    started = time.perf_counter()
+    if FAST_JSON:
+        payload = dumps(_serialize())
+    else:
+        payload = json.dumps(_serialize(), indent=2, default=str).encode()
+    # Written aside and renamed, so a crash mid-write leaves the old file.
+    tmp_path = f"{DATA_FILE}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, DATA_FILE)
+    if metrics.enabled:
+        metrics.record_persist("json", started, len(payload))
+
+
+def _persist(record):
+    """Persist a single mutation using the configured persistence mode."""
+    global _pending_changes
+    if _wal is not None:
+        started = time.perf_counter()
+        size = _wal.append(record)
+        if metrics.enabled:
+            metrics.record_persist("wal", started, size)
+    elif PERSISTENCE_MODE == "background":
+        _pending_changes += 1
+        _dirty.set()
+        if _pending_changes >= FLUSH_MAX_PENDING:
+            _flush_now.set()
+    else:
+        _save_data()
+
+
+def _apply_record(record, notify=False, deferred=None):
+    """Apply a replayed log record to the in-memory data."""
+    if record["op"] == "batch":
+        items = record["records"]
+        if not all(item["op"] == "insert" for item in items):
+            for item in items:
+                _apply_record(item, notify)
+            return
+        # Inserted documents join the sorted indexes together.
+        deferred = {}
+        try:
+            for item in items:
+                _apply_record(item, notify, deferred)
+        finally:
+            for name, added in deferred.items():
+                getattr(db, name)._add_sorted(added)
+        return
+    collection = getattr(db, record["collection"])
+    docs = _data[record["collection"]]
+    if record["op"] == "insert":
+        doc = _restore_types(record["doc"])
+        collection._insert(doc, None if deferred is None else deferred.setdefault(collection.name, []))
+    elif record["op"] == "update":
+        doc = docs.get(record["_id"])
+        if doc is not None:
+            collection._update(doc, _restore_types(record["set"]))
+    elif record["op"] == "delete":
+        doc = docs.get(record["_id"])
+        if doc is not None:
+            collection._remove(doc)
+    if notify and doc is not None:
+        change_feed.publish(collection.name, record["op"], doc, record.get("set"))
+        stored = docs.get(str(doc["_id"]))
+        for listener in remote_listeners:
+            try:
+                listener(record, stored)
+            except Exception as exc:
+                print(f"Change listener failed: {exc}")
+
+
+def _follow():
+    """Apply the records other workers appended to the shared log."""
+    if SHARED and _wal is not None and _wal.changed():
+        for record in _wal.read_new():
+            _apply_record(record, notify=True)
+
+
+async def _follow_loop():
+    """Pick up other workers' changes even while this one is idle."""
+    while True:
+        await asyncio.sleep(FOLLOW_INTERVAL_MS / 1000)
+        try:
+            _follow()
+        except Exception as exc:
+            print(f"Following the shared log failed: {exc}")
+
+
+async def _lock_shared_log():
+    if _wal.lock(blocking=False):
+        return
+    acquired = asyncio.ensure_future(asyncio.to_thread(_wal.lock))
+    try:
+        await asyncio.shield(acquired)
+    except asyncio.CancelledError:
+        # The thread takes the lock regardless; hand it back before leaving.
+        await acquired
+        _wal.unlock()
+        raise
+
+
+async def _sync_log():
+    """fsync the log in a worker thread, covering every record appended so far."""
+    global _sync_task
+    wal, seq = _wal, _wal.seq
+    # A descriptor of its own, so the log can rotate meanwhile.
+    fd = wal.duplicate()
+    try:
+        await asyncio.to_thread(os.fsync, fd)
+        wal.synced = max(wal.synced, seq)
+    finally:
+        os.close(fd)
+        _sync_task = None
+
+
+async def _commit(seq):
+    """
+    Wait until the log is on disk up to record `seq`.
+
+    Writers arriving while an fsync runs share the next one (group commit),
+    so a burst of writes costs a couple of fsyncs rather than one each and
+    the event loop never blocks on the disk.
+    """
+    global _sync_task
+    while _wal is not None and _wal.fsync and _wal.synced < seq:
+        if _sync_task is None:
+            _sync_task = asyncio.ensure_future(_sync_log())
+        await asyncio.shield(_sync_task)
+
+
+@asynccontextmanager
+async def _writing():
+    """
+    Hold the shared log's writer lock, caught up with other workers, then
+    wait until the records the body logged are durable.
+
+    The lock is only taken with PERSISTENCE_MODE=shared. The body must not
+    await, so the lock is never held while other coroutines run; the wait
+    for the disk comes after it is released.
+    """
+    if _wal is None:
+        yield
+        return
+    seq = None
+    try:
+        if SHARED:
+            async with _write_mutex:
+                await _lock_shared_log()
+                try:
+                    for record in _wal.read_new(repair=True):
+                        _apply_record(record, notify=True)
+                    seq = _wal.seq
+                    yield
+                finally:
+                    _wal.unlock()
+        else:
+            seq = _wal.seq
+            yield
+    finally:
+        if seq is not None and _wal is not None and _wal.seq > seq:
+            await _commit(_wal.seq)
+
+
+def _snapshot(seq):
+    """Copy the current data for writing as a snapshot covering `seq`."""
+    snapshot = {
+        name: [dict(doc) for doc in docs.values()] for name, docs in _data.items()
+    }
+    snapshot["_wal_seq"] = seq
+    return snapshot
+
+
+async def _compact():
+    """Fold the write-ahead log into a fresh data.json snapshot."""
+    async with _flush_lock:
+        started = time.perf_counter()
+        # Other workers keep writing while the snapshot is encoded; they
+        # only wait for the rotation and for discarding the old segment.
+        async with _writing():
+            seq = _wal.rotate()
+            snapshot = _snapshot(seq)
+        size = await asyncio.to_thread(write_snapshot, DATA_FILE, snapshot)
+        async with _writing():
+            _wal.discard_rotated()
+        if metrics.enabled:
+            metrics.record_persist("snapshot", started, size)
+
+
+async def _compaction_loop():
+    """Periodically compact the log once enough records have accumulated."""
+    while True:
+        await asyncio.sleep(WAL_COMPACT_INTERVAL)
+        if _wal.pending >= WAL_COMPACT_THRESHOLD:
+            # Shielded so shutdown never interrupts a snapshot mid-write.
+            await asyncio.shield(_compact())
+
+
+async def _write_pending():
+    """Write data.json if there are unsaved changes (background mode)."""
+    global _pending_changes
+    async with _flush_lock:
+        if not _pending_changes:
+            return
+        _pending_changes = 0
+        _dirty.clear()
+        _flush_now.clear()
+        # Documents are copied on the event loop; only encoding and disk
+        # I/O run in the worker thread.
+        started = time.perf_counter()
+        size = await asyncio.to_thread(write_snapshot, DATA_FILE, _snapshot(0))
+        if metrics.enabled:
+            metrics.record_persist("background", started, size)
+
+
+async def _writer_loop():
+    """Coalesce bursts of changes into a single data.json write."""
+    while True:
+        await _dirty.wait()
+        try:
+            await asyncio.wait_for(_flush_now.wait(), FLUSH_INTERVAL_MS / 1000)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.shield(_write_pending())
+
+
+async def flush():
+    """Make every change so far durable on disk."""
+    if _active_db is not db:
+        # MongoDB and SQLite make each write durable themselves.
+        return
+    if _wal is not None:
+        # In shared mode the other workers' writes are already in the log.
+        if is_leader():
+            await _compact()
+    elif PERSISTENCE_MODE == "background":
+        await _write_pending()
 
 
 class AsyncCursor:
-    """Async cursor for iterating over results."""
-    def __init__(self, data):
-        self._data = data
-        self._sort_key = None
-        self._sort_order = 1
+    """
+    Async cursor for iterating over results.
+    
+    The query runs when iteration starts. A query sorted on a field with a
+    sorted index walks that index in order, stopping once a limited page is
+    full, unless the planner finds a source that is selective enough for
+    filtering first and then sorting or picking the top documents to be
+    cheaper.
+    """
+    def __init__(self, collection, query):
+        self._collection = collection
+        self._query = query
+        self._sort = []
+        self._skip = 0
+        self._limit = None
+        self._after = None
     
     def sort(self, key, order=1):
-        self._sort_key = key
-        self._sort_order = order
+        """Sort by a field, or by a list of (field, order) pairs."""
+        self._sort = sort_spec(key, order)
         return self
     
+    def skip(self, count):
+        self._skip = count
+        return self
+    
+    def limit(self, count):
+        # Like MongoDB, a limit of 0 means no limit.
+        self._limit = count or None
+        return self
+    
+    def start_after(self, values, doc_id):
+        """Resume after the document with these sort values and id (keyset paging)."""
+        values = list(values) if isinstance(values, (list, tuple)) else [values]
+        if len(values) != len(self._sort):
+            raise ValueError("Cursor does not match the sort order")
+        self._after = (values, str(doc_id))
+        return self
+    
+    def position(self, doc):
+        """The keyset position of a document, for `start_after`."""
+        return [doc.get(field, "") for field, _ in self._sort], str(doc["_id"])
+    
+    def _key(self, doc):
+        return sort_key(self._sort, [doc.get(field, "") for field, _ in self._sort], str(doc["_id"]))
+    
+    def _results(self):
+        _follow()
+        started = time.perf_counter()
+        descending = bool(self._sort) and self._sort[0][1] == -1
+        end = None if self._limit is None else self._skip + self._limit
+        
+        ordered = self._collection._ordered_scan(self._query, self._sort, self._after, end)
+        if ordered is not None:
+            data, examined = [], 0
+            for doc in ordered:
+                examined += 1
+                if self._collection._matches(doc, self._query):
+                    data.append(doc)
+                    if len(data) == end:
+                        break
+        else:
+            data, examined = self._collection._select(self._query)
+            if self._after is not None:
+                after = sort_key(self._sort, *self._after)
+                if descending:
+                    data = [doc for doc in data if self._key(doc) < after]
+                else:
+                    data = [doc for doc in data if self._key(doc) > after]
+            if self._sort or self._after is not None:
+                if end is not None:
+                    # Top-k selection: O(n log k) instead of sorting everything.
+                    select = heapq.nlargest if descending else heapq.nsmallest
+                    data = select(end, data, key=self._key)
+                else:
+                    data = sorted(data, key=self._key, reverse=descending)
+            else:
+                data = list(itertools.islice(data, end))
+        
+        data = data[self._skip:end]
+        if metrics.enabled:
+            metrics.record_db(self._collection.name, "find", started, examined, len(data))
+        return data
+    
     def __aiter__(self):
-        data = self._data.copy()
-        if self._sort_key:
-            data.sort(key=lambda x: x.get(self._sort_key, ""), reverse=(self._sort_order == -1))
-        self._iter_data = iter(data)
+        self._iter_data = iter(self._results())
         return self
     
     async def __anext__(self):
@@ -61,64 +474,355 @@ class InsertResult:
         self.inserted_id = inserted_id
 
 
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
 class UpdateResult:
     def __init__(self, modified_count):
         self.modified_count = modified_count
 
 
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
 class Collection:
     """Simulated MongoDB collection."""
     def __init__(self, name):
         self.name = name
+        # Bumped on every change so response caches can tell when they are stale.
+        self.version = 0
+        self.record_type = None
+        self._indexes = []
+        self._counters = []
     
-    async def insert_one(self, document):
-        doc = document.copy()
-        doc["_id"] = ObjectId()
-        _data[self.name].append(doc)
-        _save_data()
-        return InsertResult(doc["_id"])
+    async def cache_version(self):
+        """The version response caches are keyed on, after catching up with other workers."""
+        _follow()
+        return self.version
+    
+    def store_as(self, record_type):
+        """
+        Store documents as compact records of the given `Record` type.
+        
+        Must be called before any sorted index is created.
+        """
+        self.record_type = record_type
+    
+    def _stored(self, doc):
+        return doc if self.record_type is None else self.record_type(doc)
+    
+    def _build(self, index):
+        index.load(_data[self.name].items())
+        return index
+    
+    def create_index(self, keys, unique=False):
+        """Declare a hash index on a field or a list of fields."""
+        fields = [keys] if isinstance(keys, str) else list(keys)
+        self._indexes.append(self._build(HashIndex(fields, unique=unique)))
+        return "_".join(fields)
+    
+    def create_sorted_index(self, field):
+        """Declare an ordered index on a field for range queries and sorts."""
+        self._indexes.append(self._build(SortedIndex(field, self.record_type)))
+        return field
+    
+    def create_counter(self, keys):
+        """Maintain document counts grouped by a field or a list of fields."""
+        fields = [keys] if isinstance(keys, str) else list(keys)
+        self._counters.append(self._build(CountIndex(fields)))
+    
+    def rebuild_indexes(self):
+        """Rebuild every index and counter from the stored documents."""
+        for index in self._indexes + self._counters:
+            index.clear()
+            self._build(index)
+    
+    def check_counters(self):
+        """
+        Recount from scratch and repair any counter that has drifted.
+        
+        Returns the field groups whose counters were inconsistent.
+        """
+        drifted = []
+        for i, counter in enumerate(self._counters):
+            fresh = self._build(CountIndex(counter.fields))
+            if fresh.counts != counter.counts:
+                self._counters[i] = fresh
+                drifted.append(counter.fields)
+        return drifted
     
-    async def find_one(self, query):
-        for doc in _data[self.name]:
+    def _check_unique(self, doc_id, doc):
+        for index in self._indexes:
+            if index.conflicts(doc_id, doc):
+                raise DuplicateKeyError(
+                    f"Duplicate key for unique index {self.name}.{'_'.join(index.fields)}"
+                )
+    
+    def _insert(self, doc, deferred=None):
+        """
+        Store a new document and index it.
+        
+        With a `deferred` list, the document is appended to it instead of
+        being added to the sorted indexes; pass the list to `_add_sorted`
+        before the collection is queried again.
+        """
+        doc_id = str(doc["_id"])
+        self._check_unique(doc_id, doc)
+        doc = self._stored(doc)
+        _data[self.name][doc_id] = doc
+        for index in self._indexes + self._counters:
+            if deferred is None or not isinstance(index, SortedIndex):
+                index.add(doc_id, doc)
+        if deferred is not None:
+            deferred.append((doc_id, doc))
+        self.version += 1
+    
+    def _add_sorted(self, items):
+        """Add (id, document) pairs deferred by `_insert` to the sorted indexes."""
+        for index in self._indexes:
+            if isinstance(index, SortedIndex):
+                index.add_many(items)
+    
+    def _update(self, doc, fields):
+        doc_id = str(doc["_id"])
+        affected = [
+            i for i in self._indexes + self._counters
+            if any(f in fields for f in i.fields)
+        ]
+        if any(getattr(i, "unique", False) for i in affected):
+            self._check_unique(doc_id, {**doc, **fields})
+        for index in affected:
+            index.remove(doc_id, doc)
+        doc.update(fields)
+        for index in affected:
+            index.add(doc_id, doc)
+        self.version += 1
+    
+    def _remove(self, doc):
+        doc_id = str(doc["_id"])
+        del _data[self.name][doc_id]
+        for index in self._indexes + self._counters:
+            index.remove(doc_id, doc)
+        self.version += 1
+    
+    def _plan(self, query):
+        """
+        Pick the cheapest source of documents that may match the query.
+        
+        Returns the documents and how many there are. Hash and sorted
+        indexes report the size of their match up front, so the smallest
+        one wins.
+        """
+        docs = _data[self.name]
+        if not query:
+            return docs.values(), len(docs)
+        if "_id" in query:
+            value = query["_id"]
+            if not isinstance(value, dict):
+                doc = docs.get(str(value))
+                return ([doc], 1) if doc is not None else ([], 0)
+            if "$in" in value:
+                ids = dict.fromkeys(str(v) for v in value["$in"])
+                found = [docs[doc_id] for doc_id in ids if doc_id in docs]
+                return found, len(found)
+        best, best_size = None, len(docs)
+        for index in self._indexes:
+            if index.covers(query):
+                size = index.size(query)
+                if size < best_size or (size == best_size and best is not None
+                                        and len(index.fields) > len(best.fields)):
+                    best, best_size = index, size
+        if best is None:
+            return docs.values(), len(docs)
+        return best.lookup(query), best_size
+    
+    def _candidates(self, query):
+        return self._plan(query)[0]
+    
+    def _ordered_scan(self, query, sort, after, end):
+        """
+        Documents in sort order from a sorted index, or None if filtering
+        first is expected to be cheaper.
+        
+        Walking the index finds about `end * n / matches` documents before
+        the page is full, where the best filtering source costs its size.
+        Without a limit the whole range is walked, which is worth it when
+        no smaller source exists, since the sort is skipped.
+        """
+        if len(sort) != 1:
+            return None
+        field, order = sort[0]
+        index = next(
+            (i for i in self._indexes if isinstance(i, SortedIndex) and i.field == field and i.complete),
+            None
+        )
+        if index is None:
+            return None
+        condition = query[field] if index.covers(query) else None
+        scan_size = len(_data[self.name]) if condition is None else index.size(query)
+        _, best_size = self._plan(query)
+        if best_size < scan_size and (end is None or end * scan_size > best_size * best_size):
+            return None
+        keyset = None
+        if after is not None:
+            values, doc_id = after
+            keyset = (values[0], doc_id)
+        return index.scan(condition, order == -1, keyset)
+    
+    def _first_match(self, query):
+        """Return the first matching document and how many were examined."""
+        examined = 0
+        for doc in self._candidates(query):
+            examined += 1
             if self._matches(doc, query):
-                return doc
-        return None
+                return doc, examined
+        return None, examined
+    
+    def _select(self, query):
+        """Return every matching document and how many were examined."""
+        candidates, size = self._plan(query)
+        return [doc for doc in candidates if self._matches(doc, query)], size
+    
+    async def insert_one(self, document):
+        async with _writing():
+            started = time.perf_counter()
+            doc = document.copy()
+            doc["_id"] = ObjectId()
+            self._insert(doc)
+            change_feed.publish(self.name, "insert", doc)
+            if metrics.enabled:
+                metrics.record_db(self.name, "insert_one", started, 0, 1)
+            _persist({"op": "insert", "collection": self.name, "doc": doc})
+            return InsertResult(doc["_id"])
+    
+    async def insert_many(self, documents):
+        """Insert several documents with a single persistence write."""
+        async with _writing():
+            started = time.perf_counter()
+            records = []
+            added = []
+            try:
+                for document in documents:
+                    doc = document.copy()
+                    doc["_id"] = ObjectId()
+                    self._insert(doc, added)
+                    change_feed.publish(self.name, "insert", doc)
+                    records.append({"op": "insert", "collection": self.name, "doc": doc})
+            except DuplicateKeyError as e:
+                # Raised as by pymongo, with the ids of the documents stored.
+                raise BulkWriteError({
+                    "nInserted": len(records),
+                    "insertedIds": [record["doc"]["_id"] for record in records],
+                    "writeErrors": [{"index": len(records), "code": 11000, "errmsg": str(e)}]
+                }) from e
+            finally:
+                self._add_sorted(added)
+                # Like an ordered MongoDB insert, documents before a failure stay.
+                if metrics.enabled:
+                    metrics.record_db(self.name, "insert_many", started, 0, len(records))
+                if records:
+                    _persist({"op": "batch", "records": records})
+            return InsertManyResult([record["doc"]["_id"] for record in records])
     
-    def find(self, query=None):
-        if query is None:
-            return AsyncCursor(_data[self.name])
-        results = [doc for doc in _data[self.name] if self._matches(doc, query)]
-        return AsyncCursor(results)
+    # Documents are served straight from memory, so projections are accepted
+    # for interface compatibility but the full document is returned.
+    async def find_one(self, query, projection=None):
+        _follow()
+        started = time.perf_counter()
+        doc, examined = self._first_match(query)
+        if metrics.enabled:
+            metrics.record_db(self.name, "find_one", started, examined, int(doc is not None))
+        return doc
+    
+    def find(self, query=None, projection=None):
+        return AsyncCursor(self, query or {})
+    
+    async def count_documents(self, query):
+        """Count matching documents, answering from counters when possible."""
+        _follow()
+        if not query:
+            return len(_data[self.name])
+        for counter in self._counters:
+            if counter.answers(query):
+                return counter.count(query)
+        started = time.perf_counter()
+        results, examined = self._select(query)
+        if metrics.enabled:
+            metrics.record_db(self.name, "count_documents", started, examined, len(results))
+        return len(results)
     
     async def update_one(self, query, update):
-        for doc in _data[self.name]:
-            if self._matches(doc, query):
-                if "$set" in update:
-                    doc.update(update["$set"])
-                _save_data()
-                return UpdateResult(1)
-        return UpdateResult(0)
+        async with _writing():
+            started = time.perf_counter()
+            doc, examined = self._first_match(query)
+            if doc is None:
+                return UpdateResult(0)
+            fields = update_fields(doc, update)
+            self._update(doc, fields)
+            change_feed.publish(self.name, "update", doc, fields)
+            if metrics.enabled:
+                metrics.record_db(self.name, "update_one", started, examined, 1)
+            _persist({
+                "op": "update",
+                "collection": self.name,
+                "_id": str(doc["_id"]),
+                "set": fields
+            })
+            return UpdateResult(1)
+    
+    async def update_many(self, query, update):
+        """Update every matching document with a single persistence write."""
+        async with _writing():
+            started = time.perf_counter()
+            docs, examined = self._select(query)
+            records = []
+            for doc in docs:
+                fields = update_fields(doc, update)
+                self._update(doc, fields)
+                change_feed.publish(self.name, "update", doc, fields)
+                records.append({"op": "update", "collection": self.name, "_id": str(doc["_id"]), "set": fields})
+            if metrics.enabled:
+                metrics.record_db(self.name, "update_many", started, examined, len(docs))
+            if records:
+                _persist({"op": "batch", "records": records})
+            return UpdateResult(len(docs))
     
     async def delete_one(self, query):
-        for i, doc in enumerate(_data[self.name]):
-            if self._matches(doc, query):
-                _data[self.name].pop(i)
-                _save_data()
-                return UpdateResult(1)
-        return UpdateResult(0)
+        async with _writing():
+            started = time.perf_counter()
+            doc, examined = self._first_match(query)
+            if doc is None:
+                return DeleteResult(0)
+            self._remove(doc)
+            change_feed.publish(self.name, "delete", doc)
+            if metrics.enabled:
+                metrics.record_db(self.name, "delete_one", started, examined, 1)
+            _persist({"op": "delete", "collection": self.name, "_id": str(doc["_id"])})
+            return DeleteResult(1)
+    
+    async def delete_many(self, query):
+        """Delete every matching document with a single persistence write."""
+        async with _writing():
+            started = time.perf_counter()
+            docs, examined = self._select(query)
+            for doc in docs:
+                self._remove(doc)
+                change_feed.publish(self.name, "delete", doc)
+            if metrics.enabled:
+                metrics.record_db(self.name, "delete_many", started, examined, len(docs))
+            if docs:
+                _persist({"op": "batch", "records": [
+                    {"op": "delete", "collection": self.name, "_id": str(doc["_id"])}
+                    for doc in docs
+                ]})
+            return DeleteResult(len(docs))
     
     def _matches(self, doc, query):
-        for key, value in query.items():
-            if key == "_id":
-                if isinstance(value, ObjectId):
-                    if str(doc.get("_id")) != str(value):
-                        return False
-                else:
-                    if str(doc.get("_id")) != str(value):
-                        return False
-            elif doc.get(key) != value:
-                return False
-        return True
+        return matches(doc, query)
 
 
 class Database:
@@ -126,23 +830,146 @@ class Database:
     def __init__(self):
         self.jobs = Collection("jobs")
         self.candidates = Collection("candidates")
+        # Long-running background operations, such as cascading deletions.
+        self.operations = Collection("operations")
+        self.collections = [self.jobs, self.candidates, self.operations]
+        
+        if COMPACT_RECORDS:
+            self.jobs.store_as(record_type(
+                "JobRecord",
+                ["_id", "job_title", "department", "skills", "experience", "salary",
+                 "location", "status", "created_at", "updated_at", "created_by"],
+                datetimes=["created_at", "updated_at"],
+                interned=["department", "location", "status", "created_by"]
+            ))
+            self.candidates.store_as(record_type(
+                "CandidateRecord",
+                ["_id", "name", "email", "phone", "job_id", "resume_filename", "resume_path",
+                 "status", "status_history", "applied_at", "updated_at", "processing_status",
+                 "processing_attempts", "processing_error", "resume_checksum", "resume_text_path",
+                 "resume_text_length", "processed_at"],
+                datetimes=["applied_at", "updated_at", "processed_at"],
+                interned=["job_id", "status", "resume_filename", "processing_status"]
+            ))
+        
+        self.jobs.create_index("status")
+        self.candidates.create_index("job_id")
+        self.candidates.create_index(["email", "job_id"], unique=True)
+        self.jobs.create_sorted_index("created_at")
+        self.candidates.create_sorted_index("applied_at")
+        self.candidates.create_sorted_index("updated_at")
+        self.candidates.create_sorted_index("name")
+        self.operations.create_index("job_id")
+        self.operations.create_index("status")
+        
+        self.jobs.create_counter("status")
+        self.candidates.create_counter("status")
+        self.candidates.create_counter("job_id")
+        self.candidates.create_counter(["job_id", "status"])
+        self.candidates.create_counter("processing_status")
+        # References to each stored resume file, which may be shared.
+        self.candidates.create_counter("resume_path")
 
 
 db = Database()
+_active_db = db
 
 
 async def connect_to_mongo():
+    """Connect to the configured storage backend."""
+    global _active_db
+    if DATABASE_BACKEND == "mongodb":
+        # Backends are imported here so the in-memory one needs neither.
+        from app.mongo import MongoDatabase
+        _active_db = MongoDatabase(MONGODB_URL, DATABASE_NAME, MONGODB_MAX_POOL_SIZE)
+        await _active_db.create_indexes()
+        print(f"Connected to MongoDB database '{DATABASE_NAME}'")
+    elif DATABASE_BACKEND == "sqlite":
+        from app.sqlite import SQLiteDatabase
+        _active_db = SQLiteDatabase(SQLITE_PATH, SQLITE_WORKERS)
+        await _active_db.create_schema()
+        print("Connected to SQLite Database (WAL journal)")
+    else:
+        await _connect_memory()
+
+
+def is_leader():
+    """Whether this process runs recovery and maintenance for the data directory."""
+    return not SHARED or _leader_lock is not None
+
+
+async def _connect_memory():
     """Initialize in-memory database."""
-    _load_data()
-    print("Connected to In-Memory Database (JSON file storage)")
+    global _wal, _background_task, _data_lock, _leader_lock, _follow_task
+    _data_lock = lock_file(LOCK_FILE, shared=SHARED)
+    if _data_lock is None:
+        raise RuntimeError(
+            f"The data in {DATA_DIR} is in use by another server process; "
+            "run every worker with PERSISTENCE_MODE=shared to share it"
+        )
+    if SHARED:
+        _wal = SharedLog(WAL_FILE, fsync=WAL_FSYNC)
+        # Loaded under the writer lock, so no worker writes or compacts meanwhile.
+        _wal.lock()
+    try:
+        snapshot_seq = _load_data()
+        for collection in db.collections:
+            collection.rebuild_indexes()
+        if PERSISTENCE_MODE == "wal":
+            _wal = WriteAheadLog(WAL_FILE, fsync=WAL_FSYNC)
+        if _wal is not None:
+            for record in _wal.replay(snapshot_seq):
+                _apply_record(record)
+            _wal.open(_wal.seq)
+    finally:
+        if SHARED:
+            _wal.unlock()
+    if SHARED:
+        _leader_lock = lock_file(LEADER_FILE)
+        _follow_task = asyncio.create_task(_follow_loop())
+        if is_leader():
+            _background_task = asyncio.create_task(_compaction_loop())
+        role = "leader" if is_leader() else "follower"
+        print(f"Connected to In-Memory Database (shared write-ahead log storage, {role} worker)")
+    elif PERSISTENCE_MODE == "wal":
+        _background_task = asyncio.create_task(_compaction_loop())
+        print("Connected to In-Memory Database (write-ahead log storage)")
+    elif PERSISTENCE_MODE == "background":
+        _background_task = asyncio.create_task(_writer_loop())
+        print("Connected to In-Memory Database (background JSON file storage)")
+    else:
+        print("Connected to In-Memory Database (JSON file storage)")
+    for collection in db.collections:
+        for fields in collection.check_counters():
+            print(f"Rebuilt inconsistent counter {collection.name}.{'/'.join(fields)}")
 
 
 async def close_mongo_connection():
     """Save data on shutdown."""
-    _save_data()
+    global _wal, _background_task, _active_db, _data_lock, _leader_lock, _follow_task
+    if _active_db is not db:
+        _active_db.close()
+        _active_db = db
+        print("Database connection closed")
+        return
+    for task in (_background_task, _follow_task):
+        if task is not None:
+            task.cancel()
+    _background_task = _follow_task = None
+    if PERSISTENCE_MODE in ("wal", "background", "shared"):
+        await flush()
+    else:
+        _save_data()
+    if _wal is not None:
+        _wal.close()
+        _wal = None
+    for fd in (_leader_lock, _data_lock):
+        if fd is not None:
+            os.close(fd)
+    _data_lock = _leader_lock = None
     print("Data saved to file")
 
 
 def get_database():
     """Get database instance."""
-    return db
+    return _active_db
@@ -0,0 +1,136 @@
+"""Serving stored resumes: single files and streamed ZIP archives."""
+import os
+import re
+import time
+import zipfile
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Iterable, Iterator, Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.cache import etag_matches
+
+MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+CHUNK_SIZE = 256 * 1024
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def media_type(filename: str) -> str:
+    return MEDIA_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since without it (RFC 9110)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since.timestamp()
+    return False
+
+
+class ResumeFileResponse(FileResponse):
+    # Fewer, larger reads than the default 64 KiB when the server cannot
+    # send the file itself.
+    chunk_size = CHUNK_SIZE
+
+
+def file_response(request: Request, path: str, filename: str, checksum: Optional[str] = None) -> Response:
+    """
+    Serve a stored file, or 304 Not Modified if the client has it.
+
+    The ETag is the content checksum when known, so it is the same on every
+    server. Range and If-Range requests are answered with partial content,
+    and servers supporting the ASGI pathsend extension send the file
+    without copying it through the application.
+    """
+    stat_result = os.stat(path)
+    if checksum:
+        etag = f'"{checksum}"'
+    else:
+        etag = f'"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag, stat_result.st_mtime):
+        headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ResumeFileResponse(
+        path,
+        media_type=media_type(filename),
+        filename=filename,
+        headers=headers,
+        stat_result=stat_result
+    )
+
+
+def archive_name(name: str, candidate_id: str, filename: str) -> str:
+    """Unique, filesystem-safe name of a candidate's resume in an archive."""
+    stem = _UNSAFE_NAME.sub("_", name).strip("_") or "candidate"
+    return f"{stem}_{candidate_id}{os.path.splitext(filename)[1].lower()}"
+
+
+class _Sink:
+    """Write-only stream collecting what zipfile writes until drained."""
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(entries: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of `(name, path)` entries as it is written.
+
+    Members are stored uncompressed, since PDF and DOCX files already are,
+    and each is read in chunks, so memory use does not depend on the
+    archive size. Files missing on disk are skipped. zipfile writes sizes
+    and checksums after each member when the output cannot seek.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for name, path in entries:
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                stat_result = os.fstat(f.fileno())
+                info = zipfile.ZipInfo(name, time.localtime(stat_result.st_mtime)[:6])
+                info.file_size = stat_result.st_size
+                with archive.open(info, "w") as member:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        member.write(chunk)
+                        yield sink.drain()
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def zip_response(entries: Iterable[Tuple[str, str]], filename: str) -> StreamingResponse:
+    """Stream a ZIP archive; files are read from a worker thread."""
+    return StreamingResponse(
+        zip_stream(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "private, no-store"}
+    )
@@ -0,0 +1,118 @@
+"""Change events published by the storage layer, fanned out to subscribers."""
+import asyncio
+import uuid
+from collections import deque
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.config import EVENTS_BUFFER_SIZE, EVENTS_QUEUE_SIZE
+
+
+class ChangeEvent(NamedTuple):
+    seq: int
+    collection: str
+    # "insert", "update" or "delete"
+    op: str
+    id: str
+    # The job a candidate belongs to, or the job's own id.
+    job_id: Optional[str]
+    # The inserted document or the fields an update set; None for deletes.
+    data: Optional[dict]
+
+
+class Subscriber:
+    """A bounded queue of events, optionally restricted to one job."""
+    def __init__(self, job_id: Optional[str], queue_size: int):
+        self.job_id = job_id
+        self.queue = asyncio.Queue(queue_size)
+
+    def wants(self, event: ChangeEvent) -> bool:
+        return self.job_id is None or event.job_id == self.job_id
+
+
+class ChangeFeed:
+    """
+    Sequenced stream of the changes made through this process.
+
+    The last `buffer_size` events are kept so that a subscriber that
+    reconnects with the id of the last event it saw misses nothing. Event
+    ids are `<epoch>-<seq>`, the epoch telling apart feeds of different
+    processes and restarts. A subscriber whose queue fills up is dropped
+    with a None sentinel instead of slowing down writes; it can reconnect
+    and resume from the buffer.
+    """
+    def __init__(self, buffer_size=EVENTS_BUFFER_SIZE, queue_size=EVENTS_QUEUE_SIZE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.queue_size = queue_size
+        self._recent = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        # Called with each event and its document as it is published, to
+        # keep in-process state derived from the data current.
+        self.listeners = []
+
+    def event_id(self, event: ChangeEvent) -> str:
+        return f"{self.epoch}-{event.seq}"
+
+    def publish(self, collection: str, op: str, doc, fields: Optional[dict] = None):
+        """Record a change to `doc`; updates pass the fields they set."""
+        doc_id = str(doc["_id"])
+        if op == "insert":
+            data = dict(doc)
+        elif op == "update":
+            data = dict(fields)
+        else:
+            data = None
+        job_id = doc_id if collection == "jobs" else doc.get("job_id")
+        self.seq += 1
+        event = ChangeEvent(self.seq, collection, op, doc_id, job_id, data)
+        self._recent.append(event)
+        for listener in self.listeners:
+            try:
+                listener(event, doc)
+            except Exception as exc:
+                print(f"Change listener failed: {exc}")
+        for subscriber in list(self._subscribers):
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def subscribe(
+        self, job_id: Optional[str] = None, last_event_id: Optional[str] = None
+    ) -> Tuple[Subscriber, List[ChangeEvent], bool]:
+        """
+        Register a subscriber, resuming after `last_event_id` if given.
+
+        Returns the subscriber, the buffered events it missed and whether
+        resuming was possible; when it was not, the client must reload.
+        """
+        subscriber = Subscriber(job_id, self.queue_size)
+        self._subscribers.add(subscriber)
+        if not last_event_id:
+            return subscriber, [], True
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return subscriber, [], False
+        seq = int(seq)
+        oldest = self._recent[0].seq if self._recent else self.seq + 1
+        if seq > self.seq or seq < oldest - 1:
+            return subscriber, [], False
+        return subscriber, [event for event in self._recent if event.seq > seq and subscriber.wants(event)], True
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,127 @@
+"""Streaming CSV and NDJSON exports."""
+import csv
+import io
+import re
+import zlib
+from datetime import date
+from typing import AsyncIterator, Callable, List
+
+from fastapi.responses import StreamingResponse
+
+from app.models.bulk import FileFormat
+from app.serialization import dumps
+
+# Documents fetched per query; memory use is bounded by one batch.
+BATCH_SIZE = 500
+# Encoded rows are sent in chunks of about this many bytes.
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {FileFormat.CSV: "text/csv; charset=utf-8", FileFormat.NDJSON: "application/x-ndjson"}
+# OpenAPI content of export responses.
+EXPORT_CONTENT = {"text/csv": {}, "application/x-ndjson": {}, "application/gzip": {}}
+
+# Spreadsheets evaluate cells starting with these as formulas, except for
+# plain numbers such as phone numbers.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_NUMBER = re.compile(r"[+-]?[\d\s().-]+")
+
+
+async def iterate(collection, query: dict, sort: list, projection=None, batch_size: int = BATCH_SIZE):
+    """
+    Yield every document matching a query, in sort order.
+
+    Documents are read one keyset page at a time, so the first arrive after
+    a single page query and only one page is held at once.
+    """
+    after = None
+    while True:
+        cursor = collection.find(query, projection).sort(sort).limit(batch_size)
+        if after is not None:
+            cursor.start_after(*after)
+        batch = [doc async for doc in cursor]
+        for doc in batch:
+            yield doc
+        if len(batch) < batch_size:
+            return
+        after = cursor.position(batch[-1])
+
+
+def csv_cell(value) -> str:
+    """Format a value for a CSV cell, defusing spreadsheet formulas."""
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list):
+        value = "; ".join(str(item) for item in value)
+    value = str(value)
+    if value.startswith(_FORMULA_PREFIXES) and not _NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+async def _encode(rows: AsyncIterator[dict], file_format: FileFormat, columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode rows, yielding chunks of about CHUNK_SIZE bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending, size = [], 0
+    if file_format == FileFormat.CSV:
+        writer.writerow(columns)
+    async for row in rows:
+        if file_format == FileFormat.CSV:
+            writer.writerow([csv_cell(row.get(column)) for column in columns])
+            line = buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            line = dumps(row) + b"\n"
+        pending.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield b"".join(pending)
+            pending, size = [], 0
+    # The CSV header is still buffered when there were no rows.
+    tail = buffer.getvalue().encode("utf-8")
+    if pending or tail:
+        yield tail + b"".join(pending)
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    documents: AsyncIterator[dict],
+    helper: Callable[[dict], dict],
+    file_format: FileFormat,
+    columns: List[str],
+    name: str,
+    compress: bool = False
+) -> StreamingResponse:
+    """
+    Stream documents as a CSV or NDJSON attachment, optionally gzipped.
+
+    Each document is converted with `helper`, the function building its
+    API response, and encoded as soon as it is read.
+    """
+    async def rows():
+        async for doc in documents:
+            yield helper(doc)
+
+    body = _encode(rows(), file_format, columns)
+    media_type = MEDIA_TYPES[file_format]
+    filename = f"{name}-{date.today().isoformat()}.{file_format.value}"
+    if compress:
+        body = _gzip(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "private, no-store"}
+    )
@@ -0,0 +1,413 @@
+"""
+Bulk import of jobs and candidates from CSV or NDJSON files.
+
+Rows are parsed as the file is read and validated a batch at a time; each
+batch is saved with a single insert_many, so memory is bounded by one batch
+and the data is written once per batch rather than once per row. Invalid
+rows are reported with their line number and skipped.
+
+Also usable from the command line, with the server stopped unless it runs
+with PERSISTENCE_MODE=shared (or another backend than memory):
+
+    python -m app.imports jobs jobs.csv
+    python -m app.imports candidates applicants.ndjson.gz --job-id <id>
+"""
+import argparse
+import asyncio
+from abc import ABC, abstractmethod
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import TypeAdapter, ValidationError
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.analytics import initial_history
+from app.config import IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.models.bulk import CandidateImport, FileFormat, JobImport
+from app.search import job_index
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def guess_format(filename: Optional[str]) -> Optional[FileFormat]:
+    """Tell the format from a file name such as `jobs.csv` or `rows.ndjson.gz`."""
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return FileFormat.CSV
+    if name.endswith((".ndjson", ".jsonl")):
+        return FileFormat.NDJSON
+    return None
+
+
+def read_rows(file: BinaryIO, file_format: FileFormat, list_fields=()) -> Iterator[Tuple[int, object]]:
+    """
+    Yield (line, row) for each row of a CSV or NDJSON file, gzipped or not.
+
+    Rows are dicts, or an error message for rows that cannot be parsed.
+    Empty CSV cells are left out, so the model's defaults apply, and CSV
+    cells of `list_fields` are split on ";" as exports join them.
+    """
+    if file.read(2) == _GZIP_MAGIC:
+        file.seek(0)
+        file = gzip.GzipFile(fileobj=file, mode="rb")
+    else:
+        file.seek(0)
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    if file_format == FileFormat.CSV:
+        reader = csv.DictReader(text)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, "Row has more fields than the header"
+                continue
+            row = {}
+            for key, value in record.items():
+                if value is None or value == "":
+                    continue
+                if key in list_fields:
+                    value = [item.strip() for item in value.split(";") if item.strip()]
+                row[key] = value
+            yield reader.line_num, row
+    else:
+        for line, content in enumerate(text, 1):
+            if not content.strip():
+                continue
+            try:
+                row = json.loads(content)
+            except ValueError as e:
+                yield line, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line, "Row is not a JSON object"
+                continue
+            yield line, row
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+def _timestamp(value: Optional[datetime], default: datetime) -> datetime:
+    """Convert a timestamp to naive UTC, the form dates are stored in."""
+    if value is None:
+        return default
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class Importer(ABC):
+    """
+    Imports the rows of a file into one collection, a batch at a time.
+
+    Parsing and validation run in a worker thread, one batch ahead of the
+    writes: a batch is validated as a list in one call, and row by row
+    only when it holds an invalid row. Subclasses build the documents,
+    filter out rows that conflict with stored data and index what they
+    inserted.
+    """
+    model = None
+    # Name of the collection rows are imported into.
+    collection_name = None
+    list_fields = ()
+    # Reported for rows a unique index rejects.
+    duplicate_error = "Duplicate key"
+
+    def __init__(self, db, batch_size: int = IMPORT_BATCH_SIZE, max_errors: int = IMPORT_MAX_ERRORS):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self._adapter = TypeAdapter(List[self.model])
+
+    @property
+    def collection(self):
+        return getattr(self.db, self.collection_name)
+
+    @abstractmethod
+    def document(self, item, now: datetime) -> dict:
+        """Build the document stored for a validated row."""
+
+    def prepare(self, row: dict) -> dict:
+        """Adjust a parsed row before validation."""
+        return row
+
+    async def check(self, batch: list) -> list:
+        """Drop the rows of a batch that cannot be stored, reporting them."""
+        return batch
+
+    def inserted(self, docs: list, ids: list):
+        """Called with the documents of each batch once stored."""
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": line, "error": error})
+
+    def _validate(self, batch: list, errors: list) -> list:
+        try:
+            items = self._adapter.validate_python([row for _, row in batch])
+            return [(line, item) for (line, _), item in zip(batch, items)]
+        except ValidationError:
+            pass
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((line, self.model.model_validate(row)))
+            except ValidationError as e:
+                errors.append((line, _describe(e)))
+        return valid
+
+    def _next_batch(self, rows: Iterator) -> Optional[tuple]:
+        """
+        Read and validate the next batch, in a worker thread.
+
+        Returns the number of rows read, the (line, document) pairs of the
+        valid ones and the (line, error) pairs of the others, or None at
+        the end of the file.
+        """
+        chunk = list(islice(rows, self.batch_size))
+        if not chunk:
+            return None
+        parsed, errors = [], []
+        for line, row in chunk:
+            if isinstance(row, str):
+                errors.append((line, row))
+            else:
+                parsed.append((line, self.prepare(row)))
+        now = datetime.utcnow()
+        valid = [(line, self.document(item, now)) for line, item in self._validate(parsed, errors)]
+        errors.sort()
+        return len(chunk), valid, errors
+
+    async def _store(self, batch: list):
+        """
+        Insert a batch with one write.
+
+        A row conflicting with a document stored since `check`, such as an
+        application made meanwhile, fails the write; the rows it did not
+        store are then inserted one at a time and the conflicting ones
+        reported.
+        """
+        docs = [doc for _, doc in batch]
+        try:
+            result = await self.collection.insert_many(docs)
+        except BulkWriteError as e:
+            stored = e.details.get("nInserted", 0)
+            self.imported += stored
+            self.inserted(docs[:stored], e.details.get("insertedIds", []))
+        else:
+            self.imported += len(docs)
+            self.inserted(docs, result.inserted_ids)
+            return
+        for line, doc in batch[stored:]:
+            try:
+                result = await self.collection.insert_one(doc)
+            except DuplicateKeyError:
+                self.fail(line, self.duplicate_error)
+                continue
+            self.imported += 1
+            self.inserted([doc], [result.inserted_id])
+
+    def report(self, started: float) -> dict:
+        seconds = time.perf_counter() - started
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.rows / seconds, 1) if seconds else 0.0
+        }
+
+    async def run(
+        self,
+        file: BinaryIO,
+        file_format: FileFormat,
+        progress: Optional[Callable[[dict], None]] = None
+    ) -> dict:
+        """Import every row of a file; returns the report."""
+        started = time.perf_counter()
+        rows = read_rows(file, file_format, self.list_fields)
+        pending = asyncio.ensure_future(asyncio.to_thread(self._next_batch, rows))
+        try:
+            while True:
+                result = await pending
+                if result is None:
+                    break
+                # The next batch is parsed while this one is written.
+                pending = asyncio.ensure_future(asyncio.to_thread(self._next_batch, rows))
+                count, batch, errors = result
+                self.rows += count
+                for line, error in errors:
+                    self.fail(line, error)
+                batch = await self.check(batch)
+                if batch:
+                    await self._store(batch)
+                if progress is not None:
+                    progress(self.report(started))
+        finally:
+            if not pending.done():
+                # The worker thread cannot be interrupted; let it finish.
+                await asyncio.gather(pending, return_exceptions=True)
+        return self.report(started)
+
+
+class JobImporter(Importer):
+    """Imports job postings, keeping their status and dates if given."""
+    model = JobImport
+    collection_name = "jobs"
+    list_fields = ("skills",)
+
+    def document(self, job: JobImport, now: datetime) -> dict:
+        created_at = _timestamp(job.created_at, now)
+        return {
+            **job.model_dump(exclude={"status", "created_at", "updated_at"}),
+            "status": job.status.value,
+            "created_at": created_at,
+            "updated_at": _timestamp(job.updated_at, created_at),
+            "created_by": "HR"
+        }
+
+    def inserted(self, docs: list, ids: list):
+        for doc, inserted_id in zip(docs, ids):
+            job_index.add({**doc, "_id": inserted_id})
+
+
+class CandidateImporter(Importer):
+    """
+    Imports applications without resumes.
+
+    Rows must refer to an existing job, open or not, and like applications
+    made through the API, an email may apply to each job once.
+    """
+    model = CandidateImport
+    collection_name = "candidates"
+    duplicate_error = "Already applied for this job"
+
+    def __init__(self, db, job_id: Optional[str] = None, **kwargs):
+        super().__init__(db, **kwargs)
+        self.job_id = job_id
+        self._jobs = set()
+        self._missing_jobs = set()
+
+    def prepare(self, row: dict) -> dict:
+        if self.job_id is not None and "job_id" not in row:
+            row["job_id"] = self.job_id
+        return row
+
+    def document(self, candidate: CandidateImport, now: datetime) -> dict:
+        applied_at = _timestamp(candidate.applied_at, now)
+        updated_at = _timestamp(candidate.updated_at, applied_at)
+        return {
+            "name": candidate.name,
+            "email": candidate.email,
+            "phone": candidate.phone,
+            "job_id": candidate.job_id,
+            "resume_filename": None,
+            "resume_path": None,
+            "status": candidate.status.value,
+            "status_history": initial_history(candidate.status.value, applied_at, updated_at),
+            "applied_at": applied_at,
+            "updated_at": updated_at,
+            "processing_status": None
+        }
+
+    async def _load_jobs(self, job_ids: set):
+        unknown = job_ids - self._jobs - self._missing_jobs
+        valid = [ObjectId(job_id) for job_id in unknown if ObjectId.is_valid(job_id)]
+        if valid:
+            async for job in self.db.jobs.find({"_id": {"$in": valid}}, {"_id": 1}):
+                self._jobs.add(str(job["_id"]))
+        self._missing_jobs |= unknown - self._jobs
+
+    async def check(self, batch: list) -> list:
+        await self._load_jobs({doc["job_id"] for _, doc in batch})
+        emails = defaultdict(list)
+        for _, doc in batch:
+            if doc["job_id"] in self._jobs:
+                emails[doc["job_id"]].append(doc["email"])
+        # One query per job, answered from the unique (email, job_id) index.
+        existing = set()
+        for job_id, addresses in emails.items():
+            query = {"job_id": job_id, "email": {"$in": addresses}}
+            async for candidate in self.db.candidates.find(query, {"email": 1, "job_id": 1}):
+                existing.add((candidate["email"], job_id))
+        kept = []
+        for line, doc in batch:
+            key = (doc["email"], doc["job_id"])
+            if doc["job_id"] not in self._jobs:
+                self.fail(line, "Job not found")
+            elif key in existing:
+                self.fail(line, self.duplicate_error)
+            else:
+                existing.add(key)
+                kept.append((line, doc))
+        return kept
+
+
+IMPORTERS = {"jobs": JobImporter, "candidates": CandidateImporter}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import jobs or candidates from a CSV or NDJSON file.")
+    parser.add_argument("collection", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="CSV or NDJSON file, optionally gzipped")
+    parser.add_argument("--format", choices=[f.value for f in FileFormat], help="Default: from the file name")
+    parser.add_argument("--job-id", help="Job of candidate rows without a job_id")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+async def run_import(args) -> dict:
+    file_format = FileFormat(args.format) if args.format else guess_format(args.path)
+    if file_format is None:
+        raise SystemExit("Cannot tell the file format; pass --format csv or --format ndjson")
+    await connect_to_mongo()
+    try:
+        options = {"batch_size": args.batch_size}
+        if args.collection == "candidates":
+            options["job_id"] = args.job_id
+        importer = IMPORTERS[args.collection](get_database(), **options)
+
+        def progress(report):
+            print(f"{report['rows']} rows, {report['imported']} imported, "
+                  f"{report['failed']} failed, {report['rows_per_second']:.0f} rows/s", file=sys.stderr)
+
+        with open(args.path, "rb") as f:
+            return await importer.run(f, file_format, progress)
+    finally:
+        await close_mongo_connection()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isfile(args.path):
+        raise SystemExit(f"No such file: {args.path}")
+    report = asyncio.run(run_import(args))
+    for error in report["errors"]:
+        print(f"line {error['row']}: {error['error']}")
+    print(f"Imported {report['imported']} of {report['rows']} rows in {report['seconds']}s "
+          f"({report['rows_per_second']:.0f} rows/s), {report['failed']} failed")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""Secondary indexes for the in-memory database."""
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, product
+
+from app.query import RANGE_OPERATORS, regex_prefix
+
+
+def _hashable(value):
+    """Convert a document value into something usable as a dict key."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _equal_values(condition):
+    """Values matched by an equality or `$in` condition, or None for other conditions."""
+    if not isinstance(condition, dict):
+        return [condition]
+    if len(condition) == 1 and "$in" in condition:
+        return condition["$in"]
+    return None
+
+
+class _FieldIndex:
+    """Base class for structures keyed on a tuple of document fields."""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+
+    def key_for(self, doc):
+        """Build the index key for a stored document."""
+        return tuple([_hashable(doc.get(field)) for field in self.fields])
+
+    def query_key(self, query):
+        """Build the index key from the equality values of a query."""
+        return tuple(_hashable(query[field]) for field in self.fields)
+
+    def load(self, items):
+        """Index many (id, document) pairs."""
+        for doc_id, doc in items:
+            self.add(doc_id, doc)
+
+
+class HashIndex(_FieldIndex):
+    """
+    Equality index over one or more document fields.
+
+    Maps the tuple of field values to the matching documents keyed by their
+    string id, so lookups preserve insertion order like a collection scan;
+    with `$in` conditions, the documents come grouped by value. A key with
+    a single document, the usual case for unique and other
+    selective indexes, holds an (id, document) pair instead of a dict,
+    which takes a fraction of the memory.
+    """
+
+    def __init__(self, fields, unique=False):
+        super().__init__(fields)
+        self.unique = unique
+        self._entries = {}
+
+    def conflicts(self, doc_id, doc):
+        """Whether storing the document would violate a unique constraint."""
+        if not self.unique:
+            return False
+        bucket = self._entries.get(self.key_for(doc))
+        if type(bucket) is tuple:
+            return bucket[0] != doc_id
+        return any(other_id != doc_id for other_id in bucket or ())
+
+    def covers(self, query):
+        """Whether every indexed field has an equality or `$in` condition in the query."""
+        return all(
+            field in query and _equal_values(query[field]) is not None
+            for field in self.fields
+        )
+
+    def _buckets(self, query):
+        """The buckets of every key the query matches."""
+        values = [dict.fromkeys(_hashable(v) for v in _equal_values(query[field])) for field in self.fields]
+        buckets = (self._entries.get(key) for key in product(*values))
+        return [bucket for bucket in buckets if bucket is not None]
+
+    def lookup(self, query):
+        """Return the documents whose indexed fields match the query values."""
+        buckets = self._buckets(query)
+        if len(buckets) == 1 and type(buckets[0]) is not tuple:
+            return buckets[0].values()
+        return list(chain.from_iterable(
+            (bucket[1],) if type(bucket) is tuple else bucket.values() for bucket in buckets
+        ))
+
+    def size(self, query):
+        return sum(1 if type(bucket) is tuple else len(bucket) for bucket in self._buckets(query))
+
+    def add(self, doc_id, doc):
+        key = self.key_for(doc)
+        bucket = self._entries.get(key)
+        if bucket is None or (type(bucket) is tuple and bucket[0] == doc_id):
+            self._entries[key] = (doc_id, doc)
+        elif type(bucket) is tuple:
+            self._entries[key] = {bucket[0]: bucket[1], doc_id: doc}
+        else:
+            bucket[doc_id] = doc
+
+    def remove(self, doc_id, doc):
+        key = self.key_for(doc)
+        bucket = self._entries.get(key)
+        if type(bucket) is tuple:
+            if bucket[0] == doc_id:
+                del self._entries[key]
+        elif bucket is not None:
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CountIndex(_FieldIndex):
+    """
+    Document counts per distinct combination of field values.
+
+    Kept up to date on every write so that grouped counts, such as
+    candidates per job and status, can be answered without a scan.
+    """
+
+    def __init__(self, fields):
+        super().__init__(fields)
+        self.counts = {}
+
+    def answers(self, query):
+        """Whether the query is exactly an equality match on the counted fields."""
+        return set(query) == set(self.fields) and not any(
+            isinstance(value, dict) for value in query.values()
+        )
+
+    def count(self, query):
+        return self.counts.get(self.query_key(query), 0)
+
+    def add(self, doc_id, doc):
+        key = self.key_for(doc)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def remove(self, doc_id, doc):
+        key = self.key_for(doc)
+        remaining = self.counts.get(key, 0) - 1
+        if remaining > 0:
+            self.counts[key] = remaining
+        else:
+            self.counts.pop(key, None)
+
+    def clear(self):
+        self.counts.clear()
+
+
+# Batches larger than this are merged into a sorted index instead of inserted
+# one by one.
+MERGE_THRESHOLD = 32
+
+
+class SortedIndex(_FieldIndex):
+    """
+    Ordered index over a single field for range queries and sorted scans.
+
+    Entries are kept sorted as (value, id, document), matching the order
+    the cursor sorts in, so a range, prefix or keyset position is found by
+    bisection and a sorted query can walk the index instead of sorting.
+    Documents whose value is missing or not comparable with the others
+    are left out; `complete` tells whether every document is present.
+
+    For collections of compact records, pass the `Record` type: entries
+    then hold values in their stored form, shared with the records, and
+    query operands are converted the same way. Stored forms sort like the
+    values they encode.
+    """
+
+    unique = False
+
+    def __init__(self, field, record_type=None):
+        super().__init__([field])
+        self.field = field
+        self.skipped = 0
+        self._entries = []
+        self._encode = None if record_type is None else record_type.encoder(field)
+
+    def _value(self, doc):
+        if self._encode is None:
+            return doc.get(self.field)
+        return doc.encoded(self.field)
+
+    def _operand(self, value):
+        return value if self._encode is None else self._encode(value)
+
+    @property
+    def complete(self):
+        return self.skipped == 0
+
+    def conflicts(self, doc_id, doc):
+        return False
+
+    def covers(self, query):
+        """Whether the query constrains the field in a way the index can answer."""
+        if self.field not in query:
+            return False
+        condition = query[self.field]
+        if not isinstance(condition, dict):
+            return condition is not None
+        if regex_prefix(condition) is not None:
+            return True
+        return bool(condition) and set(condition) <= RANGE_OPERATORS
+
+    def _bounds(self, condition):
+        """Positions of the first and past-the-last entries within a condition."""
+        entries = self._entries
+        lo, hi = 0, len(entries)
+        key = lambda entry: entry[0]
+        if not isinstance(condition, dict):
+            condition = {"$gte": condition, "$lte": condition}
+        prefix = regex_prefix(condition) if "$regex" in condition else None
+        try:
+            if prefix is not None:
+                lo = bisect_left(entries, prefix, key=key)
+                if prefix:
+                    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                    hi = bisect_left(entries, upper, key=key)
+            for operator, operand in condition.items():
+                if operator in RANGE_OPERATORS:
+                    operand = self._operand(operand)
+                if operator == "$gte":
+                    lo = max(lo, bisect_left(entries, operand, key=key))
+                elif operator == "$gt":
+                    lo = max(lo, bisect_right(entries, operand, key=key))
+                elif operator == "$lte":
+                    hi = min(hi, bisect_right(entries, operand, key=key))
+                elif operator == "$lt":
+                    hi = min(hi, bisect_left(entries, operand, key=key))
+        except TypeError:
+            # Operand of another type than the indexed values: nothing matches.
+            return 0, 0
+        return lo, max(lo, hi)
+
+    def size(self, query):
+        lo, hi = self._bounds(query[self.field])
+        return hi - lo
+
+    def lookup(self, query):
+        lo, hi = self._bounds(query[self.field])
+        return [entry[2] for entry in self._entries[lo:hi]]
+
+    def scan(self, condition=None, descending=False, after=None):
+        """
+        Yield documents in index order, optionally within a condition and
+        strictly after the keyset position `after` = (value, id).
+        """
+        entries = self._entries
+        lo, hi = (0, len(entries)) if condition is None else self._bounds(condition)
+        if after is not None:
+            after = (self._operand(after[0]), after[1])
+            try:
+                position = bisect_left(entries, after)
+            except TypeError:
+                return
+            if descending:
+                hi = min(hi, position)
+            else:
+                if position < len(entries) and entries[position][:2] == after:
+                    position += 1
+                lo = max(lo, position)
+        if descending:
+            for i in range(hi - 1, lo - 1, -1):
+                yield entries[i][2]
+        else:
+            for i in range(lo, hi):
+                yield entries[i][2]
+
+    def add(self, doc_id, doc):
+        value = self._value(doc)
+        if value is None:
+            self.skipped += 1
+            return
+        try:
+            insort(self._entries, (value, doc_id, doc))
+        except TypeError:
+            self.skipped += 1
+
+    def add_many(self, items):
+        """
+        Add several (id, document) pairs.
+
+        Beyond a few documents, building the merged entries in one pass is
+        cheaper than shifting the entries for each insertion.
+        """
+        added = []
+        for doc_id, doc in items:
+            value = self._value(doc)
+            if value is None:
+                self.skipped += 1
+            else:
+                added.append((value, doc_id, doc))
+        if len(added) > MERGE_THRESHOLD:
+            # Ids are unique, so documents are never compared.
+            entries = self._entries
+            try:
+                added.sort()
+                positions, position = [], 0
+                for entry in added:
+                    position = bisect_left(entries, entry, position)
+                    positions.append(position)
+            except TypeError:
+                pass
+            else:
+                # One copy of the entries, spliced with the new ones.
+                merged, start = [], 0
+                for position, entry in zip(positions, added):
+                    merged += entries[start:position]
+                    merged.append(entry)
+                    start = position
+                merged += entries[start:]
+                self._entries = merged
+                return
+        for value, doc_id, doc in added:
+            try:
+                insort(self._entries, (value, doc_id, doc))
+            except TypeError:
+                self.skipped += 1
+
+    def remove(self, doc_id, doc):
+        value = self._value(doc)
+        try:
+            position = bisect_left(self._entries, (value, doc_id))
+        except TypeError:
+            position = len(self._entries)
+        if position < len(self._entries) and self._entries[position][:2] == (value, doc_id):
+            del self._entries[position]
+        else:
+            self.skipped -= 1
+
+    def load(self, items):
+        """Index many (id, document) pairs at once, sorting a single time."""
+        for doc_id, doc in items:
+            value = self._value(doc)
+            if value is None:
+                self.skipped += 1
+            else:
+                self._entries.append((value, doc_id, doc))
+        try:
+            self._entries.sort(key=lambda entry: entry[:2])
+        except TypeError:
+            # Mixed value types: fall back to adding one by one, which
+            # leaves the values that do not fit out of the index.
+            entries, self._entries = self._entries, []
+            for value, doc_id, doc in entries:
+                self.add(doc_id, doc)
+
+    def clear(self):
+        self.skipped = 0
+        self._entries.clear()
+
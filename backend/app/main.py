@@ -1,10 +1,20 @@
 """Main FastAPI application entry point."""
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import jobs, candidates
+from app import metrics
+from app.config import RESUME_GC_INTERVAL
+from app.database import connect_to_mongo, close_mongo_connection, get_database, is_leader
+from app.pagination import NEXT_CURSOR_HEADER
+from app.operations import job_deletions
+from app.processing import resume_queue
+from app.search import build_job_index
+from app.analytics import build_funnels
+from app.uploads import garbage_collection_loop
+from app.routers import jobs, candidates, stats, events, analytics
 
 
 @asynccontextmanager
@@ -12,8 +22,22 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
     # Startup
     await connect_to_mongo()
+    await build_job_index(get_database())
+    await build_funnels(get_database())
+    # With PERSISTENCE_MODE=shared, only one worker recovers interrupted
+    # work and sweeps files.
+    await resume_queue.start(recover=is_leader())
+    if is_leader():
+        await job_deletions.start()
+    gc_task = None
+    if RESUME_GC_INTERVAL > 0 and is_leader():
+        gc_task = asyncio.create_task(garbage_collection_loop(get_database()))
     yield
     # Shutdown
+    if gc_task is not None:
+        gc_task.cancel()
+    await job_deletions.stop()
+    await resume_queue.stop()
     await close_mongo_connection()
 
 
@@ -45,11 +69,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Request timing middleware, only installed when instrumentation is enabled
+if metrics.enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(jobs.router, prefix="/api")
 app.include_router(candidates.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
 
 
 @app.get("/", tags=["Root"])
@@ -63,7 +95,10 @@ async def root():
             "jobs": "/api/jobs",
             "apply": "/api/apply",
             "candidates": "/api/candidates/{job_id}",
-            "update_status": "/api/candidate/status/{candidate_id}"
+            "update_status": "/api/candidate/status/{candidate_id}",
+            "stats": "/api/stats",
+            "funnel": "/api/analytics/funnel",
+            "events": "/api/events"
         }
     }
 
@@ -72,3 +107,9 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics (empty unless METRICS_ENABLED is set)."""
+    return metrics.render()
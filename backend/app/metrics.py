@@ -0,0 +1,173 @@
+"""Request and storage instrumentation exposed in Prometheus text format."""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from app.config import METRICS_ENABLED, SERVER_TIMING_ENABLED
+
+# Checked by every hook before doing any work, so instrumentation costs a
+# single attribute lookup when disabled.
+enabled = METRICS_ENABLED or SERVER_TIMING_ENABLED
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# Per-request stage durations in seconds, used for the Server-Timing header.
+_stages = ContextVar("stages", default=None)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonically increasing value per label combination."""
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        _registry.append(self)
+
+    def inc(self, amount, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    """Bucketed distribution of observations per label combination."""
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        _registry.append(self)
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {count}"
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "handler", "status")
+)
+DB_OPERATION_DURATION = Histogram(
+    "db_operation_duration_seconds", "In-memory collection operation latency.", ("collection", "operation")
+)
+DB_DOCUMENTS_EXAMINED = Histogram(
+    "db_documents_examined", "Documents examined per collection operation.",
+    ("collection", "operation"), buckets=COUNT_BUCKETS
+)
+DB_DOCUMENTS_RETURNED = Counter(
+    "db_documents_returned_total", "Documents returned or modified by collection operations.",
+    ("collection", "operation")
+)
+PERSIST_DURATION = Histogram(
+    "persist_duration_seconds", "Time spent serializing and writing data to disk.", ("mode",)
+)
+PERSIST_BYTES = Counter("persist_bytes_written_total", "Bytes written by persistence.", ("mode",))
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes of uploaded resumes written to disk.")
+UPLOAD_DURATION = Histogram("upload_duration_seconds", "Time spent streaming a resume to disk.")
+
+
+def add_stage(stage, seconds):
+    """Add time spent in a stage to the current request's Server-Timing."""
+    stages = _stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def record_db(collection, operation, started, examined, returned):
+    """Record one collection operation that began at `started`."""
+    elapsed = time.perf_counter() - started
+    DB_OPERATION_DURATION.observe(elapsed, collection, operation)
+    DB_DOCUMENTS_EXAMINED.observe(examined, collection, operation)
+    DB_DOCUMENTS_RETURNED.inc(returned, collection, operation)
+    add_stage("db", elapsed)
+
+
+def record_persist(mode, started, size):
+    """Record one persistence write of `size` bytes that began at `started`."""
+    elapsed = time.perf_counter() - started
+    PERSIST_DURATION.observe(elapsed, mode)
+    PERSIST_BYTES.inc(size, mode)
+    add_stage("persist", elapsed)
+
+
+def record_upload(started, size):
+    """Record one resume upload of `size` bytes that began at `started`."""
+    elapsed = time.perf_counter() - started
+    UPLOAD_DURATION.observe(elapsed)
+    UPLOAD_BYTES.inc(size)
+    add_stage("upload", elapsed)
+
+
+def render():
+    """Render every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and optional Server-Timing headers."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = {}
+        token = _stages.set(stages)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    stages["app"] = time.perf_counter() - started
+                    timing = ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items())
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stages.reset(token)
+            # Label by endpoint name rather than raw path so ids in URLs do
+            # not create a series per document.
+            handler = getattr(scope.get("route"), "name", None) or "unmatched"
+            REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], handler, str(status_code))
@@ -0,0 +1,36 @@
+"""Hiring-funnel analytics Pydantic models."""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class FunnelStage(BaseModel):
+    """Candidates of a funnel stage."""
+    status: str
+    reached: int = Field(..., description="Candidates who reached this stage or a later one")
+    rejected: int = Field(..., description="Candidates rejected after reaching this stage")
+    conversion: Optional[float] = Field(
+        None, description="Share of the previous stage's candidates who reached this one"
+    )
+
+
+class TimeToSelect(BaseModel):
+    """Time from application to selection."""
+    selected: int = Field(..., description="Candidates ever selected")
+    median_days: Optional[float] = None
+    p90_days: Optional[float] = None
+
+
+class FunnelResponse(BaseModel):
+    """Hiring funnel of all candidates, a job or a department."""
+    job_id: Optional[str] = None
+    department: Optional[str] = None
+    total_candidates: int
+    selection_rate: Optional[float] = Field(None, description="Share of candidates who reached Selected")
+    stages: List[FunnelStage]
+    time_to_select: TimeToSelect
+
+
+class FunnelRebuildResponse(BaseModel):
+    """Result of recomputing the funnels from the database."""
+    candidates: int = Field(..., description="Candidates read")
+    seconds: float
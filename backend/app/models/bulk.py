@@ -0,0 +1,96 @@
+"""Bulk operation Pydantic models."""
+import re
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Annotated, Optional, List
+from pydantic import AfterValidator, BaseModel, Field
+from pydantic.networks import validate_email
+
+from app.models.candidate import CandidateBase, CandidateStatus
+from app.models.job import JobCreate, JobStatus
+
+
+class FileFormat(str, Enum):
+    """Row formats of bulk exports and imports."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single item in a bulk operation."""
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str] = Field(None, description="ID of the affected document")
+    success: bool
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Summary and per-item results of a bulk operation."""
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Unquoted ASCII local parts, which email-validator accepts unchanged.
+_LOCAL_PART = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*")
+
+
+@lru_cache(maxsize=4096)
+def _email_domain(domain: str) -> Optional[str]:
+    """The normalized form of an email domain, or None if it is invalid."""
+    try:
+        return validate_email("postmaster@" + domain)[1].rpartition("@")[2]
+    except ValueError:
+        return None
+
+
+def _import_email(value: str) -> str:
+    """
+    Validate an email address like EmailStr, checking each domain once.
+
+    Checking the domain is most of the cost of EmailStr, and imported
+    addresses share a few domains. Addresses with an unusual local part
+    get the full validation. The address is kept as given, not normalized,
+    as applications store it, so that the (email, job_id) duplicate check
+    and unique index compare imported and applied addresses alike.
+    """
+    local, _, domain = value.rpartition("@")
+    if len(local) <= 64 and _LOCAL_PART.fullmatch(local):
+        normalized = _email_domain(domain)
+        if normalized is not None and len(local) + 1 + len(normalized) <= 254:
+            return value
+    validate_email(value)
+    return value
+
+
+class JobImport(JobCreate):
+    """A job posting imported from another system, with its history."""
+    status: JobStatus = Field(default=JobStatus.OPEN, description="Job status")
+    created_at: Optional[datetime] = Field(None, description="When the job was posted; defaults to now")
+    updated_at: Optional[datetime] = Field(None, description="Last change; defaults to created_at")
+
+
+class CandidateImport(CandidateBase):
+    """An application imported from another system, without a resume."""
+    email: Annotated[str, AfterValidator(_import_email)] = Field(..., description="Candidate email")
+    job_id: str = Field(..., description="ID of the job applied for")
+    status: CandidateStatus = Field(default=CandidateStatus.APPLIED, description="Application status")
+    applied_at: Optional[datetime] = Field(None, description="When the application was made; defaults to now")
+    updated_at: Optional[datetime] = Field(None, description="Last change; defaults to applied_at")
+
+
+class ImportRowError(BaseModel):
+    """A row that could not be imported."""
+    row: int = Field(..., description="Line of the row in the file, counting the CSV header")
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk import."""
+    rows: int = Field(..., description="Rows read from the file")
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = Field(..., description="The first IMPORT_MAX_ERRORS failed rows")
+    seconds: float = Field(..., description="Time taken")
+    rows_per_second: float
@@ -1,6 +1,6 @@
 """Candidate Pydantic models for MongoDB schema."""
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from enum import Enum
 from pydantic import BaseModel, Field, EmailStr
 
@@ -14,6 +14,15 @@ class CandidateStatus(str, Enum):
     REJECTED = "Rejected"
 
 
+class ProcessingStatus(str, Enum):
+    """Resume post-processing states."""
+    PENDING = "Pending"
+    PROCESSING = "Processing"
+    COMPLETED = "Completed"
+    QUARANTINED = "Quarantined"
+    FAILED = "Failed"
+
+
 class CandidateBase(BaseModel):
     """Base candidate model with common fields."""
     name: str = Field(..., min_length=1, max_length=200, description="Candidate name")
@@ -31,6 +40,12 @@ class CandidateStatusUpdate(BaseModel):
     status: CandidateStatus = Field(..., description="New candidate status")
 
 
+class CandidateBulkStatusUpdate(BaseModel):
+    """Model for updating the status of several candidates at once."""
+    candidate_ids: List[str] = Field(..., min_length=1, max_length=1000, description="IDs of the candidates to update")
+    status: CandidateStatus = Field(..., description="New candidate status")
+
+
 class Candidate(CandidateBase):
     """Complete candidate model stored in MongoDB."""
     id: Optional[str] = Field(None, alias="_id")
@@ -57,6 +72,41 @@ class CandidateResponse(BaseModel):
     status: str
     applied_at: datetime
     updated_at: datetime
+    processing_status: Optional[str] = Field(None, description="Resume post-processing status")
 
     class Config:
         populate_by_name = True
+
+
+class ResumeProcessingResponse(BaseModel):
+    """Resume post-processing progress of a candidate."""
+    candidate_id: str
+    status: Optional[str] = Field(
+        None, description="Pending, Processing, Completed, Quarantined or Failed; null if never processed"
+    )
+    step: Optional[str] = Field(None, description="Step in progress: checksum, scan or extract")
+    attempts: int = 0
+    error: Optional[str] = None
+    checksum: Optional[str] = Field(None, description="SHA-256 of the resume file")
+    text_length: Optional[int] = Field(None, description="Characters of text extracted from the resume")
+    processed_at: Optional[datetime] = None
+    queue_position: Optional[int] = Field(None, description="Position in the processing queue, 0 is next")
+
+
+class ResumeGCResponse(BaseModel):
+    """Result of sweeping unreferenced resume files."""
+    scanned: int = Field(..., description="Files examined")
+    removed: int = Field(..., description="Files removed")
+    freed_bytes: int = Field(..., description="Bytes freed")
+
+
+class StatusChange(BaseModel):
+    """A status a candidate entered, and when."""
+    status: str
+    at: datetime
+
+
+class StatusHistoryResponse(BaseModel):
+    """Status changes of a candidate, oldest first."""
+    candidate_id: str
+    history: List[StatusChange]
@@ -1,6 +1,6 @@
 """Job Pydantic models for MongoDB schema."""
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 from pydantic import BaseModel, Field
 
@@ -67,3 +67,33 @@ class JobResponse(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class JobSearchResponse(BaseModel):
+    """Ranked job search results with facet counts."""
+    total: int = Field(..., description="Number of matching jobs")
+    results: List[JobResponse]
+    facets: Dict[str, Dict[str, int]] = Field(
+        ..., description="Most common skills, locations, departments and statuses among the matches"
+    )
+
+
+class OperationStatus(str, Enum):
+    """Background operation states."""
+    RUNNING = "Running"
+    COMPLETED = "Completed"
+    FAILED = "Failed"
+
+
+class JobDeletionResponse(BaseModel):
+    """Progress of a job's cascading deletion."""
+    id: str
+    job_id: str
+    status: OperationStatus
+    total_candidates: int = Field(..., description="Candidates the job had when deletion started")
+    deleted_candidates: int = Field(..., description="Candidates deleted so far")
+    released_files: int = Field(..., description="Resume files removed because no other candidate used them")
+    started_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
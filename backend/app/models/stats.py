@@ -0,0 +1,26 @@
+"""Dashboard statistics Pydantic models."""
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class StatsResponse(BaseModel):
+    """Overall recruitment statistics for the HR dashboard."""
+    total_jobs: int
+    open_jobs: int
+    total_candidates: int
+    candidates_by_status: Dict[str, int] = Field(..., description="Candidate count per status")
+
+
+class JobStatsResponse(BaseModel):
+    """Recruitment statistics for a single job."""
+    job_id: str
+    total_candidates: int
+    candidates_by_status: Dict[str, int] = Field(..., description="Candidate count per status")
+
+
+class ProcessingStatsResponse(BaseModel):
+    """Progress of resume post-processing across all candidates."""
+    queued: int = Field(..., description="Candidates waiting in this process's queue")
+    active: int = Field(..., description="Resumes being processed right now")
+    workers: int
+    candidates_by_status: Dict[str, int] = Field(..., description="Candidate count per processing status")
@@ -0,0 +1,222 @@
+"""MongoDB storage backend using the Motor async driver."""
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from pymongo.results import InsertManyResult
+
+from app.events import change_feed
+from app.query import sort_spec, update_fields
+
+
+class MongoCursor:
+    """
+    Lazily built Motor cursor with keyset pagination support.
+
+    Mirrors the in-memory AsyncCursor: sorts are tie-broken by `_id` and
+    `start_after` is pushed down to the server as a range query, so the
+    page is selected by an index walk rather than by skipping documents.
+    """
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+        self._after = None
+
+    def sort(self, key, order=ASCENDING):
+        self._sort = sort_spec(key, order)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def start_after(self, values, doc_id):
+        values = list(values) if isinstance(values, (list, tuple)) else [values]
+        if len(values) != len(self._sort):
+            raise ValueError("Cursor does not match the sort order")
+        self._after = (values, ObjectId(doc_id))
+        return self
+
+    def position(self, doc):
+        """The keyset position of a document, for `start_after`; missing fields are null."""
+        return [doc.get(field) for field, _ in self._sort], str(doc["_id"])
+
+    def _keys(self):
+        primary = self._sort[0][1] if self._sort else ASCENDING
+        return self._sort + [("_id", primary)]
+
+    def _build(self):
+        query = self._query
+        if self._after is not None:
+            # f1 > v1 OR (f1 = v1 AND f2 > v2) OR ... ending with _id, using
+            # $lt for descending fields. Null and missing values sort first
+            # ascending and last descending.
+            values, doc_id = self._after
+            keys = [(field, order, value) for (field, order), value in zip(self._sort, values)]
+            keys.append(("_id", self._keys()[-1][1], doc_id))
+            branches = []
+            for i, (field, order, value) in enumerate(keys):
+                branch = {f: v for f, _, v in keys[:i]}
+                if value is None:
+                    if order == DESCENDING:
+                        continue
+                    branch[field] = {"$ne": None}
+                elif order == DESCENDING:
+                    branch = {"$and": [branch, {"$or": [{field: {"$lt": value}}, {field: None}]}]}
+                else:
+                    branch[field] = {"$gt": value}
+                branches.append(branch)
+            keyset = {"$or": branches} if len(branches) > 1 else branches[0]
+            query = {"$and": [query, keyset]} if query else keyset
+
+        cursor = self._collection.find(query, self._projection)
+        if self._sort or self._after is not None:
+            cursor = cursor.sort(self._keys())
+        if self._skip:
+            cursor = cursor.skip(self._skip)
+        if self._limit:
+            cursor = cursor.limit(self._limit)
+        return cursor
+
+    def __aiter__(self):
+        return self._build().__aiter__()
+
+
+class MongoCollection:
+    """
+    Motor collection exposing the same interface as the in-memory one.
+
+    Writes publish change events. For updates and deletes the affected
+    documents are looked up just before the write, which is then limited
+    to them, so events cover what the write changed.
+    """
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    def __getattr__(self, name):
+        # find_one, count_documents, create_index, ... are Motor's own.
+        return getattr(self._collection, name)
+
+    async def cache_version(self):
+        """
+        None: other app instances may write to the same database unseen,
+        so responses are not cached.
+        """
+        return None
+
+    def _publish(self, op, docs, fields=None):
+        for doc in docs:
+            change_feed.publish(self.name, op, doc, fields)
+
+    async def _affected(self, query, one, projection=None):
+        """The documents a write would change, whole or with the fields in `projection`."""
+        if one:
+            doc = await self._collection.find_one(query, projection)
+            return [doc] if doc else []
+        return await self._collection.find(query, projection).to_list(None)
+
+    def _publish_updates(self, docs, update):
+        # Pushed-to lists are published whole, as read just before the write.
+        for doc in docs:
+            change_feed.publish(self.name, "update", doc, update_fields(doc, update))
+
+    @staticmethod
+    def _update_projection(update):
+        return {"job_id": 1, **{key: 1 for key in update.get("$push", {})}}
+
+    def _limited(self, query, docs):
+        return {"$and": [query, {"_id": {"$in": [doc["_id"] for doc in docs]}}]}
+
+    async def insert_one(self, document):
+        # Motor sets the _id of the document it inserts.
+        result = await self._collection.insert_one(document)
+        self._publish("insert", [document])
+        return result
+
+    async def insert_many(self, documents):
+        documents = list(documents)
+        if not documents:
+            # Motor rejects an empty list; the other backends insert nothing.
+            return InsertManyResult([], True)
+        try:
+            result = await self._collection.insert_many(documents)
+        except BulkWriteError as e:
+            # An ordered insert keeps the documents before the failing one.
+            stored = documents[:e.details.get("nInserted", 0)]
+            e.details["insertedIds"] = [doc["_id"] for doc in stored]
+            self._publish("insert", stored)
+            raise
+        self._publish("insert", documents)
+        return result
+
+    async def update_one(self, query, update):
+        docs = await self._affected(query, True, self._update_projection(update))
+        result = await self._collection.update_one(self._limited(query, docs), update)
+        if result.matched_count:
+            self._publish_updates(docs, update)
+        return result
+
+    async def update_many(self, query, update):
+        docs = await self._affected(query, False, self._update_projection(update))
+        result = await self._collection.update_many(self._limited(query, docs), update)
+        if result.matched_count:
+            self._publish_updates(docs, update)
+        return result
+
+    async def delete_one(self, query):
+        docs = await self._affected(query, True)
+        result = await self._collection.delete_one(self._limited(query, docs))
+        if result.deleted_count:
+            self._publish("delete", docs)
+        return result
+
+    async def delete_many(self, query):
+        docs = await self._affected(query, False)
+        result = await self._collection.delete_many(self._limited(query, docs))
+        if result.deleted_count:
+            self._publish("delete", docs)
+        return result
+
+    def find(self, query=None, projection=None):
+        return MongoCursor(self._collection, query, projection)
+
+
+class MongoDatabase:
+    """MongoDB database with a pooled Motor client."""
+    def __init__(self, url, name, max_pool_size):
+        self.client = AsyncIOMotorClient(url, maxPoolSize=max_pool_size)
+        database = self.client[name]
+        self.jobs = MongoCollection(database.jobs)
+        self.candidates = MongoCollection(database.candidates)
+        self.operations = MongoCollection(database.operations)
+        self.collections = [self.jobs, self.candidates, self.operations]
+
+    async def create_indexes(self):
+        """Create the indexes the routers' queries rely on."""
+        await self.jobs.create_index("status")
+        await self.jobs.create_index([("created_at", DESCENDING), ("_id", DESCENDING)])
+        await self.candidates.create_index("job_id")
+        await self.candidates.create_index("status")
+        await self.candidates.create_index([("email", ASCENDING), ("job_id", ASCENDING)], unique=True)
+        await self.candidates.create_index([("applied_at", DESCENDING), ("_id", DESCENDING)])
+        await self.candidates.create_index([("updated_at", DESCENDING), ("_id", DESCENDING)])
+        await self.candidates.create_index("processing_status")
+        await self.candidates.create_index("resume_path")
+        for field in ("applied_at", "updated_at", "name"):
+            await self.candidates.create_index(
+                [("job_id", ASCENDING), (field, DESCENDING), ("_id", DESCENDING)]
+            )
+        await self.operations.create_index("job_id")
+        await self.operations.create_index("status")
+
+    def close(self):
+        self.client.close()
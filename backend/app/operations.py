@@ -0,0 +1,146 @@
+"""Long-running background operations: cascading job deletion."""
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+from app import uploads
+from app.config import DELETE_CHUNK_SIZE
+from app.database import get_database
+from app.models.job import OperationStatus
+from app.search import job_index
+
+RETRY_DELAY = 5
+
+
+class JobDeletions:
+    """
+    Deletes jobs together with their candidates and resume files.
+
+    The job document goes first, so the job disappears at once and takes
+    no more applications. Its candidates are then deleted in chunks, each
+    with one persistence write, and their resume files released; the
+    event loop is free between chunks. Progress is kept in an `operations`
+    document, so an interrupted deletion is resumed on the next startup.
+    A chunk interrupted after its candidates are deleted can leave resume
+    files behind, which the resume garbage collector removes.
+    """
+    def __init__(self, chunk_size=DELETE_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._tasks = {}
+
+    async def start(self):
+        """Resume every deletion that did not complete."""
+        db = get_database()
+        unfinished = [OperationStatus.RUNNING.value, OperationStatus.FAILED.value]
+        async for operation in db.operations.find({"status": {"$in": unfinished}}):
+            self._spawn(operation)
+        if self._tasks:
+            print(f"Resumed {len(self._tasks)} job deletions")
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, job_id: str) -> Optional[dict]:
+        """
+        Delete a job and start removing its candidates.
+
+        Returns the operation document, or None if the job does not exist.
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        operation = {
+            "type": "delete_job",
+            "job_id": job_id,
+            "status": OperationStatus.RUNNING.value,
+            "total_candidates": await db.candidates.count_documents({"job_id": job_id}),
+            "deleted_candidates": 0,
+            "released_files": 0,
+            "started_at": now,
+            "updated_at": now,
+            "finished_at": None,
+            "error": None
+        }
+        # Recorded before the job is deleted, so a crash in between still
+        # finishes the deletion on restart.
+        result = await db.operations.insert_one(operation)
+        deleted = await db.jobs.delete_one({"_id": ObjectId(job_id)})
+        if deleted.deleted_count == 0:
+            await db.operations.delete_one({"_id": result.inserted_id})
+            return None
+        job_index.remove(job_id)
+        operation = await db.operations.find_one({"_id": result.inserted_id})
+        self._spawn(operation)
+        return operation
+
+    def _spawn(self, operation: dict):
+        operation_id = str(operation["_id"])
+        if operation_id not in self._tasks:
+            task = asyncio.create_task(self._run(operation))
+            self._tasks[operation_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(operation_id, None))
+
+    async def _delete_chunk(self, job_id: str):
+        """Delete one chunk of a job's candidates; returns the counts removed."""
+        db = get_database()
+        cursor = db.candidates.find({"job_id": job_id}, {"_id": 1, "resume_path": 1}).limit(self.chunk_size)
+        candidates = [candidate async for candidate in cursor]
+        if not candidates:
+            return 0, 0
+        await db.candidates.delete_many({"_id": {"$in": [c["_id"] for c in candidates]}})
+        released = 0
+        for path in {c.get("resume_path") for c in candidates}:
+            if await uploads.release(db, path):
+                released += 1
+        return len(candidates), released
+
+    async def _run(self, operation: dict):
+        db = get_database()
+        query = {"_id": operation["_id"]}
+        job_id = operation["job_id"]
+        released = operation["released_files"]
+        # A chunk may have been deleted without its progress being saved.
+        remaining = await db.candidates.count_documents({"job_id": job_id})
+        deleted = max(operation["deleted_candidates"], operation["total_candidates"] - remaining)
+        while True:
+            try:
+                # A no-op unless a restart interrupted submit().
+                if (await db.jobs.delete_one({"_id": ObjectId(job_id)})).deleted_count:
+                    job_index.remove(job_id)
+                while True:
+                    # Shielded so shutdown never stops a chunk halfway.
+                    count, files = await asyncio.shield(self._delete_chunk(job_id))
+                    if not count:
+                        break
+                    deleted += count
+                    released += files
+                    await db.operations.update_one(query, {"$set": {
+                        "deleted_candidates": deleted,
+                        "released_files": released,
+                        "updated_at": datetime.utcnow()
+                    }})
+                await db.operations.update_one(query, {"$set": {
+                    "status": OperationStatus.COMPLETED.value,
+                    "updated_at": datetime.utcnow(),
+                    "finished_at": datetime.utcnow(),
+                    "error": None
+                }})
+                return
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                print(f"Deletion of job {job_id} failed, retrying in {RETRY_DELAY}s: {error}")
+                await db.operations.update_one(query, {"$set": {
+                    "status": OperationStatus.FAILED.value,
+                    "updated_at": datetime.utcnow(),
+                    "error": error
+                }})
+                await asyncio.sleep(RETRY_DELAY)
+                await db.operations.update_one(query, {"$set": {"status": OperationStatus.RUNNING.value}})
+
+
+job_deletions = JobDeletions()
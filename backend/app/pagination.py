@@ -0,0 +1,114 @@
+"""Pagination helpers for list endpoints."""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response, status
+
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Common `limit`/`skip`/`cursor` query parameters."""
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+        skip: int = Query(0, ge=0, description="Number of items to skip"),
+        cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+    ):
+        self.limit = limit
+        self.skip = skip
+        self.cursor = cursor
+
+
+def parse_sort(spec: Optional[str], allowed, default: str) -> list:
+    """
+    Parse a `sort` parameter such as "-applied_at,name" into a sort spec.
+
+    Fields are comma-separated, a leading "-" sorts descending. Only fields
+    in `allowed` are accepted, each at most once.
+    """
+    sort = []
+    for part in (spec or default).split(","):
+        part = part.strip()
+        field = part.lstrip("-")
+        if field not in allowed or field in (f for f, _ in sort):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid sort field: {part or '(empty)'}"
+            )
+        sort.append((field, -1 if part.startswith("-") else 1))
+    return sort
+
+
+def sort_token(sort: list) -> str:
+    """The `sort` parameter form of a sort spec, such as "-applied_at,name"."""
+    return ",".join(("-" if order == -1 else "") + field for field, order in sort)
+
+
+def encode_cursor(values, item_id: str, sort: list) -> str:
+    """Encode the sort values and id of the last item, and the sort they follow, as an opaque cursor."""
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    values = [{"$date": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps([values, item_id, sort_token(sort)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Decode a cursor produced by `encode_cursor` into (values, id, sort token)."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values, item_id, sort = json.loads(base64.urlsafe_b64decode(padded))
+        return [
+            datetime.fromisoformat(v["$date"]) if isinstance(v, dict) else v
+            for v in values
+        ], item_id, sort
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def paginate(cursor, page: PageParams, sort: list):
+    """
+    Apply page parameters to a database cursor sorted by `sort`.
+    
+    A cursor issued under another sort order is rejected, since its
+    position means nothing in this one.
+    """
+    if page.cursor:
+        values, item_id, issued = decode_cursor(page.cursor)
+        if issued != sort_token(sort):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        try:
+            cursor.start_after(values, item_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Pagination cursor does not match the sort order"
+            )
+    return cursor.skip(page.skip).limit(page.limit or 0)
+
+
+def next_cursor_headers(items: list, sort: list, page: PageParams) -> dict:
+    """
+    Headers exposing a cursor for the next page when the current page is full.
+    
+    `sort` is the sort spec of the query, as (field, order) pairs.
+    """
+    if page.limit and len(items) == page.limit:
+        last = items[-1]
+        values = [last[field] for field, _ in sort]
+        return {NEXT_CURSOR_HEADER: encode_cursor(values, last["id"], sort)}
+    return {}
+
+
+def set_next_cursor(response: Response, items: list, sort: list, page: PageParams):
+    """Expose a cursor for the next page when the current page is full."""
+    response.headers.update(next_cursor_headers(items, sort, page))
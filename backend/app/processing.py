@@ -0,0 +1,217 @@
+"""Background post-processing of uploaded resumes."""
+import asyncio
+import multiprocessing
+import shlex
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+from app.config import RESUME_WORKERS, RESUME_PROCESSES, RESUME_MAX_ATTEMPTS, RESUME_SCAN_COMMAND
+from app.database import get_database
+from app.models.candidate import ProcessingStatus
+from app.resume_text import file_checksum, extract_text_to_file
+from app import uploads
+
+UNFINISHED = [ProcessingStatus.PENDING.value, ProcessingStatus.PROCESSING.value]
+
+# Async callables taking a resume path and returning the reason to reject
+# the file, or None if it is clean. Raising marks the attempt as failed.
+scan_hooks = []
+
+
+async def command_scan(path: str) -> Optional[str]:
+    """Scan a file with RESUME_SCAN_COMMAND; exit status 1 means infected, as with clamscan."""
+    process = await asyncio.create_subprocess_exec(
+        *shlex.split(RESUME_SCAN_COMMAND), path,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    output, _ = await process.communicate()
+    if process.returncode == 0:
+        return None
+    if process.returncode == 1:
+        detail = output.decode(errors="replace").strip().splitlines()
+        return f"Virus scan: {detail[-1] if detail else 'infected'}"
+    raise RuntimeError(f"Virus scan exited with status {process.returncode}")
+
+
+if RESUME_SCAN_COMMAND:
+    scan_hooks.append(command_scan)
+
+
+class ResumeQueue:
+    """
+    In-process queue of candidates whose resumes await post-processing.
+
+    Each resume is checksummed, passed through the scan hooks and has its
+    text extracted; checksums and extraction run in a process pool. The
+    processing state is kept on the candidate document (`processing_status`
+    and related fields), written once when a run ends, so the queue only
+    holds ids: on startup, every
+    candidate still Pending or Processing is queued again. Failed attempts
+    are retried with backoff up to RESUME_MAX_ATTEMPTS times. With several
+    workers, each processes the resumes uploaded to it and only the leader
+    recovers unfinished ones.
+    """
+    def __init__(self, workers=RESUME_WORKERS, processes=RESUME_PROCESSES):
+        self.workers = workers
+        self.processes = processes
+        self.active = set()
+        # Step in progress (checksum, scan or extract) per active candidate.
+        self.steps = {}
+        self._queue = None
+        self._queued = {}
+        self._tasks = []
+        self._retries = set()
+        self._pool = None
+
+    async def start(self, recover=True):
+        """Start the workers and, with `recover`, queue every unfinished candidate."""
+        if self.workers <= 0:
+            return
+        self._queue = asyncio.Queue()
+        if self.processes > 0:
+            # Spawned rather than forked: the server process runs threads.
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if not recover:
+            return
+        db = get_database()
+        cursor = db.candidates.find({"processing_status": {"$in": UNFINISHED}}, {"_id": 1}).sort("applied_at", 1)
+        async for candidate in cursor:
+            self.submit(str(candidate["_id"]))
+        if self._queued:
+            print(f"Resumed processing of {len(self._queued)} resumes")
+
+    async def stop(self):
+        """Stop the workers; unfinished resumes are picked up on the next start."""
+        for task in self._tasks + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks, self._retries = [], set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._queue = None
+        self._queued.clear()
+        self.active.clear()
+        self.steps.clear()
+
+    def submit(self, candidate_id: str):
+        """Queue a candidate's resume unless it is already queued or running."""
+        if self._queue is None or candidate_id in self._queued or candidate_id in self.active:
+            return
+        self._queued[candidate_id] = None
+        self._queue.put_nowait(candidate_id)
+
+    def status(self, candidate_id: str) -> Optional[str]:
+        """Processing while this process is processing the resume; None otherwise."""
+        return ProcessingStatus.PROCESSING.value if candidate_id in self.active else None
+
+    def step(self, candidate_id: str) -> Optional[str]:
+        """The step a candidate's resume is at, if this process is processing it."""
+        return self.steps.get(candidate_id)
+
+    def position(self, candidate_id: str) -> Optional[int]:
+        """Position of a candidate in the queue (0 is next), or None if not queued."""
+        if candidate_id not in self._queued:
+            return None
+        return list(self._queued).index(candidate_id)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queued)
+
+    async def _worker(self):
+        while True:
+            candidate_id = await self._queue.get()
+            self._queued.pop(candidate_id, None)
+            self.active.add(candidate_id)
+            try:
+                await self._process(candidate_id)
+            except Exception as exc:
+                print(f"Resume processing crashed for candidate {candidate_id}: {exc}")
+            finally:
+                self.active.discard(candidate_id)
+                self.steps.pop(candidate_id, None)
+
+    async def _run(self, func, *args):
+        """Run a CPU-bound function in the process pool, or a thread without one."""
+        if self._pool is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def _retry_later(self, candidate_id: str, delay: float):
+        await asyncio.sleep(delay)
+        self.submit(candidate_id)
+
+    async def _process(self, candidate_id: str):
+        db = get_database()
+        query = {"_id": ObjectId(candidate_id)}
+        candidate = await db.candidates.find_one(query)
+        if candidate is None or candidate.get("processing_status") not in UNFINISHED:
+            return
+
+        async def update(**fields):
+            await db.candidates.update_one(query, {"$set": fields})
+
+        # Only the outcome of a run is saved, in a single write; while it
+        # runs, the candidate stays Pending on disk and its step is kept
+        # in memory.
+        attempts = candidate.get("processing_attempts", 0) + 1
+        path = candidate["resume_path"]
+        checksum = candidate.get("resume_checksum")
+        try:
+            self.steps[candidate_id] = "checksum"
+            # Computed at upload for content-addressed files.
+            checksum = checksum or await self._run(file_checksum, path)
+            self.steps[candidate_id] = "scan"
+            for hook in scan_hooks:
+                reason = await hook(path)
+                if reason:
+                    await update(
+                        processing_status=ProcessingStatus.QUARANTINED.value,
+                        processing_attempts=attempts,
+                        processing_error=reason,
+                        resume_checksum=checksum,
+                        processed_at=datetime.utcnow()
+                    )
+                    return
+            self.steps[candidate_id] = "extract"
+            text_path = uploads.text_path(path)
+            text_length = await self._run(extract_text_to_file, path, text_path)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            print(f"Resume processing attempt {attempts} failed for candidate {candidate_id}: {error}")
+            if attempts >= RESUME_MAX_ATTEMPTS:
+                await update(
+                    processing_status=ProcessingStatus.FAILED.value,
+                    processing_attempts=attempts,
+                    processing_error=error,
+                    resume_checksum=checksum,
+                    processed_at=datetime.utcnow()
+                )
+            else:
+                await update(
+                    processing_status=ProcessingStatus.PENDING.value,
+                    processing_attempts=attempts,
+                    processing_error=error,
+                    resume_checksum=checksum
+                )
+                retry = asyncio.create_task(self._retry_later(candidate_id, 2 ** attempts))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+            return
+        await update(
+            processing_status=ProcessingStatus.COMPLETED.value,
+            processing_attempts=attempts,
+            processing_error=None,
+            resume_checksum=checksum,
+            resume_text_path=text_path,
+            resume_text_length=text_length,
+            processed_at=datetime.utcnow()
+        )
+
+
+resume_queue = ResumeQueue()
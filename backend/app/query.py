@@ -0,0 +1,139 @@
+"""Evaluation of MongoDB-style queries and updates against plain documents."""
+import re
+from functools import lru_cache
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+
+
+def matches(doc, query):
+    """Whether a document satisfies every condition of the query."""
+    for key, value in query.items():
+        if isinstance(value, dict):
+            if not _matches_operators(doc, key, value):
+                return False
+        elif key == "_id":
+            if str(doc.get("_id")) != str(value):
+                return False
+        elif doc.get(key) != value:
+            return False
+    return True
+
+
+def update_fields(doc, update):
+    """
+    The fields an update sets on a document.
+
+    `$set` fields are taken as they are and each `$push` becomes the field's
+    new list, so the result can be applied, logged and published as a set.
+    """
+    fields = update.get("$set", {})
+    if "$push" in update:
+        fields = dict(fields)
+        for key, value in update["$push"].items():
+            fields[key] = list(doc.get(key) or []) + [value]
+    return fields
+
+
+def sort_spec(key, order=1):
+    """Normalize pymongo-style sort arguments to a list of (field, order)."""
+    if isinstance(key, (list, tuple)):
+        return [(field, direction) for field, direction in key]
+    return [(key, order)]
+
+
+class _Descending:
+    """Sort value wrapper that inverts ordering, for mixed-direction sorts."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def sort_key(sort, values, doc_id):
+    """
+    Comparable key for a document's sort values under a sort spec.
+
+    The string id is appended as a tie-breaker so the order is total, which
+    keyset paging needs. Fields sorted against the first field's direction
+    are inverted, so a single comparison in that direction covers them all.
+    """
+    if not sort:
+        return ("", doc_id)
+    primary = sort[0][1]
+    key = tuple(
+        value if order == primary else _Descending(value)
+        for value, (_, order) in zip(values, sort)
+    )
+    return key + (doc_id,)
+
+
+def regex_prefix(condition, ignore_case=False):
+    """
+    The literal prefix a `$regex` condition is anchored to, or None.
+
+    Only patterns of the form `^literal` qualify, and only case-sensitive
+    ones unless `ignore_case` is set, since those are the ones an ordered
+    index can answer with a range scan.
+    """
+    pattern = condition.get("$regex")
+    options = condition.get("$options", "")
+    if not isinstance(pattern, str) or not pattern.startswith("^"):
+        return None
+    if options and (options != "i" or not ignore_case):
+        return None
+    literal = re.sub(r"\\(.)", r"\1", pattern[1:])
+    if re.escape(literal) != pattern[1:]:
+        return None
+    return literal
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern, options):
+    flags = re.IGNORECASE if "i" in options else 0
+    return re.compile(pattern, flags)
+
+
+def _compare(actual, operator, operand):
+    # Like MongoDB, missing values and values of another type never match.
+    if actual is None:
+        return False
+    try:
+        if operator == "$gt":
+            return actual > operand
+        if operator == "$gte":
+            return actual >= operand
+        if operator == "$lt":
+            return actual < operand
+        return actual <= operand
+    except TypeError:
+        return False
+
+
+def _matches_operators(doc, key, operators):
+    actual = doc.get(key)
+    for operator, operand in operators.items():
+        if operator == "$in":
+            if key == "_id":
+                if str(actual) not in {str(v) for v in operand}:
+                    return False
+            elif actual not in operand:
+                return False
+        elif operator in RANGE_OPERATORS:
+            if not _compare(actual, operator, operand):
+                return False
+        elif operator == "$regex":
+            if not isinstance(actual, str):
+                return False
+            if not _compile(operand, operators.get("$options", "")).search(actual):
+                return False
+        elif operator == "$options":
+            continue
+        else:
+            raise ValueError(f"Unsupported query operator: {operator}")
+    return True
@@ -0,0 +1,186 @@
+"""Compact slot-based documents for the in-memory database."""
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_datetime(value):
+    # Timestamps are stored naive in UTC; anything else is kept as is so it
+    # reads back unchanged.
+    if type(value) is datetime and value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND
+    return value
+
+
+def _decode_datetime(value):
+    if type(value) is int:
+        return _EPOCH + timedelta(microseconds=value)
+    return value
+
+
+def _encode_object_id(value):
+    if isinstance(value, ObjectId):
+        return value.binary
+    # Ids read back from data.json are hex strings of the original ObjectIds.
+    if type(value) is str and len(value) == 24:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _decode_object_id(value):
+    if type(value) is bytes:
+        return ObjectId(value)
+    return value
+
+
+def _encode_interned(value):
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def _identity(value):
+    return value
+
+
+class Record(MutableMapping):
+    """
+    Mapping over a fixed set of slots, used in place of a document dict.
+
+    Subclasses are built by `record_type`. Declared fields live in slots
+    and are encoded on the way in and decoded on the way out, so readers
+    see the same values a dict would hold; any other field goes into a
+    per-record overflow dict.
+    """
+    __slots__ = ("_extra",)
+    # Field name -> (slot descriptor, encoder, decoder or None).
+    _fields = {}
+
+    def __init__(self, doc=()):
+        self._extra = None
+        fields = self._fields
+        for key, value in (doc.items() if hasattr(doc, "items") else doc):
+            field = fields.get(key)
+            if field is None:
+                self[key] = value
+            else:
+                field[0].__set__(self, field[1](value))
+
+    def __getitem__(self, key):
+        field = self._fields.get(key)
+        if field is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        try:
+            value = field[0].__get__(self)
+        except AttributeError:
+            raise KeyError(key) from None
+        return value if field[2] is None else field[2](value)
+
+    def get(self, key, default=None):
+        # Inlined rather than going through __getitem__: this is the hot
+        # path of query matching and index maintenance.
+        field = self._fields.get(key)
+        if field is None:
+            return default if self._extra is None else self._extra.get(key, default)
+        try:
+            value = field[0].__get__(self)
+        except AttributeError:
+            return default
+        return value if field[2] is None else field[2](value)
+
+    def encoded(self, key, default=None):
+        """A field's value in its stored form, as produced by `encoder`."""
+        field = self._fields.get(key)
+        if field is None:
+            return default if self._extra is None else self._extra.get(key, default)
+        try:
+            return field[0].__get__(self)
+        except AttributeError:
+            return default
+
+    @classmethod
+    def encoder(cls, key):
+        """The function converting a field's values to their stored form."""
+        field = cls._fields.get(key)
+        return _identity if field is None else field[1]
+
+    def __setitem__(self, key, value):
+        field = self._fields.get(key)
+        if field is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            field[0].__set__(self, field[1](value))
+
+    def __delitem__(self, key):
+        field = self._fields.get(key)
+        if field is None:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+            if not self._extra:
+                self._extra = None
+            return
+        try:
+            field[0].__delete__(self)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key, field in self._fields.items():
+            try:
+                field[0].__get__(self)
+            except AttributeError:
+                continue
+            yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Return the document as a plain dict, like `dict.copy`."""
+        return dict(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+def record_type(name, fields, datetimes=(), object_ids=("_id",), interned=()):
+    """
+    Build a Record subclass with a slot per field.
+
+    - **datetimes**: fields holding naive datetimes, stored as microseconds
+      since the epoch
+    - **object_ids**: fields holding ObjectIds, stored as their 12 bytes
+    - **interned**: string fields with few distinct values, such as
+      statuses and foreign keys, stored as one shared string per value
+    """
+    # Slots are numbered rather than named after fields so a field can never
+    # shadow a mapping method such as `items` or `get`.
+    slots = tuple(f"_f{i}" for i in range(len(fields)))
+    cls = type(name, (Record,), {"__slots__": slots})
+    cls._fields = {}
+    for field, slot in zip(fields, slots):
+        if field in datetimes:
+            codec = (_encode_datetime, _decode_datetime)
+        elif field in object_ids:
+            codec = (_encode_object_id, _decode_object_id)
+        elif field in interned:
+            codec = (_encode_interned, None)
+        else:
+            codec = (_identity, None)
+        cls._fields[field] = (getattr(cls, slot),) + codec
+    return cls
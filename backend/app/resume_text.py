@@ -0,0 +1,99 @@
+"""
+CPU-bound resume analysis: checksums and plain-text extraction.
+
+These functions only take and return plain values so they can run in a
+process pool. Extraction is best effort and uses the standard library only:
+text operators of PDF content streams, the document XML of .docx files and
+printable runs of legacy .doc files.
+"""
+import hashlib
+import html
+import os
+import re
+import tempfile
+import zipfile
+import zlib
+
+CHUNK_SIZE = 1024 * 1024
+# Stop extracting once this much text has been found.
+MAX_TEXT_LENGTH = 1024 * 1024
+
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT = re.compile(rb"\((?:\\.|[^\\)])*\)\s*Tj|\[(?:\\.|[^\]\\])*\]\s*TJ|T\*|ET|\d\s+Td")
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+_PDF_ESCAPE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3})")
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+_XML_TAG = re.compile(r"<[^>]+>")
+_PRINTABLE = re.compile(rb"[\x20-\x7e]{4,}")
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _unescape_pdf(raw: bytes) -> bytes:
+    def replace(match):
+        escape = match.group(1)
+        if escape[:1].isdigit():
+            return bytes([int(escape, 8) & 0xFF])
+        return _PDF_ESCAPES.get(escape, escape)
+    return _PDF_ESCAPE.sub(replace, raw)
+
+
+def _pdf_text(data: bytes) -> str:
+    parts = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompress(stream)
+        except zlib.error:
+            # Not Flate-compressed; other filters hold no readable text.
+            pass
+        for op in _PDF_TEXT.finditer(stream):
+            token = op.group(0)
+            if token.endswith((b"Tj", b"TJ")):
+                parts.extend(_unescape_pdf(s) for s in _PDF_STRING.findall(token))
+            elif not parts or parts[-1] != b"\n":
+                parts.append(b"\n")
+    return b"".join(parts).decode("latin-1")
+
+
+def _docx_text(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", errors="replace")
+    xml = xml.replace("</w:p>", "\n").replace("<w:tab/>", "\t")
+    return html.unescape(_XML_TAG.sub("", xml))
+
+
+def extract_text(path: str) -> str:
+    """Best-effort plain text of a PDF, DOCX or DOC resume."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".docx":
+        text = _docx_text(path)
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+        if ext == ".pdf" or data.startswith(b"%PDF"):
+            text = _pdf_text(data)
+        else:
+            text = "\n".join(run.decode("ascii") for run in _PRINTABLE.findall(data))
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text).strip()
+    return text[:MAX_TEXT_LENGTH]
+
+
+def extract_text_to_file(path: str, text_path: str) -> int:
+    """Write the extracted text of a resume next to it; returns its length."""
+    text = extract_text(path)
+    # A unique temporary name: candidates sharing a resume may be processed
+    # at the same time.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(text_path), suffix=".part")
+    with open(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, text_path)
+    return len(text)
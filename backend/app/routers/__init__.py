@@ -1,2 +1,2 @@
 # Routers package
-from app.routers import jobs, candidates
+from app.routers import jobs, candidates, stats, analytics
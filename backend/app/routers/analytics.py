@@ -0,0 +1,105 @@
+"""Hiring-funnel analytics routes for the HR dashboard."""
+import time
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from bson import ObjectId
+
+from app.analytics import STAGES, Funnel, build_funnels, funnel_index
+from app.database import get_database
+from app.models.analytics import FunnelRebuildResponse, FunnelResponse
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+DAY = 24 * 60 * 60
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole > 0 else None
+
+
+def _days(seconds: Optional[int]) -> Optional[float]:
+    return None if seconds is None else round(seconds / DAY, 2)
+
+
+def funnel_response(funnel: Funnel, job_id: Optional[str] = None, department: Optional[str] = None) -> dict:
+    """Build the API response of a funnel."""
+    stages = []
+    for index, stage in enumerate(STAGES):
+        stages.append({
+            "status": stage,
+            "reached": funnel.reached[index],
+            "rejected": funnel.rejected[index],
+            "conversion": _rate(funnel.reached[index], funnel.reached[index - 1]) if index else None
+        })
+    return {
+        "job_id": job_id,
+        "department": department,
+        "total_candidates": funnel.total,
+        "selection_rate": _rate(funnel.reached[-1], funnel.total),
+        "stages": stages,
+        "time_to_select": {
+            "selected": len(funnel.durations),
+            "median_days": _days(funnel.percentile(0.5)),
+            "p90_days": _days(funnel.percentile(0.9))
+        }
+    }
+
+
+@router.get("/funnel", response_model=FunnelResponse)
+async def get_funnel(
+    job_id: Optional[str] = Query(None, description="Funnel of this job"),
+    department: Optional[str] = Query(None, description="Funnel of the jobs of this department")
+):
+    """
+    Get the hiring funnel of all candidates, a job or a department (HR only).
+
+    Each stage counts the candidates who reached it or a later one, those
+    rejected after reaching it and the conversion from the previous stage.
+    Also reports the median and 90th percentile time from application to
+    selection. Figures come from aggregates kept current as candidates
+    change, so no candidates are read.
+    """
+    if job_id is not None and department is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give either job_id or department"
+        )
+
+    if job_id is not None:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid job ID format"
+            )
+        job = await get_database().jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+
+    return funnel_response(funnel_index.funnel(job_id, department), job_id, department)
+
+
+@router.get("/funnel/departments", response_model=List[FunnelResponse])
+async def get_department_funnels():
+    """Get the hiring funnel of every department with candidates (HR only)."""
+    return [
+        funnel_response(funnel, department=department)
+        for department, funnel in funnel_index.departments().items()
+    ]
+
+
+@router.post("/funnel/rebuild", response_model=FunnelRebuildResponse)
+async def rebuild_funnels():
+    """
+    Recompute the funnels from every candidate's status history (HR only).
+
+    Funnels are built on startup and then kept current, so this is only
+    needed after candidates were changed outside the API, such as a
+    backfill written straight to the database. Changes made meanwhile may
+    be miscounted; run it while the data is idle.
+    """
+    started = time.perf_counter()
+    candidates = await build_funnels(get_database())
+    return {"candidates": candidates, "seconds": round(time.perf_counter() - started, 3)}
@@ -1,23 +1,90 @@
 """Candidate routes for job application and management."""
 import os
-import uuid
-from datetime import datetime
-from typing import List
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends, Query, Request, Response
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
+from app.analytics import from_timestamp, history_entry, history_of
+from app.config import FAST_JSON, UPLOAD_DIR
 from app.database import get_database
-from app.models.candidate import CandidateStatus, CandidateStatusUpdate, CandidateResponse
+from app.pagination import PageParams, paginate, parse_sort, next_cursor_headers
+from app.serialization import FastJSONResponse
+from app.downloads import MEDIA_TYPES, archive_name, file_response, zip_response
+from app.exports import EXPORT_CONTENT, export_response, iterate
+from app.imports import CandidateImporter, guess_format
+from app.uploads import store_upload, unpin, release, collect_garbage
+from app.models.candidate import (
+    CandidateStatus,
+    CandidateStatusUpdate,
+    CandidateBulkStatusUpdate,
+    CandidateResponse,
+    ProcessingStatus,
+    ResumeProcessingResponse,
+    ResumeGCResponse,
+    StatusHistoryResponse,
+)
+from app.processing import resume_queue
+from app.models.bulk import BulkResponse, FileFormat, ImportReport
 
 router = APIRouter(tags=["Candidates"])
 
 # Directory for storing uploaded resumes
-UPLOAD_DIR = "uploads/resumes"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # Allowed file extensions for resume upload
 ALLOWED_EXTENSIONS = {".pdf", ".doc", ".docx"}
 
+# Fields not needed to build list responses, left out when the database
+# can apply a projection.
+LIST_PROJECTION = {"resume_path": 0, "status_history": 0}
+
+# Columns of candidate exports, in order.
+EXPORT_COLUMNS = list(CandidateResponse.model_fields)
+
+# Fields candidate lists can be sorted by.
+SORT_FIELDS = {"applied_at", "updated_at", "name", "email", "status"}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert a timestamp to naive UTC, the form candidate dates are stored in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class CandidateFilters:
+    """Common filter and sort query parameters for candidate lists."""
+    def __init__(
+        self,
+        candidate_status: Optional[List[CandidateStatus]] = Query(
+            None, alias="status", description="Only candidates with one of these statuses"
+        ),
+        applied_from: Optional[datetime] = Query(None, description="Applied at or after this time"),
+        applied_to: Optional[datetime] = Query(None, description="Applied at or before this time"),
+        name: Optional[str] = Query(None, description="Case-insensitive name prefix"),
+        email: Optional[str] = Query(None, description="Case-insensitive email prefix"),
+        sort: Optional[str] = Query(
+            None, description="Comma-separated sort fields, prefixed with - for descending (default -applied_at)"
+        )
+    ):
+        self.query = {}
+        if candidate_status:
+            self.query["status"] = {"$in": [s.value for s in candidate_status]}
+        applied_at = {}
+        if applied_from:
+            applied_at["$gte"] = _naive_utc(applied_from)
+        if applied_to:
+            applied_at["$lte"] = _naive_utc(applied_to)
+        if applied_at:
+            self.query["applied_at"] = applied_at
+        for field, prefix in (("name", name), ("email", email)):
+            if prefix:
+                self.query[field] = {"$regex": "^" + re.escape(prefix), "$options": "i"}
+        self.sort = parse_sort(sort, SORT_FIELDS, "-applied_at")
+
 
 def candidate_helper(candidate: dict) -> dict:
     """Convert MongoDB candidate document to response format."""
@@ -30,10 +97,24 @@ def candidate_helper(candidate: dict) -> dict:
         "resume_filename": candidate.get("resume_filename"),
         "status": candidate["status"],
         "applied_at": candidate["applied_at"],
-        "updated_at": candidate["updated_at"]
+        "updated_at": candidate["updated_at"],
+        "processing_status": candidate.get("processing_status")
     }
 
 
+def list_response(response: Response, candidates: list, headers: dict):
+    """
+    Return a candidate list with extra headers.
+    
+    With FAST_JSON the list is encoded directly: `candidate_helper` output
+    already matches CandidateResponse, so validating it again is skipped.
+    """
+    if FAST_JSON:
+        return FastJSONResponse(candidates, headers=headers)
+    response.headers.update(headers)
+    return candidates
+
+
 def validate_file_extension(filename: str) -> bool:
     """Validate that the file has an allowed extension."""
     ext = os.path.splitext(filename)[1].lower()
@@ -106,40 +187,139 @@ async def apply_for_job(
             detail="You have already applied for this job"
         )
     
-    # Save resume file
-    file_ext = os.path.splitext(resume.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    with open(file_path, "wb") as f:
-        content = await resume.read()
-        f.write(content)
+    # Save resume file, shared with any earlier upload of the same content
+    stored = await store_upload(resume, os.path.splitext(resume.filename)[1])
     
     # Create candidate document
+    now = datetime.utcnow()
     candidate_data = {
         "name": name,
         "email": email,
         "phone": phone,
         "job_id": job_id,
         "resume_filename": resume.filename,
-        "resume_path": file_path,
+        "resume_path": stored.path,
+        "resume_checksum": stored.checksum,
         "status": CandidateStatus.APPLIED.value,
-        "applied_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "status_history": [history_entry(CandidateStatus.APPLIED.value, now)],
+        "applied_at": now,
+        "updated_at": now,
+        "processing_status": ProcessingStatus.PENDING.value
     }
     
-    result = await db.candidates.insert_one(candidate_data)
+    try:
+        result = await db.candidates.insert_one(candidate_data)
+    except DuplicateKeyError:
+        # A concurrent application for the same job won the race.
+        unpin(stored.path)
+        await release(db, stored.path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already applied for this job"
+        )
+    unpin(stored.path)
+    
+    # The job may have been deleted while the resume was uploading, after
+    # its candidates were cleaned up.
+    if not await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1}):
+        await db.candidates.delete_one({"_id": result.inserted_id})
+        await release(db, stored.path)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
     created_candidate = await db.candidates.find_one({"_id": result.inserted_id})
+    # Checksum, virus scan and text extraction happen in the background.
+    resume_queue.submit(str(result.inserted_id))
     
     return candidate_helper(created_candidate)
 
 
+@router.post("/candidates/import", response_model=ImportReport)
+async def import_candidates(
+    file: UploadFile = File(..., description="CSV or NDJSON file, optionally gzipped"),
+    file_format: Optional[FileFormat] = Query(None, alias="format", description="csv or ndjson; by default from the file name"),
+    job_id: Optional[str] = Query(None, description="Job of rows without a job_id")
+):
+    """
+    Import past applications from a CSV or NDJSON file (HR only).
+    
+    Rows have `name`, `email`, `phone` and `job_id`, plus optional `status`,
+    `applied_at` and `updated_at`. Candidates are imported without resumes;
+    rows for unknown jobs or repeating an application are reported. Rows
+    are validated and saved in batches of IMPORT_BATCH_SIZE with one write
+    each. Returns the row counts, the first errors with their line numbers
+    and the throughput.
+    """
+    if job_id is not None and not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    file_format = file_format or guess_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the file format; pass format=csv or format=ndjson"
+        )
+    return await CandidateImporter(get_database(), job_id=job_id).run(file.file, file_format)
+
+
+@router.get(
+    "/candidates/export",
+    response_class=Response,
+    responses={200: {"content": EXPORT_CONTENT, "description": "Candidates as CSV or NDJSON"}}
+)
+async def export_candidates(
+    file_format: FileFormat = Query(FileFormat.CSV, alias="format", description="csv or ndjson"),
+    job_id: Optional[str] = Query(None, description="Only candidates for this job"),
+    compress: bool = Query(False, alias="gzip", description="Gzip the file"),
+    filters: CandidateFilters = Depends()
+):
+    """
+    Export candidates as CSV or NDJSON (HR only).
+    
+    Accepts the candidate list filters and sort. Rows are streamed as they
+    are read, a page of documents at a time, so the download starts at once
+    and memory use does not grow with the number of candidates.
+    """
+    query = dict(filters.query)
+    if job_id is not None:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid job ID format"
+            )
+        query["job_id"] = job_id
+    db = get_database()
+    return export_response(
+        iterate(db.candidates, query, filters.sort, LIST_PROJECTION),
+        candidate_helper,
+        file_format,
+        EXPORT_COLUMNS,
+        "candidates",
+        compress
+    )
+
+
 @router.get("/candidates/{job_id}", response_model=List[CandidateResponse])
-async def get_candidates_by_job(job_id: str):
+async def get_candidates_by_job(
+    job_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    filters: CandidateFilters = Depends()
+):
     """
     Get all candidates for a specific job (HR only).
     
     - **job_id**: The unique job identifier
+    - **status**: Optional statuses to include (repeat the parameter for several)
+    - **applied_from**, **applied_to**: Optional application date range
+    - **name**, **email**: Optional case-insensitive prefixes
+    - **sort**: Sort fields, e.g. `-updated_at` or `name,-applied_at`
+    - **limit**, **skip**, **cursor**: Optional pagination (newest first);
+      the next page's cursor is returned in the `X-Next-Cursor` header
     
     Returns a list of all candidates who applied for the job.
     """
@@ -153,7 +333,7 @@ async def get_candidates_by_job(job_id: str):
         )
     
     # Check if job exists
-    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,10 +341,54 @@ async def get_candidates_by_job(job_id: str):
         )
     
     candidates = []
-    async for candidate in db.candidates.find({"job_id": job_id}).sort("applied_at", -1):
+    query = {"job_id": job_id, **filters.query}
+    cursor = db.candidates.find(query, LIST_PROJECTION).sort(filters.sort)
+    async for candidate in paginate(cursor, page, filters.sort):
         candidates.append(candidate_helper(candidate))
     
-    return candidates
+    return list_response(response, candidates, next_cursor_headers(candidates, filters.sort, page))
+
+
+@router.get(
+    "/candidates/{job_id}/resumes",
+    response_class=Response,
+    responses={200: {"content": {"application/zip": {}}, "description": "ZIP archive of resumes"}}
+)
+async def download_job_resumes(job_id: str, filters: CandidateFilters = Depends()):
+    """
+    Download the resumes of a job's candidates as a ZIP archive (HR only).
+    
+    - **job_id**: The unique job identifier
+    - **status**, **applied_from**, **applied_to**, **name**, **email**, **sort**:
+      Optional candidate filters, as for the candidate list
+    
+    The archive is streamed as it is written. Quarantined resumes are left out.
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    entries = []
+    query = {"job_id": job_id, **filters.query}
+    async for candidate in db.candidates.find(query).sort(filters.sort):
+        path = candidate.get("resume_path")
+        if not path or candidate.get("processing_status") == ProcessingStatus.QUARANTINED.value:
+            continue
+        filename = candidate.get("resume_filename") or os.path.basename(path)
+        entries.append((archive_name(candidate["name"], str(candidate["_id"]), filename), path))
+    
+    return zip_response(entries, f"resumes-{job_id}.zip")
 
 
 @router.put("/candidate/status/{candidate_id}", response_model=CandidateResponse)
@@ -177,6 +401,8 @@ async def update_candidate_status(candidate_id: str, status_update: CandidateSta
     
     Valid status transitions:
     - Applied → Shortlisted → Interview → Selected/Rejected
+    
+    Each change is recorded in the candidate's status history.
     """
     db = get_database()
     
@@ -195,35 +421,111 @@ async def update_candidate_status(candidate_id: str, status_update: CandidateSta
             detail="Candidate not found"
         )
     
-    # Update candidate status
-    await db.candidates.update_one(
-        {"_id": ObjectId(candidate_id)},
-        {
-            "$set": {
-                "status": status_update.status.value,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    if candidate["status"] == status_update.status.value:
+        return candidate_helper(candidate)
+    
+    # Update candidate status, recording the change in its history
+    now = datetime.utcnow()
+    change = history_entry(status_update.status.value, now)
+    update = {"$set": {"status": status_update.status.value, "updated_at": now}}
+    if candidate.get("status_history"):
+        update["$push"] = {"status_history": change}
+    else:
+        update["$set"]["status_history"] = history_of(candidate) + [change]
+    await db.candidates.update_one({"_id": ObjectId(candidate_id)}, update)
     
     updated_candidate = await db.candidates.find_one({"_id": ObjectId(candidate_id)})
     return candidate_helper(updated_candidate)
 
 
+@router.put("/candidates/status", response_model=BulkResponse)
+async def bulk_update_candidate_status(bulk_update: CandidateBulkStatusUpdate):
+    """
+    Update the status of several candidates at once (HR only).
+    
+    - **candidate_ids**: IDs of the candidates to update
+    - **status**: New status applied to every candidate
+    
+    Status changes are appended to the candidates' histories and saved in
+    a single write; candidates saved before histories were kept have
+    theirs written one at a time, and those already in the status are
+    left as they are. Returns a result per ID.
+    """
+    db = get_database()
+    new_status = bulk_update.status.value
+    
+    valid_ids = [ObjectId(i) for i in bulk_update.candidate_ids if ObjectId.is_valid(i)]
+    existing = set()
+    changed, legacy = [], []
+    projection = {"status": 1, "status_history": 1, "applied_at": 1, "updated_at": 1}
+    async for candidate in db.candidates.find({"_id": {"$in": valid_ids}}, projection):
+        existing.add(str(candidate["_id"]))
+        if candidate["status"] == new_status:
+            continue
+        if candidate.get("status_history"):
+            changed.append(candidate["_id"])
+        else:
+            legacy.append(candidate)
+    
+    now = datetime.utcnow()
+    change = history_entry(new_status, now)
+    if changed:
+        await db.candidates.update_many(
+            {"_id": {"$in": changed}},
+            {
+                "$set": {"status": new_status, "updated_at": now},
+                "$push": {"status_history": change}
+            }
+        )
+    for candidate in legacy:
+        await db.candidates.update_one(
+            {"_id": candidate["_id"]},
+            {"$set": {"status": new_status, "updated_at": now, "status_history": history_of(candidate) + [change]}}
+        )
+    
+    results = []
+    for index, candidate_id in enumerate(bulk_update.candidate_ids):
+        if not ObjectId.is_valid(candidate_id):
+            error = "Invalid candidate ID format"
+        elif candidate_id not in existing:
+            error = "Candidate not found"
+        else:
+            error = None
+        results.append({
+            "index": index,
+            "id": candidate_id,
+            "success": error is None,
+            "error": error
+        })
+    
+    succeeded = sum(1 for result in results if result["success"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
 @router.get("/candidates", response_model=List[CandidateResponse])
-async def get_all_candidates():
+async def get_all_candidates(
+    response: Response,
+    page: PageParams = Depends(),
+    filters: CandidateFilters = Depends()
+):
     """
     Get all candidates across all jobs (HR only).
     
+    - **status**, **applied_from**, **applied_to**, **name**, **email**, **sort**:
+      Optional filters and sort order, as for a single job
+    - **limit**, **skip**, **cursor**: Optional pagination (newest first);
+      the next page's cursor is returned in the `X-Next-Cursor` header
+    
     Returns a list of all candidates.
     """
     db = get_database()
     candidates = []
     
-    async for candidate in db.candidates.find().sort("applied_at", -1):
+    cursor = db.candidates.find(filters.query, LIST_PROJECTION).sort(filters.sort)
+    async for candidate in paginate(cursor, page, filters.sort):
         candidates.append(candidate_helper(candidate))
     
-    return candidates
+    return list_response(response, candidates, next_cursor_headers(candidates, filters.sort, page))
 
 
 @router.get("/candidate/{candidate_id}", response_model=CandidateResponse)
@@ -250,3 +552,167 @@ async def get_candidate(candidate_id: str):
         )
     
     return candidate_helper(candidate)
+
+
+@router.api_route(
+    "/candidate/{candidate_id}/resume",
+    methods=["GET", "HEAD"],
+    response_class=Response,
+    responses={
+        200: {"content": {media: {} for media in MEDIA_TYPES.values()}, "description": "The resume file"},
+        206: {"description": "Requested byte ranges of the resume"},
+        304: {"description": "Not modified"}
+    }
+)
+async def download_resume(candidate_id: str, request: Request):
+    """
+    Download a candidate's resume (HR only).
+    
+    - **candidate_id**: The unique candidate identifier
+    
+    Supports `Range` requests, and `If-None-Match` / `If-Modified-Since`
+    for 304 responses. Quarantined resumes are not served.
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(candidate_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid candidate ID format"
+        )
+    
+    candidate = await db.candidates.find_one({"_id": ObjectId(candidate_id)})
+    
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    if candidate.get("processing_status") == ProcessingStatus.QUARANTINED.value:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Resume was quarantined by the virus scan"
+        )
+    
+    path = candidate.get("resume_path")
+    filename = candidate.get("resume_filename") or os.path.basename(path or "")
+    try:
+        return file_response(request, path, filename, candidate.get("resume_checksum"))
+    except (FileNotFoundError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume file not found"
+        )
+
+
+@router.delete("/candidate/{candidate_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_candidate(candidate_id: str):
+    """
+    Delete a candidate (HR only).
+    
+    - **candidate_id**: The unique candidate identifier
+    
+    The resume file is removed once no other application uses it.
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(candidate_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid candidate ID format"
+        )
+    
+    candidate = await db.candidates.find_one({"_id": ObjectId(candidate_id)})
+    
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    await db.candidates.delete_one({"_id": candidate["_id"]})
+    await release(db, candidate.get("resume_path"))
+    return None
+
+
+@router.post("/resumes/gc", response_model=ResumeGCResponse)
+async def collect_resume_garbage():
+    """
+    Remove stored resume files no candidate refers to (HR only).
+    
+    Files changed within the last RESUME_GC_GRACE seconds are kept, since
+    they may belong to applications still being submitted.
+    """
+    return await collect_garbage(get_database())
+
+
+@router.get("/candidate/{candidate_id}/history", response_model=StatusHistoryResponse)
+async def get_status_history(candidate_id: str):
+    """
+    Get the status changes of a candidate, starting with its application.
+    
+    - **candidate_id**: The unique candidate identifier
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(candidate_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid candidate ID format"
+        )
+    
+    candidate = await db.candidates.find_one({"_id": ObjectId(candidate_id)})
+    
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    return {
+        "candidate_id": candidate_id,
+        "history": [
+            {"status": change_status, "at": from_timestamp(at)}
+            for change_status, at in history_of(candidate)
+        ]
+    }
+
+
+@router.get("/candidate/{candidate_id}/processing", response_model=ResumeProcessingResponse)
+async def get_resume_processing(candidate_id: str):
+    """
+    Get the post-processing progress of a candidate's resume.
+    
+    - **candidate_id**: The unique candidate identifier
+    
+    Resumes are checksummed, virus scanned and have their text extracted
+    in the background after an application.
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(candidate_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid candidate ID format"
+        )
+    
+    candidate = await db.candidates.find_one({"_id": ObjectId(candidate_id)})
+    
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    
+    return {
+        "candidate_id": candidate_id,
+        "status": resume_queue.status(candidate_id) or candidate.get("processing_status"),
+        "step": resume_queue.step(candidate_id),
+        "attempts": candidate.get("processing_attempts", 0),
+        "error": candidate.get("processing_error"),
+        "checksum": candidate.get("resume_checksum"),
+        "text_length": candidate.get("resume_text_length"),
+        "processed_at": candidate.get("processed_at"),
+        "queue_position": resume_queue.position(candidate_id)
+    }
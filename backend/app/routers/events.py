@@ -0,0 +1,91 @@
+"""Server-Sent Events feed of job and candidate changes."""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import EVENTS_HEARTBEAT
+from app.events import ChangeEvent, change_feed
+from app.models.candidate import CandidateResponse
+from app.models.job import JobResponse
+from app.routers.candidates import candidate_helper
+from app.routers.jobs import job_helper
+from app.serialization import dumps
+
+router = APIRouter(tags=["Events"])
+
+HELPERS = {"jobs": job_helper, "candidates": candidate_helper}
+# Fields of an update worth sending; internal ones such as resume paths are left out.
+PUBLIC_FIELDS = {"jobs": set(JobResponse.model_fields), "candidates": set(CandidateResponse.model_fields)}
+
+# Tells clients how long to wait before reconnecting, in milliseconds.
+RETRY_MS = 3000
+
+
+def event_data(event: ChangeEvent) -> Optional[dict]:
+    """The payload of a change event, or None if it has nothing to show."""
+    if event.collection not in HELPERS:
+        return None
+    payload = {"collection": event.collection, "op": event.op, "id": event.id, "job_id": event.job_id}
+    if event.op == "insert":
+        payload["data"] = HELPERS[event.collection](event.data)
+    elif event.op == "update":
+        fields = {k: v for k, v in event.data.items() if k in PUBLIC_FIELDS[event.collection]}
+        if not fields:
+            return None
+        payload["data"] = fields
+    return payload
+
+
+def _message(event_type: str, data, event_id: Optional[str] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event_type}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_events(
+    job_id: Optional[str] = Query(None, description="Only changes to this job and its candidates"),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event, as sent by EventSource"),
+    since: Optional[str] = Query(None, description="Resume after this event id, for clients without the header")
+):
+    """
+    Stream job and candidate changes as Server-Sent Events.
+
+    Each `change` event carries the collection, the operation (insert,
+    update or delete), the document id and job id, and the new document
+    or the updated fields. Clients load the lists once and apply the
+    changes. A client reconnecting with the id of the last event it saw
+    receives what it missed; if those events are no longer available, or
+    it fell too far behind, it gets a `reset` event and should reload.
+    """
+    subscriber, missed, resumed = change_feed.subscribe(job_id, last_event_id or since)
+
+    async def stream():
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            if not resumed:
+                yield _message("reset", {})
+            for event in missed:
+                data = event_data(event)
+                if data is not None:
+                    yield _message("change", data, change_feed.event_id(event))
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # Dropped for falling behind; the client reconnects and resumes.
+                    return
+                data = event_data(event)
+                if data is not None:
+                    yield _message("change", data, change_feed.event_id(event))
+        finally:
+            change_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,14 +1,49 @@
 """Job routes for HR job posting functionality."""
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Body, Query, UploadFile, File
 from bson import ObjectId
+from pydantic import TypeAdapter, ValidationError
 
+from app.cache import CachedResponse, ResponseCache, cached_response
+from app.config import FAST_JSON
 from app.database import get_database
-from app.models.job import JobCreate, JobUpdate, JobResponse, JobStatus
+from app.exports import EXPORT_CONTENT, export_response, iterate
+from app.imports import JobImporter, guess_format
+from app.pagination import PageParams, paginate, next_cursor_headers
+from app.models.job import JobCreate, JobUpdate, JobResponse, JobStatus, JobSearchResponse, JobDeletionResponse
+from app.models.bulk import BulkResponse, FileFormat, ImportReport
+from app.operations import job_deletions
+from app.search import job_index
+from app.serialization import FastJSONResponse, dumps
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
+# Serialized job listings and details, invalidated by any write to jobs.
+_cache = ResponseCache()
+_job_list = TypeAdapter(List[JobResponse])
+
+# Columns of job exports, in order.
+EXPORT_COLUMNS = list(JobResponse.model_fields)
+# Job lists are newest first.
+LIST_SORT = [("created_at", -1)]
+
+
+def deletion_helper(operation: dict) -> dict:
+    """Convert a job deletion operation to response format."""
+    return {
+        "id": str(operation["_id"]),
+        "job_id": operation["job_id"],
+        "status": operation["status"],
+        "total_candidates": operation["total_candidates"],
+        "deleted_candidates": operation["deleted_candidates"],
+        "released_files": operation["released_files"],
+        "started_at": operation["started_at"],
+        "updated_at": operation["updated_at"],
+        "finished_at": operation.get("finished_at"),
+        "error": operation.get("error")
+    }
+
 
 def job_helper(job: dict) -> dict:
     """Convert MongoDB job document to response format."""
@@ -53,32 +88,194 @@ async def create_job(job: JobCreate):
     
     result = await db.jobs.insert_one(job_data)
     created_job = await db.jobs.find_one({"_id": result.inserted_id})
+    job_index.add(created_job)
     
     return job_helper(created_job)
 
 
+@router.post("/bulk", response_model=BulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_jobs_bulk(jobs: List[dict] = Body(..., min_length=1, max_length=1000)):
+    """
+    Import several job postings at once (HR only).
+    
+    Each item has the same fields as a single job posting. Valid items are
+    created in a single write; invalid ones are reported without affecting
+    the rest. Returns a result per item.
+    """
+    db = get_database()
+    
+    results = []
+    valid = []
+    for index, item in enumerate(jobs):
+        try:
+            job = JobCreate.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results.append({"index": index, "success": False, "error": errors})
+            continue
+        now = datetime.utcnow()
+        valid.append((index, {
+            **job.model_dump(),
+            "status": JobStatus.OPEN.value,
+            "created_at": now,
+            "updated_at": now,
+            "created_by": "HR"
+        }))
+    
+    if valid:
+        result = await db.jobs.insert_many([job_data for _, job_data in valid])
+        for (index, job_data), inserted_id in zip(valid, result.inserted_ids):
+            job_index.add({**job_data, "_id": inserted_id})
+            results.append({"index": index, "id": str(inserted_id), "success": True})
+    
+    results.sort(key=lambda r: r["index"])
+    return {"succeeded": len(valid), "failed": len(results) - len(valid), "results": results}
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_jobs(
+    file: UploadFile = File(..., description="CSV or NDJSON file, optionally gzipped"),
+    file_format: Optional[FileFormat] = Query(None, alias="format", description="csv or ndjson; by default from the file name")
+):
+    """
+    Import job postings from a CSV or NDJSON file (HR only).
+    
+    Rows have the fields of a job posting, plus optional `status`,
+    `created_at` and `updated_at`; CSV skills are separated by ";", as in
+    exports. Rows are validated and saved in batches of IMPORT_BATCH_SIZE
+    with one write each. Returns the row counts, the first errors with
+    their line numbers and the throughput.
+    """
+    file_format = file_format or guess_format(file.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the file format; pass format=csv or format=ndjson"
+        )
+    return await JobImporter(get_database()).run(file.file, file_format)
+
+
 @router.get("/", response_model=List[JobResponse])
-async def get_all_jobs():
+async def get_all_jobs(request: Request, page: PageParams = Depends()):
     """
     Get all job postings.
     
+    - **limit**, **skip**, **cursor**: Optional pagination (newest first);
+      the next page's cursor is returned in the `X-Next-Cursor` header
+    
     Returns a list of all jobs (both for HR management and candidate viewing).
+    Responses carry an `ETag`; send it back in `If-None-Match` to get a 304
+    when nothing has changed.
+    """
+    db = get_database()
+    version = await db.jobs.cache_version()
+    key = ("list", page.limit, page.skip, page.cursor)
+    entry = _cache.get(version, key)
+    
+    if entry is None:
+        jobs = []
+        cursor = db.jobs.find().sort(LIST_SORT)
+        async for job in paginate(cursor, page, LIST_SORT):
+            jobs.append(job_helper(job))
+        
+        headers = next_cursor_headers(jobs, LIST_SORT, page)
+        if FAST_JSON:
+            body = dumps(jobs)
+        else:
+            body = _job_list.dump_json(_job_list.validate_python(jobs))
+        entry = CachedResponse(body, headers)
+        _cache.put(version, key, entry)
+    
+    return cached_response(request, entry)
+
+
+@router.get("/search", response_model=JobSearchResponse)
+async def search_jobs(
+    q: Optional[str] = Query(None, max_length=200, description="Words to find in title, skills, department or location"),
+    skills: Optional[str] = Query(None, description="Comma-separated skills the job must all require"),
+    location: Optional[str] = Query(None, description="Exact location"),
+    department: Optional[str] = Query(None, description="Exact department"),
+    job_status: Optional[JobStatus] = Query(None, alias="status", description="Job status"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    skip: int = Query(0, ge=0, le=10000, description="Number of results to skip")
+):
+    """
+    Search job postings.
+    
+    Every word of **q** must match; the last one also matches as a prefix.
+    Results are ranked by where the words match (title, then skills, then
+    department and location) and then newest first. Filters are
+    case-insensitive exact matches. `facets` holds the most common values
+    of each filterable field among all matches.
     """
     db = get_database()
+    
+    filters = {}
+    if skills:
+        filters["skills"] = [skill.strip() for skill in skills.split(",") if skill.strip()]
+    if location:
+        filters["location"] = [location]
+    if department:
+        filters["department"] = [department]
+    if job_status:
+        filters["status"] = [job_status.value]
+    
+    ids, total, facets = job_index.search(q, filters, limit=limit, skip=skip)
+    
     jobs = []
+    if ids:
+        found = {}
+        async for job in db.jobs.find({"_id": {"$in": [ObjectId(job_id) for job_id in ids]}}):
+            found[str(job["_id"])] = job
+        jobs = [job_helper(found[job_id]) for job_id in ids if job_id in found]
     
-    async for job in db.jobs.find().sort("created_at", -1):
-        jobs.append(job_helper(job))
+    results = {"total": total, "results": jobs, "facets": facets}
+    return FastJSONResponse(results) if FAST_JSON else results
+
+
+@router.get(
+    "/export",
+    response_class=Response,
+    responses={200: {"content": EXPORT_CONTENT, "description": "Jobs as CSV or NDJSON"}}
+)
+async def export_jobs(
+    file_format: FileFormat = Query(FileFormat.CSV, alias="format", description="csv or ndjson"),
+    job_status: Optional[JobStatus] = Query(None, alias="status", description="Only jobs with this status"),
+    department: Optional[str] = Query(None, description="Only jobs in this department"),
+    compress: bool = Query(False, alias="gzip", description="Gzip the file")
+):
+    """
+    Export job postings as CSV or NDJSON, newest first.
     
-    return jobs
+    Rows are streamed as they are read, a page of jobs at a time; skills
+    are joined with "; " in CSV.
+    """
+    query = {}
+    if job_status:
+        query["status"] = job_status.value
+    if department:
+        query["department"] = department
+    db = get_database()
+    return export_response(
+        iterate(db.jobs, query, LIST_SORT),
+        job_helper,
+        file_format,
+        EXPORT_COLUMNS,
+        "jobs",
+        compress
+    )
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str):
+async def get_job(job_id: str, request: Request):
     """
     Get a specific job by ID.
     
     - **job_id**: The unique job identifier
+    
+    Supports `If-None-Match` like the job listing.
     """
     db = get_database()
     
@@ -88,15 +285,27 @@ async def get_job(job_id: str):
             detail="Invalid job ID format"
         )
     
-    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    version = await db.jobs.cache_version()
+    key = ("job", job_id)
+    entry = _cache.get(version, key)
     
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    if entry is None:
+        job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+        
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        
+        if FAST_JSON:
+            body = dumps(job_helper(job))
+        else:
+            body = JobResponse(**job_helper(job)).model_dump_json().encode()
+        entry = CachedResponse(body)
+        _cache.put(version, key, entry)
     
-    return job_helper(job)
+    return cached_response(request, entry)
 
 
 @router.put("/{job_id}", response_model=JobResponse)
@@ -124,7 +333,7 @@ async def update_job(job_id: str, job_update: JobUpdate):
         )
     
     # Build update data (only non-None fields)
-    update_data = {k: v for k, v in job_update.model_dump().items() if v is not None}
+    update_data = {k: v for k, v in job_update.model_dump(mode="json").items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
     await db.jobs.update_one(
@@ -133,30 +342,54 @@ async def update_job(job_id: str, job_update: JobUpdate):
     )
     
     updated_job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    job_index.add(updated_job)
     return job_helper(updated_job)
 
 
-@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_job(job_id: str):
+@router.delete("/{job_id}", response_model=JobDeletionResponse, status_code=status.HTTP_202_ACCEPTED)
+async def delete_job(job_id: str, response: Response):
     """
-    Delete a job posting (HR only).
+    Delete a job posting with its candidates and resumes (HR only).
     
     - **job_id**: The unique job identifier
-    """
-    db = get_database()
     
+    The job is removed at once; its candidates and their resume files are
+    deleted in the background. Follow the progress at the URL in the
+    `Location` header.
+    """
     if not ObjectId.is_valid(job_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid job ID format"
         )
     
-    result = await db.jobs.delete_one({"_id": ObjectId(job_id)})
+    operation = await job_deletions.submit(job_id)
     
-    if result.deleted_count == 0:
+    if operation is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
-    return None
+    response.headers["Location"] = f"/api/jobs/{job_id}/deletion"
+    return deletion_helper(operation)
+
+
+@router.get("/{job_id}/deletion", response_model=JobDeletionResponse)
+async def get_job_deletion(job_id: str):
+    """
+    Get the progress of a job's deletion (HR only).
+    
+    - **job_id**: The unique job identifier
+    """
+    db = get_database()
+    
+    operation = await db.operations.find_one({"job_id": job_id})
+    
+    if not operation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No deletion found for this job"
+        )
+    
+    return deletion_helper(operation)
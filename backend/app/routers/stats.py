@@ -0,0 +1,98 @@
+"""Statistics routes for the HR dashboard."""
+from fastapi import APIRouter, HTTPException, status
+from bson import ObjectId
+
+from app.database import get_database
+from app.models.candidate import CandidateStatus, ProcessingStatus
+from app.models.job import JobStatus
+from app.models.stats import StatsResponse, JobStatsResponse, ProcessingStatsResponse
+from app.processing import resume_queue
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get("", response_model=StatsResponse)
+async def get_stats():
+    """
+    Get overall recruitment statistics (HR only).
+    
+    Counts are maintained by the database as jobs and candidates change,
+    so the dashboard does not need to download every record.
+    """
+    db = get_database()
+    
+    candidates_by_status = {}
+    for candidate_status in CandidateStatus:
+        candidates_by_status[candidate_status.value] = await db.candidates.count_documents(
+            {"status": candidate_status.value}
+        )
+    
+    return {
+        "total_jobs": await db.jobs.count_documents({}),
+        "open_jobs": await db.jobs.count_documents({"status": JobStatus.OPEN.value}),
+        "total_candidates": await db.candidates.count_documents({}),
+        "candidates_by_status": candidates_by_status
+    }
+
+
+@router.get("/processing", response_model=ProcessingStatsResponse)
+async def get_processing_stats():
+    """
+    Get resume post-processing progress across all candidates (HR only).
+    
+    Queue figures are for this server process. Resumes being processed
+    are saved as Pending until they are done, so they are moved from
+    Pending to Processing here.
+    """
+    db = get_database()
+    
+    candidates_by_status = {}
+    for processing_status in ProcessingStatus:
+        candidates_by_status[processing_status.value] = await db.candidates.count_documents(
+            {"processing_status": processing_status.value}
+        )
+    active = min(len(resume_queue.active), candidates_by_status[ProcessingStatus.PENDING.value])
+    candidates_by_status[ProcessingStatus.PENDING.value] -= active
+    candidates_by_status[ProcessingStatus.PROCESSING.value] += active
+    
+    return {
+        "queued": resume_queue.queued,
+        "active": len(resume_queue.active),
+        "workers": resume_queue.workers,
+        "candidates_by_status": candidates_by_status
+    }
+
+
+@router.get("/{job_id}", response_model=JobStatsResponse)
+async def get_job_stats(job_id: str):
+    """
+    Get candidate statistics for a specific job (HR only).
+    
+    - **job_id**: The unique job identifier
+    """
+    db = get_database()
+    
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    candidates_by_status = {}
+    for candidate_status in CandidateStatus:
+        candidates_by_status[candidate_status.value] = await db.candidates.count_documents(
+            {"job_id": job_id, "status": candidate_status.value}
+        )
+    
+    return {
+        "job_id": job_id,
+        "total_candidates": await db.candidates.count_documents({"job_id": job_id}),
+        "candidates_by_status": candidates_by_status
+    }
@@ -0,0 +1,392 @@
+"""In-process inverted index for job search and facet counts."""
+import heapq
+import re
+from bisect import bisect_left, insort
+
+from app.database import remote_listeners
+
+# Relative weight of a query term matching each text field.
+FIELD_WEIGHTS = {"job_title": 3, "skills": 2, "department": 1, "location": 1}
+FACET_FIELDS = ("skills", "location", "department", "status")
+MAX_FACET_VALUES = 20
+# Slots of removed jobs are reclaimed once there are more of them than
+# this and than jobs indexed.
+MIN_RECLAIMED_SLOTS = 64
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text):
+    """Split text into lowercase search terms; keeps terms like `c++` and `c#`."""
+    return _TOKEN.findall(text.lower())
+
+
+def _values(job, field):
+    value = job.get(field)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _top_bits(bitmap, count):
+    """Up to `count` set bit positions of a bitmap, highest first."""
+    if count <= 32:
+        bits = []
+        while bitmap and len(bits) < count:
+            bit = bitmap.bit_length() - 1
+            bits.append(bit)
+            bitmap ^= 1 << bit
+        return bits
+    # Clearing bits one at a time copies the whole int each time; for
+    # longer pages, scan its binary representation once instead.
+    digits = bin(bitmap)
+    top = len(digits) - 1
+    bits = []
+    i = digits.find("1", 2)
+    while i != -1 and len(bits) < count:
+        bits.append(top - i)
+        i = digits.find("1", i + 1)
+    return bits
+
+
+def _by_count(item):
+    """Sort key for (value, count) pairs: most common first, then by value."""
+    return -item[1], item[0]
+
+
+def _age(job):
+    """Sort key placing jobs oldest first, ties broken by id."""
+    created_at = job.get("created_at")
+    return (created_at is not None, created_at or 0, str(job["_id"]))
+
+
+def _from_slots(slots, size):
+    """Build a bitmap with the given slot bits set."""
+    buf = bytearray((size + 7) // 8)
+    for slot in slots:
+        buf[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buf, "little")
+
+
+class JobSearchIndex:
+    """
+    Inverted index over job text fields with per-field facets.
+
+    Every job gets a slot number, ordered by `created_at`, and each posting
+    list is a bitmap (a Python int) over slots. Filters and multi-term queries
+    are then bitwise ANDs, facet counts are popcounts, and the newest
+    matches are the highest set bits, so the cost of a query grows with the
+    number of distinct terms and facet values involved rather than with
+    the number of matching jobs.
+
+    Postings are kept per term and weight, where the weight is the sum of
+    FIELD_WEIGHTS of the fields containing the term. Results are ranked by
+    total weight, then newest first. The last query term also matches as a
+    prefix, using a sorted vocabulary, to support search-as-you-type.
+
+    New jobs normally are the newest and take the next slot. A job added
+    out of order, such as an imported one, takes the next slot too, and
+    the slots are renumbered by `created_at` before the next search.
+    Removed jobs leave holes, which are reclaimed by renumbering once they
+    outnumber the jobs indexed.
+    """
+    def __init__(self):
+        self._slots = {}
+        self._ids = []
+        self._entries = {}
+        # Age sort key of each job, and the largest one given a slot.
+        self._ages = {}
+        self._newest = None
+        self._disordered = False
+        self._all = 0
+        self._postings = {}
+        self._vocabulary = []
+        self._facets = {field: {} for field in FACET_FIELDS}
+        self._counts = {field: {} for field in FACET_FIELDS}
+        self._labels = {field: {} for field in FACET_FIELDS}
+        self._ranked = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self.__init__()
+
+    def _analyze(self, job):
+        """Term weights and facet keys of a job, recording facet labels."""
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for value in _values(job, field):
+                for term in set(tokenize(value)):
+                    weights[term] = weights.get(term, 0) + weight
+        facets = []
+        for field in FACET_FIELDS:
+            for value in _values(job, field):
+                key = str(value).lower()
+                self._labels[field][key] = str(value)
+                facets.append((field, key))
+        return weights, facets
+
+    def _slot_for(self, job_id, age):
+        slot = self._slots.get(job_id)
+        if slot is None:
+            slot = self._slots[job_id] = len(self._ids)
+            self._ids.append(job_id)
+            if self._newest is not None and age < self._newest:
+                self._disordered = True
+        else:
+            if self._ages[job_id] != age:
+                self._disordered = True
+            self._unindex(job_id, slot)
+        self._ages[job_id] = age
+        if self._newest is None or age > self._newest:
+            self._newest = age
+        return slot
+
+    def _index(self, job_id, entry):
+        """Record an analyzed job and count its terms and facet values."""
+        weights, facets = entry
+        self._entries[job_id] = entry
+        for term in weights:
+            if term not in self._postings:
+                self._postings[term] = {}
+                insort(self._vocabulary, term)
+        for field, key in facets:
+            counts = self._counts[field]
+            counts[key] = counts.get(key, 0) + 1
+        self._ranked = None
+
+    def add(self, job):
+        """Index a job document, replacing any previous version of it."""
+        job_id = str(job["_id"])
+        slot = self._slot_for(job_id, _age(job))
+        bit = 1 << slot
+        weights, facets = entry = self._analyze(job)
+        self._index(job_id, entry)
+        for term, weight in weights.items():
+            levels = self._postings[term]
+            levels[weight] = levels.get(weight, 0) | bit
+        for field, key in facets:
+            bitmaps = self._facets[field]
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+        self._all |= bit
+
+    def add_many(self, jobs):
+        """
+        Index many jobs at once.
+
+        Setting bits one job at a time copies every affected bitmap per job,
+        so bulk loads collect slots first and build each bitmap once.
+        """
+        postings, facets, slots = {}, {}, []
+        for job in jobs:
+            job_id = str(job["_id"])
+            slot = self._slot_for(job_id, _age(job))
+            slots.append(slot)
+            entry = self._analyze(job)
+            self._index(job_id, entry)
+            for term, weight in entry[0].items():
+                postings.setdefault((term, weight), []).append(slot)
+            for facet in entry[1]:
+                facets.setdefault(facet, []).append(slot)
+        size = len(self._ids)
+        for (term, weight), term_slots in postings.items():
+            levels = self._postings[term]
+            levels[weight] = levels.get(weight, 0) | _from_slots(term_slots, size)
+        for (field, key), facet_slots in facets.items():
+            bitmaps = self._facets[field]
+            bitmaps[key] = bitmaps.get(key, 0) | _from_slots(facet_slots, size)
+        self._all |= _from_slots(slots, size)
+
+    def remove(self, job_id):
+        """Drop a job from the index; unknown ids are ignored."""
+        job_id = str(job_id)
+        slot = self._slots.pop(job_id, None)
+        if slot is not None:
+            self._unindex(job_id, slot)
+            del self._ages[job_id]
+            self._ids[slot] = None
+            holes = len(self._ids) - len(self._entries)
+            if holes > max(len(self._entries), MIN_RECLAIMED_SLOTS):
+                self._renumber()
+
+    def _renumber(self):
+        """Give the indexed jobs consecutive slots, oldest first, and rebuild the bitmaps."""
+        self._ids = sorted(self._entries, key=self._ages.__getitem__)
+        self._slots = {job_id: slot for slot, job_id in enumerate(self._ids)}
+        postings, facets = {}, {}
+        for slot, job_id in enumerate(self._ids):
+            weights, job_facets = self._entries[job_id]
+            for term, weight in weights.items():
+                postings.setdefault((term, weight), []).append(slot)
+            for facet in job_facets:
+                facets.setdefault(facet, []).append(slot)
+        size = len(self._ids)
+        self._postings = {term: {} for term in self._vocabulary}
+        for (term, weight), term_slots in postings.items():
+            self._postings[term][weight] = _from_slots(term_slots, size)
+        self._facets = {field: {} for field in FACET_FIELDS}
+        for (field, key), facet_slots in facets.items():
+            self._facets[field][key] = _from_slots(facet_slots, size)
+        self._all = (1 << size) - 1
+        self._newest = self._ages[self._ids[-1]] if self._ids else None
+        self._disordered = False
+
+    def _unindex(self, job_id, slot):
+        bit = 1 << slot
+        weights, facets = self._entries.pop(job_id)
+        for term, weight in weights.items():
+            levels = self._postings[term]
+            levels[weight] ^= bit
+            if not levels[weight]:
+                del levels[weight]
+                if not levels:
+                    del self._postings[term]
+                    del self._vocabulary[bisect_left(self._vocabulary, term)]
+        for field, key in facets:
+            bitmaps = self._facets[field]
+            bitmaps[key] ^= bit
+            self._counts[field][key] -= 1
+            if not bitmaps[key]:
+                del bitmaps[key]
+                del self._counts[field][key]
+                del self._labels[field][key]
+        self._all ^= bit
+        self._ranked = None
+
+    def _term_levels(self, term, prefix):
+        """Bitmaps of the jobs matching a term, keyed by the weight of the match."""
+        if not prefix:
+            return self._postings.get(term, {})
+        merged = {}
+        start = bisect_left(self._vocabulary, term)
+        for match in self._vocabulary[start:]:
+            if not match.startswith(term):
+                break
+            for weight, bitmap in self._postings[match].items():
+                merged[weight] = merged.get(weight, 0) | bitmap
+        # A job matching several completions counts with its best weight.
+        levels, seen = {}, 0
+        for weight in sorted(merged, reverse=True):
+            bitmap = merged[weight] & ~seen
+            if bitmap:
+                levels[weight] = bitmap
+                seen |= bitmap
+        return levels
+
+    def search(self, q=None, filters=None, limit=20, skip=0):
+        """
+        Rank jobs matching every query term and filter.
+
+        `filters` maps facet fields to lists of accepted values; a job must
+        have all of them. Returns the job ids for the requested page, the
+        total number of matches and the facet counts over all matches.
+        """
+        if self._disordered:
+            self._renumber()
+        matched = self._all
+        for field, values in (filters or {}).items():
+            for value in values:
+                matched &= self._facets[field].get(value.lower(), 0)
+
+        # Split the matches into buckets by total score, one term at a time.
+        buckets = {0: matched}
+        terms = tokenize(q) if q else []
+        for i, term in enumerate(terms):
+            levels = self._term_levels(term, prefix=i == len(terms) - 1)
+            scored = {}
+            for score, bitmap in buckets.items():
+                for weight, level in levels.items():
+                    hits = bitmap & level
+                    if hits:
+                        scored[score + weight] = scored.get(score + weight, 0) | hits
+            buckets = scored
+            if not buckets:
+                break
+
+        matched = 0
+        for bitmap in buckets.values():
+            matched |= bitmap
+
+        page = []
+        wanted = skip + limit
+        for score in sorted(buckets, reverse=True):
+            page.extend(_top_bits(buckets[score], wanted - len(page)))
+            if len(page) == wanted:
+                break
+        ids = [self._ids[slot] for slot in page[skip:]]
+        if matched == self._all:
+            return ids, len(self._entries), self._facet_counts(None, len(self._entries))
+        total = matched.bit_count()
+        return ids, total, self._facet_counts(matched, total)
+
+    def _ranked_facets(self):
+        """Facet values of each field by overall count, most common first."""
+        if self._ranked is None:
+            self._ranked = {
+                field: sorted(counts.items(), key=_by_count) for field, counts in self._counts.items()
+            }
+        return self._ranked
+
+    def _facet_counts(self, matched, total):
+        """
+        The most common values of each facet among the `total` matched
+        jobs, or among all jobs if `matched` is None.
+
+        Small result sets are counted job by job. Otherwise each value's
+        bitmap is intersected with the matches, visiting values from most to
+        least common overall: once a value's overall count drops below the
+        smallest count in the top list, no remaining value can enter it.
+        """
+        ranked = self._ranked_facets()
+        tops = {}
+        if matched is None:
+            tops = {field: values[:MAX_FACET_VALUES] for field, values in ranked.items()}
+        elif total < sum(len(values) for values in ranked.values()):
+            counts = {field: {} for field in FACET_FIELDS}
+            for slot in _top_bits(matched, total):
+                for field, key in self._entries[self._ids[slot]][1]:
+                    counts[field][key] = counts[field].get(key, 0) + 1
+            tops = {
+                field: sorted(values.items(), key=_by_count)[:MAX_FACET_VALUES]
+                for field, values in counts.items()
+            }
+        else:
+            for field, values in ranked.items():
+                bitmaps = self._facets[field]
+                smallest = []
+                for key, overall in values:
+                    if len(smallest) == MAX_FACET_VALUES and overall < smallest[0][0]:
+                        break
+                    count = (bitmaps[key] & matched).bit_count()
+                    if len(smallest) < MAX_FACET_VALUES:
+                        heapq.heappush(smallest, (count, key))
+                    elif count > smallest[0][0]:
+                        heapq.heapreplace(smallest, (count, key))
+                tops[field] = sorted(((key, count) for count, key in smallest if count), key=_by_count)
+        return {
+            field: {self._labels[field][key]: count for key, count in top}
+            for field, top in tops.items()
+        }
+
+
+job_index = JobSearchIndex()
+
+
+def _apply_remote_change(record, doc):
+    """Index job changes made by other server processes."""
+    if record["collection"] != "jobs":
+        return
+    if doc is None:
+        job_index.remove(record["_id"])
+    else:
+        job_index.add(doc)
+
+
+remote_listeners.append(_apply_remote_change)
+
+
+async def build_job_index(db):
+    """Rebuild the job search index from the database, oldest job first."""
+    job_index.clear()
+    job_index.add_many([job async for job in db.jobs.find().sort("created_at", 1)])
@@ -0,0 +1,49 @@
+"""Fast JSON encoding for list responses and persistence (FAST_JSON)."""
+import json
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    # Optional: without it the same output is produced by the json module.
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value) -> bytes:
+    """
+    Encode a value as compact JSON bytes.
+
+    Datetimes are written in ISO 8601, like Pydantic does, and any other
+    value JSON has no type for, such as an ObjectId, as its string form.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def loads(data):
+    """Decode JSON from bytes or a string."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with `dumps`.
+
+    Returning one from an endpoint bypasses its response model, so it is
+    meant for documents already in response shape, such as the output of
+    `candidate_helper`, which would otherwise be validated and encoded
+    field by field.
+    """
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,482 @@
+"""SQLite storage backend."""
+import asyncio
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.database import InsertResult, InsertManyResult, UpdateResult, DeleteResult
+from app.events import change_feed
+from app.query import RANGE_OPERATORS, matches, regex_prefix, sort_key, sort_spec, update_fields
+
+# Fields copied out of each document into indexed columns. Queries, sorts
+# and keyset pagination on these fields run in SQL; anything else is
+# evaluated in Python on the rows SQLite returns.
+COLUMNS = {
+    "jobs": ("status", "created_at"),
+    "candidates": ("job_id", "email", "status", "applied_at", "updated_at", "name", "processing_status",
+                   "resume_path"),
+    "operations": ("job_id", "status")
+}
+
+INDEXES = [
+    ("jobs", ("status",), False),
+    ("jobs", ("created_at", "_id"), False),
+    ("candidates", ("job_id", "applied_at", "_id"), False),
+    ("candidates", ("job_id", "updated_at", "_id"), False),
+    ("candidates", ("job_id", "name", "_id"), False),
+    ("candidates", ("email", "job_id"), True),
+    ("candidates", ("status",), False),
+    ("candidates", ("processing_status",), False),
+    ("candidates", ("resume_path",), False),
+    ("candidates", ("applied_at", "_id"), False),
+    ("candidates", ("updated_at", "_id"), False),
+    ("operations", ("job_id",), False),
+    ("operations", ("status",), False)
+]
+
+SQL_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return datetime.fromisoformat(obj["$date"])
+        if "$oid" in obj:
+            return ObjectId(obj["$oid"])
+    return obj
+
+
+def _sql_value(value):
+    """Convert a document value to the form stored in an indexed column."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _ascii_prefix(condition):
+    """
+    The prefix of a case-insensitive prefix regex, if LIKE can match it.
+    
+    LIKE ignores case for ASCII letters only, so other prefixes are left to
+    the Python check.
+    """
+    prefix = regex_prefix(condition, ignore_case=True)
+    return prefix if prefix is not None and prefix.isascii() else None
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _dump(doc):
+    body = {k: v for k, v in doc.items() if k != "_id"}
+    return json.dumps(body, default=_encode_value, separators=(",", ":"))
+
+
+def _load(row):
+    doc = json.loads(row[1], object_hook=_decode_object)
+    doc["_id"] = ObjectId(row[0])
+    return doc
+
+
+class _Store:
+    """
+    Synchronous SQLite access, run on a small thread pool.
+
+    Each worker thread owns its own connection, so reads proceed in
+    parallel under WAL while SQLite serializes writers. Statements use
+    fixed SQL with bound parameters and are reused from each connection's
+    statement cache.
+    """
+    def __init__(self, path, workers):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only the owning thread uses a connection; close() runs elsewhere.
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, cached_statements=256, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def create_schema(self):
+        conn = self.connection()
+        for name, columns in COLUMNS.items():
+            extra = "".join(f", {column}" for column in columns)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (_id TEXT PRIMARY KEY, doc TEXT NOT NULL{extra})")
+            # Columns added after a database was created are filled in from
+            # the stored documents; dates are stored as {"$date": ...}.
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+            for column in columns:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {name} ADD COLUMN {column}")
+                    conn.execute(
+                        f"UPDATE {name} SET {column} = COALESCE("
+                        f"json_extract(doc, '$.{column}.\"$date\"'), json_extract(doc, '$.{column}'))"
+                    )
+        # Write counters shared by every process using the file, for response caches.
+        conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        conn.executemany("INSERT OR IGNORE INTO versions VALUES (?, 0)", [(name,) for name in COLUMNS])
+        for name, fields, unique in INDEXES:
+            index_name = f"{name}_{'_'.join(fields)}"
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            conn.execute(f"CREATE {kind} IF NOT EXISTS {index_name} ON {name} ({', '.join(fields)})")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def _keyset(sort, values, doc_id):
+    """
+    WHERE clause selecting rows strictly after a keyset position.
+    
+    For sort fields f1..fn and the _id tie-breaker this expands to
+    f1 > v1 OR (f1 = v1 AND f2 > v2) OR ..., with < for descending fields.
+    NULLs sort first ascending and last descending, as in ORDER BY.
+    """
+    keys = [(field, order, _sql_value(value)) for (field, order), value in zip(sort, values)]
+    keys.append(("_id", sort[0][1] if sort else 1, doc_id))
+    clauses, params = [], []
+    for i, (field, order, value) in enumerate(keys):
+        if value is None:
+            if order == -1:
+                # Nothing sorts after NULL descending but its ties.
+                continue
+            after, after_params = f"{field} IS NOT NULL", []
+        elif order == -1:
+            after, after_params = f"({field} < ? OR {field} IS NULL)", [value]
+        else:
+            after, after_params = f"{field} > ?", [value]
+        parts = [f"{f} IS ?" for f, _, _ in keys[:i]] + [after]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params += [v for _, _, v in keys[:i]] + after_params
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+class SQLiteCursor:
+    """Async cursor over a SQLite query with sort, skip, limit and keyset support."""
+    def __init__(self, collection, query):
+        self._collection = collection
+        self._query = query or {}
+        self._sort = []
+        self._skip = 0
+        self._limit = None
+        self._after = None
+    
+    def sort(self, key, order=1):
+        self._sort = sort_spec(key, order)
+        return self
+    
+    def skip(self, count):
+        self._skip = count
+        return self
+    
+    def limit(self, count):
+        self._limit = count or None
+        return self
+    
+    def start_after(self, values, doc_id):
+        values = list(values) if isinstance(values, (list, tuple)) else [values]
+        if len(values) != len(self._sort):
+            raise ValueError("Cursor does not match the sort order")
+        self._after = (values, str(doc_id))
+        return self
+    
+    def position(self, doc):
+        """
+        The keyset position of a document, for `start_after`. Missing fields
+        are NULL when sorted in SQL and "" when sorted in Python, as the
+        cursor orders them.
+        """
+        missing = None if self._sql_sort() else ""
+        return [doc.get(field, missing) for field, _ in self._sort], str(doc["_id"])
+    
+    def _sql_sort(self):
+        return all(field in self._collection.columns for field, _ in self._sort)
+    
+    def _fetch(self):
+        collection = self._collection
+        where, params, residual = collection._where(self._query)
+        sql_sort = self._sql_sort()
+        
+        if self._after is not None and sql_sort:
+            clause, keyset_params = _keyset(self._sort, *self._after)
+            where.append(clause)
+            params += keyset_params
+        
+        sql = f"SELECT _id, doc FROM {collection.name}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if sql_sort and (self._sort or self._after is not None):
+            primary = "DESC" if self._sort and self._sort[0][1] == -1 else "ASC"
+            order = "".join(f"{f} {'DESC' if o == -1 else 'ASC'}, " for f, o in self._sort)
+            sql += f" ORDER BY {order}_id {primary}"
+        pushdown = sql_sort and not residual
+        if pushdown and (self._limit or self._skip):
+            sql += " LIMIT ? OFFSET ?"
+            params += [self._limit or -1, self._skip]
+        
+        rows = collection._store.connection().execute(sql, params).fetchall()
+        docs = [_load(row) for row in rows]
+        if residual:
+            docs = [doc for doc in docs if matches(doc, residual)]
+        if pushdown:
+            return docs
+        
+        if not sql_sort:
+            key = lambda d: sort_key(self._sort, [d.get(f, "") for f, _ in self._sort], str(d["_id"]))
+            descending = self._sort[0][1] == -1
+            docs.sort(key=key, reverse=descending)
+            if self._after is not None:
+                after = sort_key(self._sort, *self._after)
+                docs = [d for d in docs if (key(d) < after if descending else key(d) > after)]
+        end = None if self._limit is None else self._skip + self._limit
+        return docs[self._skip:end]
+    
+    def __aiter__(self):
+        self._iter = None
+        return self
+
+    async def __anext__(self):
+        if self._iter is None:
+            self._iter = iter(await self._collection._store.run(self._fetch))
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class SQLiteCollection:
+    """Collection stored in a SQLite table, with the in-memory Collection's interface."""
+    def __init__(self, store, name):
+        self._store = store
+        self.name = name
+        self.columns = COLUMNS[name]
+
+    def _where(self, query):
+        """
+        Translate the indexable part of a query into SQL.
+        
+        Returns the WHERE clauses, their parameters and the remaining
+        conditions that must be checked in Python.
+        """
+        where, params, residual = [], [], {}
+        for key, value in query.items():
+            if key != "_id" and key not in self.columns:
+                residual[key] = value
+            elif not isinstance(value, dict):
+                where.append(f"{key} = ?")
+                params.append(_sql_value(value))
+            else:
+                exact = True
+                for operator, operand in value.items():
+                    if operator == "$in":
+                        values = [_sql_value(v) for v in operand]
+                        if not values:
+                            where.append("0")
+                        else:
+                            where.append(f"{key} IN ({', '.join('?' * len(values))})")
+                            params += values
+                    elif operator in RANGE_OPERATORS:
+                        where.append(f"{key} {SQL_OPERATORS[operator]} ?")
+                        params.append(_sql_value(operand))
+                    elif operator == "$regex" and regex_prefix(value) is not None:
+                        # A range on the prefix can use the column's index.
+                        prefix = regex_prefix(value)
+                        if prefix:
+                            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                            where.append(f"{key} >= ? AND {key} < ?")
+                            params += [prefix, upper]
+                    elif operator == "$regex" and _ascii_prefix(value) is not None:
+                        where.append(f"{key} LIKE ? ESCAPE '\\'")
+                        params.append(_like_escape(_ascii_prefix(value)) + "%")
+                    elif operator != "$options":
+                        exact = False
+                if not exact:
+                    residual[key] = value
+        return where, params, residual
+    
+    def _row(self, doc):
+        return (str(doc["_id"]), _dump(doc)) + tuple(_sql_value(doc.get(c)) for c in self.columns)
+
+    def _insert_sql(self):
+        columns = ("_id", "doc") + self.columns
+        return f"INSERT INTO {self.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    def _update_sql(self):
+        assignments = ", ".join(f"{c} = ?" for c in ("doc",) + self.columns)
+        return f"UPDATE {self.name} SET {assignments} WHERE _id = ?"
+
+    def _select(self, conn, query, limit=None):
+        where, params, residual = self._where(query)
+        sql = f"SELECT _id, doc FROM {self.name}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if limit is not None and not residual:
+            sql += " LIMIT ?"
+            params.append(limit)
+        docs = (_load(row) for row in conn.execute(sql, params))
+        if residual:
+            docs = (doc for doc in docs if matches(doc, residual))
+        docs = list(docs)
+        return docs if limit is None else docs[:limit]
+
+    def _write(self, fn, *args):
+        conn = self._store.connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn, *args)
+            conn.execute("UPDATE versions SET version = version + 1 WHERE name = ?", (self.name,))
+            conn.execute("COMMIT")
+            return result
+        except sqlite3.IntegrityError as e:
+            conn.execute("ROLLBACK")
+            raise DuplicateKeyError(str(e))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _insert_docs(self, conn, docs):
+        conn.executemany(self._insert_sql(), [self._row(doc) for doc in docs])
+
+    def _update_docs(self, conn, query, update, limit):
+        """Apply an update; returns the documents with the fields set on each."""
+        docs = self._select(conn, query, limit)
+        changes, rows = [], []
+        for doc in docs:
+            fields = update_fields(doc, update)
+            doc.update(fields)
+            changes.append((doc, fields))
+            row = self._row(doc)
+            rows.append(row[1:] + row[:1])
+        conn.executemany(self._update_sql(), rows)
+        return changes
+
+    def _delete_docs(self, conn, query, limit):
+        docs = self._select(conn, query, limit)
+        conn.executemany(f"DELETE FROM {self.name} WHERE _id = ?", [(str(doc["_id"]),) for doc in docs])
+        return docs
+
+    def _count(self, query):
+        where, params, residual = self._where(query)
+        conn = self._store.connection()
+        if residual:
+            return len(self._select(conn, query))
+        sql = f"SELECT COUNT(*) FROM {self.name}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return conn.execute(sql, params).fetchone()[0]
+
+    def _publish(self, op, docs, fields=None):
+        # On the event loop: the writes themselves run in worker threads.
+        for doc in docs:
+            change_feed.publish(self.name, op, doc, fields)
+
+    async def insert_one(self, document):
+        doc = {**document, "_id": ObjectId()}
+        await self._store.run(self._write, self._insert_docs, [doc])
+        self._publish("insert", [doc])
+        return InsertResult(doc["_id"])
+
+    async def insert_many(self, documents):
+        docs = [{**document, "_id": ObjectId()} for document in documents]
+        if docs:
+            try:
+                await self._store.run(self._write, self._insert_docs, docs)
+            except DuplicateKeyError as e:
+                # The transaction was rolled back, so nothing was stored.
+                raise BulkWriteError({
+                    "nInserted": 0, "insertedIds": [], "writeErrors": [{"code": 11000, "errmsg": str(e)}]
+                }) from e
+            self._publish("insert", docs)
+        return InsertManyResult([doc["_id"] for doc in docs])
+
+    async def find_one(self, query, projection=None):
+        docs = await self._store.run(lambda: self._select(self._store.connection(), query, 1))
+        return docs[0] if docs else None
+
+    def find(self, query=None, projection=None):
+        return SQLiteCursor(self, query)
+
+    async def count_documents(self, query):
+        return await self._store.run(self._count, query)
+
+    async def cache_version(self):
+        """The version response caches are keyed on, counting every process's writes."""
+        def read():
+            conn = self._store.connection()
+            row = conn.execute("SELECT version FROM versions WHERE name = ?", (self.name,)).fetchone()
+            return row[0] if row else None
+        return await self._store.run(read)
+
+    async def _update(self, query, update, limit):
+        changes = await self._store.run(self._write, self._update_docs, query, update, limit)
+        for doc, fields in changes:
+            change_feed.publish(self.name, "update", doc, fields)
+        return UpdateResult(len(changes))
+
+    async def update_one(self, query, update):
+        return await self._update(query, update, 1)
+
+    async def update_many(self, query, update):
+        return await self._update(query, update, None)
+
+    async def _delete(self, query, limit):
+        docs = await self._store.run(self._write, self._delete_docs, query, limit)
+        self._publish("delete", docs)
+        return DeleteResult(len(docs))
+
+    async def delete_one(self, query):
+        return await self._delete(query, 1)
+
+    async def delete_many(self, query):
+        return await self._delete(query, None)
+
+
+class SQLiteDatabase:
+    """Database stored in a single SQLite file in WAL mode."""
+    def __init__(self, path, workers):
+        self._store = _Store(path, workers)
+        self.jobs = SQLiteCollection(self._store, "jobs")
+        self.candidates = SQLiteCollection(self._store, "candidates")
+        self.operations = SQLiteCollection(self._store, "operations")
+        self.collections = [self.jobs, self.candidates, self.operations]
+
+    async def create_schema(self):
+        await self._store.run(self._store.create_schema)
+
+    def close(self):
+        self._store.close()
@@ -0,0 +1,257 @@
+"""
+Content-addressed storage of uploaded resumes.
+
+Each resume is stored once per distinct content, at
+`UPLOAD_DIR/ab/cd/<sha256><ext>`, so a candidate applying to many jobs with
+the same file shares one copy. The references to a file are the candidates
+whose `resume_path` points at it; `release` removes a file once the last
+one is gone and `collect_garbage` sweeps files nothing refers to.
+
+Pins only cover uploads of this process. With PERSISTENCE_MODE=shared an
+upload reusing a stored file refreshes its modification time instead, and
+`release` leaves files modified within RESUME_GC_GRACE to the collector.
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import NamedTuple
+try:
+    import fcntl
+except ImportError:  # Windows; shared mode is unavailable there
+    fcntl = None
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from app import metrics
+from app.config import (
+    DATA_DIR,
+    MAX_RESUME_SIZE,
+    PERSISTENCE_MODE,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_DIR,
+    RESUME_GC_INTERVAL,
+    RESUME_GC_GRACE,
+)
+
+SHARED = PERSISTENCE_MODE == "shared"
+
+# Paths stored by uploads whose candidate has not been inserted yet. Such a
+# file has no references but must not be released.
+_pinned = Counter()
+# Serializes placing and removing files, which run in worker threads; in
+# shared mode a file lock does the same across workers.
+_files_lock = threading.Lock()
+_files_lock_fd = None
+
+
+class StoredFile(NamedTuple):
+    path: str
+    checksum: str
+    size: int
+    # False when an identical file was already stored.
+    created: bool
+
+
+def text_path(path: str) -> str:
+    """Path of the extracted text of a stored resume."""
+    return os.path.splitext(path)[0] + ".txt"
+
+
+def _discard(path: str):
+    """Remove a file, ignoring files already gone."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write(f, digest, chunk: bytes):
+    f.write(chunk)
+    digest.update(chunk)
+
+
+@contextmanager
+def _locked():
+    global _files_lock_fd
+    with _files_lock:
+        if not SHARED:
+            yield
+            return
+        if _files_lock_fd is None:
+            _files_lock_fd = os.open(os.path.join(DATA_DIR, "uploads.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(_files_lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(_files_lock_fd, fcntl.LOCK_UN)
+
+
+def _place(f, tmp_path: str, final_path: str) -> bool:
+    """
+    Move a completed upload to its content address.
+
+    Returns False, discarding the upload, if the content is already stored.
+    """
+    with _locked():
+        if os.path.exists(final_path):
+            f.close()
+            os.remove(tmp_path)
+            if SHARED:
+                # Tells other workers the file is in use again.
+                os.utime(final_path)
+            return False
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        return True
+
+
+async def store_upload(upload: UploadFile, ext: str, max_size: int = MAX_RESUME_SIZE) -> StoredFile:
+    """
+    Stream an upload into the store without buffering it in memory.
+
+    Chunks are written to a temporary file and hashed from a worker thread,
+    so the event loop never blocks on disk I/O. The upload is aborted as soon
+    as it exceeds `max_size`. The returned path is pinned until `unpin` is
+    called, which must happen once the referencing candidate is saved.
+    """
+    started = time.perf_counter()
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    f = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                    detail=f"Resume exceeds the maximum size of {max_size} bytes"
+                )
+            await run_in_threadpool(_write, f, digest, chunk)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Resume file is empty"
+            )
+        checksum = digest.hexdigest()
+        final_path = os.path.join(UPLOAD_DIR, checksum[:2], checksum[2:4], checksum + ext.lower())
+        # Pinned before placing so a concurrent release cannot remove it.
+        _pinned[final_path] += 1
+        try:
+            created = await run_in_threadpool(_place, f, tmp_path, final_path)
+        except BaseException:
+            unpin(final_path)
+            raise
+    except BaseException:
+        f.close()
+        await run_in_threadpool(_discard, tmp_path)
+        raise
+    if metrics.enabled:
+        metrics.record_upload(started, size)
+    return StoredFile(final_path, checksum, size, created)
+
+
+def unpin(path: str):
+    """Drop the pin `store_upload` holds on a path."""
+    _pinned[path] -= 1
+    if _pinned[path] <= 0:
+        del _pinned[path]
+
+
+def _remove_stored(path: str) -> bool:
+    with _locked():
+        # An upload of the same content may have pinned it meanwhile.
+        if path in _pinned:
+            return False
+        if SHARED:
+            try:
+                if os.stat(path).st_mtime > time.time() - RESUME_GC_GRACE:
+                    return False
+            except FileNotFoundError:
+                pass
+        _discard(path)
+        _discard(text_path(path))
+        return True
+
+
+async def release(db, path: str) -> bool:
+    """
+    Remove a stored resume, and its extracted text, if nothing refers to it.
+
+    Call after deleting or repointing the candidates that referenced it.
+    Returns whether the file was removed.
+    """
+    if not path or path in _pinned:
+        return False
+    if await db.candidates.count_documents({"resume_path": path}):
+        return False
+    return await run_in_threadpool(_remove_stored, path)
+
+
+def _sweep(referenced: set, grace: float) -> dict:
+    scanned = removed = freed = 0
+    cutoff = time.time() - grace
+    for root, dirs, files in os.walk(UPLOAD_DIR, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            scanned += 1
+            # Names are content hashes or, for older uploads, uuids, so
+            # they identify a file wherever UPLOAD_DIR is mounted.
+            if os.path.splitext(name)[0] in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            # Recent files may belong to an application still in flight.
+            if stat.st_mtime > cutoff:
+                continue
+            _discard(path)
+            removed += 1
+            freed += stat.st_size
+        if root != UPLOAD_DIR and not os.listdir(root):
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+    return {"scanned": scanned, "removed": removed, "freed_bytes": freed}
+
+
+async def collect_garbage(db, grace: float = RESUME_GC_GRACE) -> dict:
+    """
+    Remove stored files that no candidate refers to.
+
+    Covers resumes whose release was interrupted, their extracted text and
+    abandoned partial uploads. Files modified within the last `grace`
+    seconds are kept.
+    """
+    referenced = {os.path.splitext(os.path.basename(path))[0] for path in _pinned}
+    async for candidate in db.candidates.find({}, {"resume_path": 1}):
+        path = candidate.get("resume_path")
+        if path:
+            referenced.add(os.path.splitext(os.path.basename(path))[0])
+    return await run_in_threadpool(_sweep, referenced, grace)
+
+
+async def garbage_collection_loop(db, interval: float = RESUME_GC_INTERVAL):
+    """Periodically sweep unreferenced files."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await collect_garbage(db)
+        except Exception as exc:
+            print(f"Resume garbage collection failed: {exc}")
+            continue
+        if result["removed"]:
+            print(f"Removed {result['removed']} unreferenced resume files ({result['freed_bytes']} bytes)")
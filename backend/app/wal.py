@@ -0,0 +1,326 @@
+"""Append-only write-ahead log for the in-memory database."""
+import json
+import os
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows has no advisory file locks
+    fcntl = None
+
+from app.config import FAST_JSON
+from app.serialization import dumps
+
+
+def _encode(record):
+    """Encode a record as a checksummed, newline-terminated log line."""
+    if FAST_JSON:
+        payload = dumps(record)
+    else:
+        payload = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+    return f"{zlib.crc32(payload):08x} ".encode("ascii") + payload + b"\n"
+
+
+def _decode(line):
+    """Decode a log line, returning None if it is torn or corrupted."""
+    try:
+        text = line.decode("utf-8")
+        checksum, payload = text.rstrip("\n").split(" ", 1)
+        if int(checksum, 16) != zlib.crc32(payload.encode("utf-8")):
+            return None
+        return json.loads(payload)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def read_records(path):
+    """
+    Yield committed records from a log file in order.
+
+    Reading stops at the first line that is incomplete or fails its
+    checksum, since anything after a torn write was never acknowledged.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            record = _decode(line)
+            if record is None:
+                return
+            yield record
+
+
+def write_snapshot(path, data):
+    """Atomically replace the snapshot file with the given data; returns its size."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb" if FAST_JSON else "w") as f:
+        if FAST_JSON:
+            f.write(dumps(data))
+        else:
+            json.dump(data, f, separators=(",", ":"), default=str)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def lock_file(path, shared=False):
+    """
+    Take a non-blocking advisory lock on a file for as long as it stays open.
+
+    Returns the locked descriptor, or None if another process holds a
+    conflicting lock. Always succeeds where file locks are unsupported.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+class WriteAheadLog:
+    """
+    Append-only mutation log with snapshot compaction.
+
+    Every record carries a monotonically increasing sequence number. The
+    snapshot stores the sequence number it covers, so records that are
+    already part of the snapshot are skipped on replay.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.rotated_path = f"{path}.1"
+        self.fsync = fsync
+        self.seq = 0
+        # Records up to this sequence number are known to be on disk.
+        self.synced = 0
+        self.pending = 0
+        self._file = None
+
+    def open(self, seq=0):
+        """Open the log for appending, continuing from the given sequence."""
+        self.seq = self.synced = seq
+        self._file = open(self.path, "ab")
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def duplicate(self):
+        """A new descriptor of the current segment, for syncing it from another thread."""
+        return os.dup(self.fileno())
+
+    def _settle(self):
+        """Sync the current segment before it is closed, if records may not be on disk."""
+        if self.fsync and self.synced < self.seq:
+            os.fsync(self.fileno())
+            self.synced = self.seq
+
+    def replay(self, snapshot_seq):
+        """Yield records newer than the snapshot, oldest first."""
+        seq = snapshot_seq
+        for path in (self.rotated_path, self.path):
+            for record in read_records(path):
+                if record["seq"] > seq:
+                    seq = record["seq"]
+                    self.pending += 1
+                    yield record
+        self.seq = seq
+        self._truncate_torn_tail()
+
+    def _truncate_torn_tail(self):
+        """Drop any partially written trailing bytes left by a crash."""
+        if not os.path.exists(self.path):
+            return
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n") or _decode(line) is None:
+                    break
+                valid_size += len(line)
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+
+    def append(self, record):
+        """
+        Append a record; returns the bytes written.
+
+        The record reaches the operating system at once but is only durable
+        once synced, which the caller waits for after appending.
+        """
+        self.seq += 1
+        line = _encode({"seq": self.seq, **record})
+        self._file.write(line)
+        self._file.flush()
+        self.pending += 1
+        return len(line)
+
+    def rotate(self):
+        """
+        Start a fresh log segment for compaction.
+
+        Returns the sequence number covered by the rotated segment. The
+        rotated segment must be removed with `discard_rotated` once a
+        snapshot covering that sequence has been written.
+        """
+        self._settle()
+        self._file.close()
+        self._retire_segment()
+        self._file = open(self.path, "ab")
+        self.pending = 0
+        return self.seq
+
+    def _retire_segment(self):
+        """Move the current segment to the rotated path."""
+        if os.path.exists(self.rotated_path):
+            # A previous compaction did not finish; fold the old segment in.
+            with open(self.rotated_path, "ab") as old, open(self.path, "rb") as new:
+                old.write(new.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.rotated_path)
+
+    def discard_rotated(self):
+        """Remove the rotated segment after a successful snapshot."""
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        """Close the log file."""
+        if self._file is not None:
+            self._settle()
+            self._file.close()
+            self._file = None
+
+
+class SharedLog(WriteAheadLog):
+    """
+    Write-ahead log shared by several server processes.
+
+    A writer holds an exclusive lock on `<path>.lock` while it reads the
+    records other processes appended, applies its change and appends it,
+    so sequence numbers stay ordered across processes. Readers follow the
+    log without the lock: each record is appended whole with one write and
+    checksummed, so a line still being written is just read again later.
+    Compaction renames the log; followers finish the old file through
+    their open descriptor and notice the new one by its inode.
+    """
+
+    def __init__(self, path, fsync=True):
+        if fcntl is None:
+            raise RuntimeError("A shared write-ahead log needs POSIX file locks")
+        super().__init__(path, fsync)
+        self._lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = None
+        self._inode = None
+        self._offset = 0
+
+    def lock(self, blocking=True):
+        """Take the writer lock; returns False if not `blocking` and it is held elsewhere."""
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(self._lock_fd, flags)
+        except BlockingIOError:
+            return False
+        return True
+
+    def unlock(self):
+        fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def open(self, seq=0):
+        """Open the log after replaying it, following it from its current end."""
+        self.seq = self.synced = seq
+        self._reopen()
+        self._offset = os.fstat(self._fd).st_size
+
+    def fileno(self):
+        return self._fd
+
+    def _reopen(self):
+        if self._fd is not None:
+            self._settle()
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+        self._offset = 0
+
+    def _rotated(self):
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            # Mid-rotation; the new segment appears under the writer lock.
+            return False
+
+    def changed(self):
+        """Cheap check for records appended or a rotation by another process."""
+        return os.fstat(self._fd).st_size > self._offset or self._rotated()
+
+    def _read_segment(self, repair):
+        size = os.fstat(self._fd).st_size
+        if size <= self._offset:
+            return []
+        records = []
+        for line in os.pread(self._fd, size - self._offset, self._offset).splitlines(keepends=True):
+            record = _decode(line) if line.endswith(b"\n") else None
+            if record is None:
+                if repair:
+                    # Under the writer lock nobody is mid-append, so this is
+                    # the torn tail of a process that crashed.
+                    os.ftruncate(self._fd, self._offset)
+                break
+            self._offset += len(line)
+            records.append(record)
+        return records
+
+    def read_new(self, repair=False):
+        """
+        Return the records other processes appended since the last call.
+
+        Pass `repair` only while holding the writer lock.
+        """
+        records = self._read_segment(repair)
+        if self._rotated():
+            # Nothing is appended to a segment once it is rotated, so it
+            # can be finished before switching to the new one.
+            records += self._read_segment(False)
+            self._reopen()
+            records += self._read_segment(repair)
+        fresh = [record for record in records if record["seq"] > self.seq]
+        if fresh:
+            self.seq = fresh[-1]["seq"]
+            self.pending += len(fresh)
+        return fresh
+
+    def append(self, record):
+        """Append a record while holding the writer lock; returns the bytes written."""
+        self.seq += 1
+        line = _encode({"seq": self.seq, **record})
+        view = memoryview(line)
+        while view:
+            view = view[os.write(self._fd, view):]
+        self._offset += len(line)
+        self.pending += 1
+        return len(line)
+
+    def rotate(self):
+        """Start a fresh log segment; call while holding the writer lock."""
+        self._retire_segment()
+        self._reopen()
+        self.pending = 0
+        return self.seq
+
+    def close(self):
+        """Close the log and its lock file."""
+        if self._fd is not None:
+            self._settle()
+        for fd in (self._fd, self._lock_fd):
+            if fd is not None:
+                os.close(fd)
+        self._fd = self._lock_fd = None
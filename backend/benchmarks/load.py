@@ -0,0 +1,272 @@
+"""
+Load generator and benchmark harness for the recruitment API.
+
+Seeds a scratch data directory with synthetic jobs and candidates, drives
+the FastAPI app in-process through httpx's ASGI transport and reports
+latency percentiles, throughput and peak RSS per endpoint.
+
+Each dataset size runs in its own subprocess so memory figures and module
+state are not shared between sizes. Run from the backend directory:
+
+    python -m benchmarks.load --sizes 1000,10000 --output bench.json
+    python -m benchmarks.load --sizes 1000,10000 --baseline bench.json
+
+The storage configuration (DATABASE_BACKEND, PERSISTENCE_MODE, ...) is read
+from the environment as usual.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ENDPOINTS = ["apply", "list_by_job", "update_status", "list_jobs", "get_job"]
+STATUSES = ["Applied", "Shortlisted", "Interview", "Selected", "Rejected"]
+
+
+def synthetic_resume(size):
+    """Build a resume-like PDF payload of roughly `size` bytes."""
+    header = b"%PDF-1.4\n% synthetic resume\n"
+    return header + b"x" * max(0, size - len(header) - 6) + b"\n%%EOF"
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+async def seed(db, jobs, candidates, resume_size, upload_dir):
+    """Insert synthetic jobs and candidates directly through the data layer."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    job_docs = [{
+        "job_title": f"Engineer {i}",
+        "department": rng.choice(["CSE", "ECE", "MECH", "Admin"]),
+        "skills": rng.sample(["python", "react", "sql", "java", "go", "aws"], 3),
+        "experience": f"{i % 5}-{i % 5 + 3} years",
+        "salary": "INR 6,00,000 - 9,00,000",
+        "location": rng.choice(["Coimbatore", "Chennai", "Remote"]),
+        "status": "Open",
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now - timedelta(minutes=i),
+        "created_by": "HR"
+    } for i in range(jobs)]
+    job_ids = [str(i) for i in (await db.jobs.insert_many(job_docs)).inserted_ids]
+
+    resume = synthetic_resume(resume_size)
+    batch = []
+    candidate_ids = []
+    for i in range(candidates):
+        path = os.path.join(upload_dir, f"seed-{i}.pdf")
+        with open(path, "wb") as f:
+            f.write(resume)
+        batch.append({
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "phone": f"98{i:08d}",
+            "job_id": job_ids[i % len(job_ids)],
+            "resume_filename": "resume.pdf",
+            "resume_path": path,
+            "status": rng.choice(STATUSES),
+            "applied_at": now - timedelta(seconds=i),
+            "updated_at": now - timedelta(seconds=i)
+        })
+        if len(batch) == 5000:
+            candidate_ids += (await db.candidates.insert_many(batch)).inserted_ids
+            batch = []
+    if batch:
+        candidate_ids += (await db.candidates.insert_many(batch)).inserted_ids
+    return job_ids, [str(i) for i in candidate_ids]
+
+
+def make_request(endpoint, job_ids, candidate_ids, resume, counter):
+    """Return (method, url, kwargs) for one request against an endpoint."""
+    n = next(counter)
+    job_id = job_ids[n % len(job_ids)]
+    if endpoint == "apply":
+        return "POST", "/api/apply", {
+            "data": {
+                "name": f"Load Applicant {n}",
+                "email": f"load{n}@example.com",
+                "phone": f"97{n:08d}",
+                "job_id": job_id
+            },
+            "files": {"resume": ("resume.pdf", resume, "application/pdf")}
+        }
+    if endpoint == "list_by_job":
+        return "GET", f"/api/candidates/{job_id}", {}
+    if endpoint == "update_status":
+        candidate_id = candidate_ids[n % len(candidate_ids)]
+        return "PUT", f"/api/candidate/status/{candidate_id}", {"json": {"status": STATUSES[n % len(STATUSES)]}}
+    if endpoint == "list_jobs":
+        return "GET", "/api/jobs/", {}
+    if endpoint == "get_job":
+        return "GET", f"/api/jobs/{job_id}", {}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+async def drive(client, endpoint, requests, concurrency, job_ids, candidate_ids, resume, counter):
+    """Issue `requests` calls to one endpoint from `concurrency` workers."""
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while len(latencies) + errors < requests:
+            method, url, kwargs = make_request(endpoint, job_ids, candidate_ids, resume, counter)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_size(args):
+    """Benchmark every endpoint against one dataset size (child process)."""
+    import httpx
+    from app.database import get_database
+    from app.main import app, lifespan
+    from app.config import UPLOAD_DIR
+
+    async with lifespan(app):
+        db = get_database()
+        job_ids, candidate_ids = await seed(db, args.jobs, args.candidates, args.resume_size, UPLOAD_DIR)
+        resume = synthetic_resume(args.resume_size)
+        transport = httpx.ASGITransport(app=app)
+        results = {}
+        # Shared so warm-up and measured applications never reuse an email.
+        counter = itertools.count()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint in args.endpoints:
+                await drive(client, endpoint, min(args.warmup, args.requests), args.concurrency,
+                            job_ids, candidate_ids, resume, counter)
+                results[endpoint] = await drive(client, endpoint, args.requests, args.concurrency,
+                                                job_ids, candidate_ids, resume, counter)
+    return results
+
+
+def run_child(args, candidates):
+    """Run one dataset size in a fresh interpreter with a scratch data directory."""
+    with tempfile.TemporaryDirectory(prefix="hr-bench-") as scratch:
+        upload_dir = os.path.join(scratch, "resumes")
+        os.makedirs(upload_dir)
+        env = {**os.environ, "DATA_DIR": scratch, "UPLOAD_DIR": upload_dir}
+        cmd = [
+            sys.executable, "-m", "benchmarks.load", "--child",
+            "--jobs", str(args.jobs),
+            "--candidates", str(candidates),
+            "--requests", str(args.requests),
+            "--warmup", str(args.warmup),
+            "--concurrency", str(args.concurrency),
+            "--resume-size", str(args.resume_size),
+            "--endpoints", ",".join(args.endpoints)
+        ]
+        output = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+        # The app prints connection messages; the result is the last line.
+        return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(report, baseline):
+    """Print p95 and throughput changes against a previous report."""
+    previous = {(r["candidates"], e): m for r in baseline["runs"] for e, m in r["endpoints"].items()}
+    print(f"\n{'size':>8} {'endpoint':<14} {'p95 ms':>10} {'change':>8} {'rps':>10} {'change':>8}")
+    for run in report["runs"]:
+        for endpoint, metrics in run["endpoints"].items():
+            old = previous.get((run["candidates"], endpoint))
+            if old is None:
+                continue
+            p95 = (metrics["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            rps = (metrics["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100 if old["throughput_rps"] else 0.0
+            print(f"{run['candidates']:>8} {endpoint:<14} {metrics['p95_ms']:>10.2f} {p95:>+7.1f}% "
+                  f"{metrics['throughput_rps']:>10.1f} {rps:>+7.1f}%")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50, help="Number of jobs to seed")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated candidate counts to benchmark")
+    parser.add_argument("--candidates", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured warm-up requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight requests")
+    parser.add_argument("--resume-size", type=int, default=100 * 1024, help="Synthetic resume size in bytes")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated endpoints to drive")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.endpoints = [e for e in args.endpoints.split(",") if e]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(asyncio.run(run_size(args))))
+        return
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "database_backend": os.getenv("DATABASE_BACKEND", "memory"),
+            "persistence_mode": os.getenv("PERSISTENCE_MODE", "json"),
+            "jobs": args.jobs,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "resume_size": args.resume_size
+        },
+        "runs": []
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Benchmarking {size} candidates...", file=sys.stderr)
+        report["runs"].append({"candidates": size, "endpoints": run_child(args, size)})
+
+    for run in report["runs"]:
+        for endpoint, m in run["endpoints"].items():
+            print(f"{run['candidates']:>8} {endpoint:<14} p50 {m['p50_ms']:>9.2f} ms  p95 {m['p95_ms']:>9.2f} ms  "
+                  f"p99 {m['p99_ms']:>9.2f} ms  {m['throughput_rps']:>8.1f} req/s  rss {m['peak_rss_mb']:.0f} MB"
+                  + (f"  errors {m['errors']}" if m["errors"] else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Memory benchmark for the in-memory database's document representation.
+
+Writes a synthetic data.json to a scratch directory and loads it once with
+plain dict documents and once with COMPACT_RECORDS, each in its own
+subprocess, reporting the traced memory held by the loaded data and its
+indexes along with load time and the time of a filtered, sorted query.
+Run from the backend directory:
+
+    python -m benchmarks.memory --sizes 10000,100000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from benchmarks.load import STATUSES, peak_rss_mb
+
+MODES = {"dict": "false", "compact": "true"}
+
+
+def write_dataset(path, jobs, candidates):
+    """Write a data.json with synthetic jobs and candidates."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    job_docs = [{
+        "_id": str(ObjectId()),
+        "job_title": f"Engineer {i}",
+        "department": rng.choice(["CSE", "ECE", "MECH", "Admin"]),
+        "skills": rng.sample(["python", "react", "sql", "java", "go", "aws"], 3),
+        "experience": f"{i % 5}-{i % 5 + 3} years",
+        "salary": "INR 6,00,000 - 9,00,000",
+        "location": rng.choice(["Coimbatore", "Chennai", "Remote"]),
+        "status": "Open",
+        "created_at": (now - timedelta(minutes=i)).isoformat(),
+        "updated_at": (now - timedelta(minutes=i)).isoformat(),
+        "created_by": "HR"
+    } for i in range(jobs)]
+    candidate_docs = [{
+        "_id": str(ObjectId()),
+        "name": f"Candidate {i}",
+        "email": f"candidate{i}@example.com",
+        "phone": f"98{i:08d}",
+        "job_id": job_docs[i % jobs]["_id"],
+        "resume_filename": "resume.pdf",
+        "resume_path": f"uploads/resumes/{ObjectId()}.pdf",
+        "status": rng.choice(STATUSES),
+        "applied_at": (now - timedelta(seconds=i)).isoformat(),
+        "updated_at": (now - timedelta(seconds=i)).isoformat()
+    } for i in range(candidates)]
+    with open(path, "w") as f:
+        json.dump({"jobs": job_docs, "candidates": candidate_docs}, f)
+    return job_docs[0]["_id"]
+
+
+async def measure(job_id):
+    """Load the dataset and measure it (child process)."""
+    from app import database
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    await database.connect_to_mongo()
+    load_seconds = time.perf_counter() - started
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    db = database.get_database()
+    query = {"job_id": job_id, "status": {"$in": ["Shortlisted", "Interview"]}}
+    started = time.perf_counter()
+    for _ in range(20):
+        [doc async for doc in db.candidates.find(query).sort("applied_at", -1).limit(50)]
+    query_ms = (time.perf_counter() - started) / 20 * 1000
+    count = await db.candidates.count_documents({})
+    return {
+        "held_mb": round(held / (1024 * 1024), 1),
+        "bytes_per_candidate": round(held / max(count, 1)),
+        "load_s": round(load_seconds, 2),
+        "query_ms": round(query_ms, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def run_child(mode, data_dir, job_id):
+    """Measure one representation in a fresh interpreter."""
+    # Nothing is written back: the child exits without closing the database.
+    env = {**os.environ, "DATA_DIR": data_dir, "DATABASE_BACKEND": "memory",
+           "PERSISTENCE_MODE": "json", "COMPACT_RECORDS": MODES[mode]}
+    cmd = [sys.executable, "-m", "benchmarks.memory", "--child", "--job-id", job_id]
+    output = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50, help="Number of jobs to seed")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated candidate counts to measure")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--job-id", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.job_id))))
+        return
+
+    runs = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory(prefix="hr-membench-") as scratch:
+            print(f"Measuring {size} candidates...", file=sys.stderr)
+            job_id = write_dataset(os.path.join(scratch, "data.json"), args.jobs, size)
+            runs.append({
+                "candidates": size,
+                "modes": {mode: run_child(mode, scratch, job_id) for mode in MODES}
+            })
+
+    for run in runs:
+        plain, compact = run["modes"]["dict"], run["modes"]["compact"]
+        for mode, m in run["modes"].items():
+            print(f"{run['candidates']:>8} {mode:<8} {m['held_mb']:>8.1f} MB  {m['bytes_per_candidate']:>6} B/doc  "
+                  f"load {m['load_s']:>6.2f} s  query {m['query_ms']:>8.3f} ms  rss {m['peak_rss_mb']:.0f} MB")
+        saved = (1 - compact["held_mb"] / plain["held_mb"]) * 100 if plain["held_mb"] else 0.0
+        print(f"{run['candidates']:>8} compact records hold {saved:.0f}% less memory")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"jobs": args.jobs, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
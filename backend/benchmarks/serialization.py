@@ -0,0 +1,112 @@
+"""
+Serialization benchmark for list responses and persistence.
+
+Writes a synthetic data.json to a scratch directory and measures, with
+FAST_JSON off and on, each in its own subprocess: the latency of listing
+every candidate and every job through the app, and the time and size of a
+full data.json write. Run from the backend directory:
+
+    python -m benchmarks.serialization --sizes 10000,50000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.memory import write_dataset
+
+MODES = {"validated": "false", "fast": "true"}
+
+
+async def measure(repeat):
+    """Time list requests and a data.json write (child process)."""
+    import httpx
+    from app import database
+    from app.main import app, lifespan
+
+    results = {}
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, url in (("list_candidates", "/api/candidates"), ("list_jobs", "/api/jobs/")):
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    timings.append(time.perf_counter() - started)
+                    response.raise_for_status()
+                results[name] = {
+                    "median_ms": round(statistics.median(timings) * 1000, 2),
+                    "bytes": len(response.content)
+                }
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            database._save_data()
+            timings.append(time.perf_counter() - started)
+        results["save_data"] = {
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "bytes": os.path.getsize(database.DATA_FILE)
+        }
+    return results
+
+
+def run_child(mode, data_dir, repeat):
+    """Measure one mode in a fresh interpreter."""
+    env = {**os.environ, "DATA_DIR": data_dir, "DATABASE_BACKEND": "memory",
+           "PERSISTENCE_MODE": "json", "FAST_JSON": MODES[mode],
+           # Measure encoding rather than the job response cache.
+           "RESPONSE_CACHE_SIZE": "0"}
+    cmd = [sys.executable, "-m", "benchmarks.serialization", "--child", "--repeat", str(repeat)]
+    output = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50, help="Number of jobs to seed")
+    parser.add_argument("--sizes", default="10000,50000", help="Comma-separated candidate counts to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per operation")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.repeat))))
+        return
+
+    runs = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Measuring {size} candidates...", file=sys.stderr)
+        modes = {}
+        for mode in MODES:
+            # A fresh dataset per mode: the first run rewrites data.json.
+            with tempfile.TemporaryDirectory(prefix="hr-serbench-") as scratch:
+                write_dataset(os.path.join(scratch, "data.json"), args.jobs, size)
+                modes[mode] = run_child(mode, scratch, args.repeat)
+        runs.append({"candidates": size, "modes": modes})
+
+    for run in runs:
+        validated, fast = run["modes"]["validated"], run["modes"]["fast"]
+        for operation in validated:
+            old, new = validated[operation], fast[operation]
+            speedup = old["median_ms"] / new["median_ms"] if new["median_ms"] else 0.0
+            print(f"{run['candidates']:>8} {operation:<16} {old['median_ms']:>10.2f} ms -> {new['median_ms']:>9.2f} ms "
+                  f"({speedup:.1f}x)  {old['bytes']:>10} -> {new['bytes']:>10} bytes")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"jobs": args.jobs, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
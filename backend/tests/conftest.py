@@ -0,0 +1,85 @@
+"""
+Shared test setup.
+
+Configuration is read from the environment when `app` is first imported,
+so the data and upload directories are pointed at a scratch directory
+before any test module imports it.
+"""
+import os
+import sys
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="hr-tests-")
+os.environ["DATA_DIR"] = _scratch
+os.environ["UPLOAD_DIR"] = os.path.join(_scratch, "uploads")
+os.environ["PERSISTENCE_MODE"] = "json"
+os.environ["DATABASE_BACKEND"] = "memory"
+# Resumes are processed in a thread rather than a process pool.
+os.environ["RESUME_PROCESSES"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database
+
+
+def reset_database():
+    """Empty every in-memory collection and the file it is saved to."""
+    if os.path.exists(database.DATA_FILE):
+        os.remove(database.DATA_FILE)
+    for collection in database.db.collections:
+        database._data[collection.name].clear()
+        collection.rebuild_indexes()
+        collection.version += 1
+
+
+@pytest.fixture
+def db():
+    """The in-memory database, emptied."""
+    reset_database()
+    return database.db
+
+
+def _client():
+    from app.main import app
+    from app.routers.jobs import _cache
+    reset_database()
+    # Versions are per backend, so cached bodies must not outlive one.
+    _cache.clear()
+    return TestClient(app)
+
+
+@pytest.fixture
+def client():
+    """An API client on an empty in-memory database."""
+    with _client() as client:
+        yield client
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    """An API client on an empty MongoDB database, stood in for by mongomock."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app import mongo
+    server = mongomock_motor.AsyncMongoMockClient()
+    monkeypatch.setattr(mongo, "AsyncIOMotorClient", lambda url, maxPoolSize: server)
+    monkeypatch.setattr(database, "DATABASE_BACKEND", "mongodb")
+    with _client() as client:
+        yield client
+
+
+@pytest.fixture
+def sqlite_client(monkeypatch, tmp_path):
+    """An API client on an empty SQLite database."""
+    monkeypatch.setattr(database, "DATABASE_BACKEND", "sqlite")
+    monkeypatch.setattr(database, "SQLITE_PATH", str(tmp_path / "data.db"))
+    with _client() as client:
+        yield client
+
+
+@pytest.fixture(params=["memory", "mongodb", "sqlite"])
+def api(request):
+    """An API client on each storage backend in turn."""
+    name = {"memory": "client", "mongodb": "mongo_client", "sqlite": "sqlite_client"}[request.param]
+    return request.getfixturevalue(name)
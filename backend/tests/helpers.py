@@ -0,0 +1,53 @@
+"""API helpers shared by the tests."""
+import hashlib
+import os
+import time
+
+from app.config import UPLOAD_DIR
+
+JOB = {
+    "job_title": "Backend Developer",
+    "department": "Engineering",
+    "skills": ["Python"],
+    "experience": "2 years",
+    "salary": "10 LPA",
+    "location": "Chennai"
+}
+RESUME = b"%PDF-1.4 resume"
+
+
+def create_job(client, **fields):
+    response = client.post("/api/jobs/", json={**JOB, **fields})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def apply(client, job_id, email, name="Asha", resume=RESUME):
+    """Apply for a job; returns the response."""
+    return client.post(
+        "/api/apply",
+        data={"name": name, "email": email, "phone": "9876543210", "job_id": job_id},
+        files={"resume": ("cv.pdf", resume, "application/pdf")}
+    )
+
+
+def wait_for_deletion(client, job_id, timeout=5.0):
+    """Poll a job's deletion until it finishes; returns its progress."""
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = client.get(f"/api/jobs/{job_id}/deletion").json()
+        if progress["status"] != "Running" or time.monotonic() > deadline:
+            return progress
+        time.sleep(0.02)
+
+
+def stored_path(content, ext=".pdf"):
+    """Where the upload store keeps a file with this content."""
+    checksum = hashlib.sha256(content).hexdigest()
+    return os.path.join(UPLOAD_DIR, checksum[:2], checksum[2:4], checksum + ext)
+
+
+def age(path, seconds=24 * 3600):
+    """Make a stored file look older than the garbage collector's grace period."""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
@@ -0,0 +1,63 @@
+"""Router flows run against every storage backend."""
+from app.pagination import NEXT_CURSOR_HEADER
+from helpers import JOB, apply, create_job, wait_for_deletion
+
+
+def test_apply_and_paginate(api):
+    job_id = create_job(api)
+    ids = []
+    for i in range(5):
+        response = apply(api, job_id, f"c{i}@example.com", name=f"Candidate {i}")
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    again = apply(api, job_id, "c0@example.com")
+    assert again.status_code == 400
+
+    everything = [item["id"] for item in api.get(f"/api/candidates/{job_id}").json()]
+    assert sorted(everything) == sorted(ids)
+    paged, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = api.get(f"/api/candidates/{job_id}", params=params)
+        paged += [item["id"] for item in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+    assert paged == everything
+
+    cursor = api.get(f"/api/candidates/{job_id}", params={"limit": 2}).headers[NEXT_CURSOR_HEADER]
+    response = api.get(f"/api/candidates/{job_id}", params={"limit": 2, "cursor": cursor, "sort": "name"})
+    assert response.status_code == 400
+
+    names = [item["name"] for item in api.get("/api/candidates", params={"sort": "name"}).json()]
+    assert names == [f"Candidate {i}" for i in range(5)]
+
+
+def test_bulk_job_creation(api):
+    response = api.post("/api/jobs/bulk", json=[{**JOB, "job_title": "Data Engineer"}, {"bad": 1}])
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert api.get(f"/api/jobs/{body['results'][0]['id']}").json()["job_title"] == "Data Engineer"
+
+    # Nothing valid to insert still answers with the per-item results.
+    response = api.post("/api/jobs/bulk", json=[{"bad": 1}])
+    assert response.status_code == 201, response.text
+    assert (response.json()["succeeded"], response.json()["failed"]) == (0, 1)
+
+
+def test_delete_candidate_and_job(api):
+    job_id = create_job(api)
+    first = apply(api, job_id, "a@example.com").json()["id"]
+    apply(api, job_id, "b@example.com")
+    assert api.delete(f"/api/candidate/{first}").status_code == 204
+    assert api.get(f"/api/candidate/{first}").status_code == 404
+
+    response = api.delete(f"/api/jobs/{job_id}")
+    assert response.status_code == 202
+    progress = wait_for_deletion(api, job_id)
+    assert progress["status"] == "Completed"
+    assert progress["deleted_candidates"] == 1
+    assert api.get(f"/api/jobs/{job_id}").status_code == 404
+    assert api.get(f"/api/candidates/{job_id}").status_code == 404
+    assert api.get("/api/candidates").json() == []
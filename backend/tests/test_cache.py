@@ -0,0 +1,63 @@
+"""ETags and the response cache of the job endpoints."""
+import asyncio
+from datetime import datetime
+
+from app.database import get_database
+from app.routers.jobs import _cache
+from app.sqlite import SQLiteDatabase
+from helpers import JOB, create_job
+
+
+def _etag(api, path):
+    response = api.get(path)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_unchanged_jobs_answer_not_modified(api):
+    job_id = create_job(api)
+    for path in ("/api/jobs/", f"/api/jobs/{job_id}"):
+        etag = _etag(api, path)
+        for header in (etag, "W/" + etag, f'"other", {etag}', "*"):
+            response = api.get(path, headers={"If-None-Match": header})
+            assert response.status_code == 304, header
+            assert response.content == b""
+            assert response.headers["ETag"] == etag
+        assert api.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_an_update_invalidates_cached_jobs(api):
+    create_job(api, job_title="Data Engineer")
+    # The newest job, so it is on the first page too.
+    job_id = create_job(api)
+    paths = ("/api/jobs/", f"/api/jobs/{job_id}", "/api/jobs/?limit=1")
+    etags = {path: _etag(api, path) for path in paths}
+
+    response = api.put(f"/api/jobs/{job_id}", json={"job_title": "Platform Engineer"})
+    assert response.status_code == 200
+    for path in paths:
+        response = api.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == 200, path
+        assert response.headers["ETag"] != etags[path]
+    assert api.get(f"/api/jobs/{job_id}").json()["job_title"] == "Platform Engineer"
+    titles = [job["job_title"] for job in api.get("/api/jobs/").json()]
+    assert sorted(titles) == ["Data Engineer", "Platform Engineer"]
+
+
+def test_writes_by_another_process_invalidate_cached_jobs(sqlite_client):
+    create_job(sqlite_client)
+    etag = _etag(sqlite_client, "/api/jobs/")
+    assert _cache._entries
+
+    # Another worker sharing the SQLite file adds a job.
+    other = SQLiteDatabase(get_database()._store.path, 1)
+    try:
+        now = datetime.utcnow()
+        asyncio.run(other.jobs.insert_one({
+            **JOB, "job_title": "Data Engineer", "status": "Open", "created_at": now, "updated_at": now
+        }))
+    finally:
+        other.close()
+    response = sqlite_client.get("/api/jobs/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
@@ -0,0 +1,83 @@
+"""Resume downloads: ranges, conditional requests and streamed ZIP archives."""
+import hashlib
+import io
+import time
+import zipfile
+
+from app import downloads, processing
+from helpers import apply, create_job, stored_path
+
+
+def _wait_for_processing(client, candidate_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = client.get(f"/api/candidate/{candidate_id}/processing").json()
+        if progress["status"] not in ("Pending", "Processing") or time.monotonic() > deadline:
+            return progress
+        time.sleep(0.02)
+
+
+def test_resume_download_ranges_and_revalidation(client):
+    content = b"%PDF-1.4 " + bytes(range(48, 123))
+    job_id = create_job(client)
+    candidate_id = apply(client, job_id, "a@example.com", resume=content).json()["id"]
+    path = f"/api/candidate/{candidate_id}/resume"
+
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "application/pdf"
+    etag = response.headers["ETag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+
+    response = client.get(path, headers={"Range": "bytes=0-3"})
+    assert response.status_code == 206
+    assert response.content == content[:4]
+    assert response.headers["Content-Range"] == f"bytes 0-3/{len(content)}"
+    assert client.get(path, headers={"Range": "bytes=-5"}).content == content[-5:]
+    # A range of an older version is answered with the whole file.
+    response = client.get(path, headers={"Range": "bytes=0-3", "If-Range": '"stale"'})
+    assert (response.status_code, response.content) == (200, content)
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+    head = client.head(path)
+    assert (head.status_code, head.content) == (200, b"")
+    assert head.headers["Content-Length"] == str(len(content))
+
+
+def test_job_resumes_stream_as_a_zip(client, monkeypatch):
+    flagged = b"%PDF-1.4 infected"
+
+    async def scan(path):
+        return "Test signature" if path == stored_path(flagged) else None
+
+    monkeypatch.setattr(processing, "scan_hooks", [scan])
+    job_id = create_job(client)
+    shared = b"%PDF-1.4 shared " * 100
+    ids = [apply(client, job_id, f"c{i}@example.com", name=f"Cand {i}", resume=resume).json()["id"]
+           for i, resume in enumerate([shared, shared, flagged])]
+    assert _wait_for_processing(client, ids[2])["status"] == "Quarantined"
+
+    response = client.get(f"/api/candidates/{job_id}/resumes")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    # Candidates sharing a file get an entry each; the quarantined one is left out.
+    assert sorted(archive.namelist()) == [f"Cand_0_{ids[0]}.pdf", f"Cand_1_{ids[1]}.pdf"]
+    assert all(archive.read(name) == shared for name in archive.namelist())
+
+    response = client.get(f"/api/candidates/{job_id}/resumes", params={"email": "c1@example.com"})
+    assert zipfile.ZipFile(io.BytesIO(response.content)).namelist() == [f"Cand_1_{ids[1]}.pdf"]
+
+
+def test_zip_stream_yields_as_it_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(downloads, "CHUNK_SIZE", 1024)
+    big = tmp_path / "big.pdf"
+    big.write_bytes(b"x" * 10_000)
+    chunks = list(downloads.zip_stream([("big.pdf", str(big)), ("gone.pdf", str(tmp_path / "gone.pdf"))]))
+    # Each chunk of the file is passed on before the next is read.
+    assert len([chunk for chunk in chunks if chunk]) > 10
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.namelist() == ["big.pdf"]
+    assert archive.read("big.pdf") == big.read_bytes()
@@ -0,0 +1,72 @@
+"""Server-Sent Events: replay after a reconnect and resets."""
+import asyncio
+import json
+
+from app import events
+from app.routers import candidates as candidates_router
+from app.routers import events as events_router
+from helpers import apply, create_job
+
+
+def _read(count, job_id=None, last_event_id=None, since=None):
+    """The first `count` messages of an event stream, as (event, id, data)."""
+    async def read():
+        response = await events_router.stream_events(job_id=job_id, last_event_id=last_event_id, since=since)
+        messages = []
+        async for chunk in response.body_iterator:
+            messages.append(chunk)
+            if len(messages) == count:
+                break
+        await response.body_iterator.aclose()
+        return messages
+
+    parsed = []
+    for message in asyncio.run(read()):
+        fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+        parsed.append((fields.get("event"), fields.get("id"), json.loads(fields["data"]) if "data" in fields else None))
+    return parsed
+
+
+def _last_id():
+    feed = events_router.change_feed
+    return feed.event_id(feed._recent[-1])
+
+
+def test_reconnect_replays_missed_changes(client, monkeypatch):
+    # Resume processing would publish candidate updates in between.
+    monkeypatch.setattr(candidates_router.resume_queue, "submit", lambda candidate_id: None)
+    job_id = create_job(client)
+    other_job = create_job(client, job_title="Data Engineer")
+    seen = _last_id()
+    candidate_id = apply(client, job_id, "a@example.com").json()["id"]
+    assert client.put(f"/api/jobs/{job_id}", json={"status": "Closed"}).status_code == 200
+    apply(client, other_job, "b@example.com")
+
+    messages = _read(4, last_event_id=seen)
+    assert messages[0] == (None, None, None)
+    assert all(event == "change" for event, _, _ in messages[1:])
+    changes = [(data["collection"], data["op"], data["id"]) for _, _, data in messages[1:]]
+    assert changes[:2] == [("candidates", "insert", candidate_id), ("jobs", "update", job_id)]
+    assert changes[2][:2] == ("candidates", "insert")
+    assert messages[2][2]["data"]["status"] == "Closed"
+
+    # Resuming from a replayed event, for one job, through the query parameter.
+    update_id = messages[2][1]
+    resumed = _read(2, job_id=job_id, since=messages[1][1])
+    assert (resumed[1][1], resumed[1][2]["op"]) == (update_id, "update")
+
+
+def test_unknown_event_ids_get_a_reset(client, monkeypatch):
+    create_job(client)
+    feed = events_router.change_feed
+    for last_event_id in ("not-an-id", f"{feed.epoch}x-1", f"{feed.epoch}-{feed.seq + 5}"):
+        assert _read(2, last_event_id=last_event_id)[1] == ("reset", None, {}), last_event_id
+
+    # Events that fell out of the buffer cannot be replayed either.
+    small = events.ChangeFeed(buffer_size=2)
+    monkeypatch.setattr(events_router, "change_feed", small)
+    for i in range(4):
+        small.publish("jobs", "delete", {"_id": f"job-{i}"})
+    assert _read(2, last_event_id=f"{small.epoch}-1")[1] == ("reset", None, {})
+    messages = _read(3, last_event_id=f"{small.epoch}-2")
+    assert [data["id"] for _, _, data in messages[1:]] == ["job-2", "job-3"]
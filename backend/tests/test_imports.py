@@ -0,0 +1,90 @@
+"""Bulk imports of candidates from CSV files."""
+import asyncio
+import io
+
+from bson import ObjectId
+
+from app.imports import CandidateImporter
+from app.models.bulk import FileFormat
+
+HEADER = "name,email,phone,job_id,status\n"
+
+
+def _job(client):
+    response = client.post("/api/jobs/", json={
+        "job_title": "Backend Developer",
+        "department": "Engineering",
+        "skills": ["Python"],
+        "experience": "2 years",
+        "salary": "10 LPA",
+        "location": "Chennai"
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+def _import(client, csv_text, **params):
+    response = client.post("/api/candidates/import", params=params, files={"file": ("candidates.csv", csv_text)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_import_reports_duplicate_and_invalid_rows(client):
+    job_id = _job(client)
+    applied = client.post(
+        "/api/apply",
+        data={"name": "Asha", "email": "asha@example.com", "phone": "9876543210", "job_id": job_id},
+        files={"resume": ("cv.pdf", b"%PDF-1.4 resume", "application/pdf")}
+    )
+    assert applied.status_code in (200, 201), applied.text
+
+    unknown_job = str(ObjectId())
+    report = _import(client, HEADER + "".join([
+        f"Ravi,ravi@example.com,9876543211,{job_id},Shortlisted\n",    # line 2: imported
+        f"Asha,asha@example.com,9876543210,{job_id},\n",               # line 3: applied already
+        f"Mina,not-an-email,9876543212,{job_id},\n",                   # line 4: invalid email
+        f"Ravi,ravi@example.com,9876543211,{job_id},\n",               # line 5: repeats line 2
+        f"Kiran,kiran@example.com,9876543213,{unknown_job},\n",        # line 6: no such job
+        f"Dev,dev@example.com,9876543214,{job_id},Hired\n",            # line 7: invalid status
+        f"Lata,lata@example.com,9876543215,{job_id},Applied\n",        # line 8: imported
+    ]))
+
+    assert (report["rows"], report["imported"], report["failed"]) == (7, 2, 5)
+    errors = {error["row"]: error["error"] for error in report["errors"]}
+    assert sorted(errors) == [3, 4, 5, 6, 7]
+    assert errors[3] == errors[5] == "Already applied for this job"
+    assert errors[6] == "Job not found"
+    assert "email" in errors[4]
+    assert "status" in errors[7]
+
+    candidates = client.get(f"/api/candidates/{job_id}", params={"sort": "name"}).json()
+    assert [(c["name"], c["status"]) for c in candidates] == [
+        ("Asha", "Applied"), ("Lata", "Applied"), ("Ravi", "Shortlisted")
+    ]
+    stats = client.get(f"/api/stats/{job_id}").json()
+    assert stats["total_candidates"] == 3
+    assert stats["candidates_by_status"]["Shortlisted"] == 1
+
+
+def test_application_made_during_an_import_fails_only_its_row(client, db):
+    job_id = _job(client)
+    importer = CandidateImporter(db)
+    check = importer.check
+
+    async def check_then_apply(batch):
+        kept = await check(batch)
+        # An application for the second row arrives after the import checked it.
+        await db.candidates.insert_one({"name": "Early", "email": "b@example.com", "job_id": job_id})
+        return kept
+
+    importer.check = check_then_apply
+    rows = "".join(f"{name},{name.lower()}@example.com,9876543210,{job_id},\n" for name in "ABCD")
+    report = asyncio.run(importer.run(io.BytesIO((HEADER + rows).encode()), FileFormat.CSV))
+
+    assert (report["imported"], report["failed"]) == (3, 1)
+    assert report["errors"] == [{"row": 3, "error": "Already applied for this job"}]
+
+    async def emails():
+        return sorted([doc["email"] async for doc in db.candidates.find({"job_id": job_id})])
+
+    assert asyncio.run(emails()) == [f"{c}@example.com" for c in "abcd"]
@@ -0,0 +1,92 @@
+"""Hash indexes and query planning of the in-memory collections."""
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.indexes import HashIndex
+
+
+def _candidates(db, count, jobs=("a", "b", "c", "d")):
+    async def insert():
+        for i in range(count):
+            await db.candidates.insert_one({
+                "name": f"Candidate {i}",
+                "email": f"c{i}@example.com",
+                "job_id": jobs[i % len(jobs)],
+                "status": "Applied"
+            })
+    asyncio.run(insert())
+
+
+def _index(collection, fields):
+    return next(index for index in collection._indexes if index.fields == tuple(fields))
+
+
+def test_planner_picks_the_smallest_index(db):
+    _candidates(db, 40)
+    by_job = _index(db.candidates, ["job_id"])
+
+    docs, size = db.candidates._plan({"job_id": "a"})
+    assert size == 10
+    assert {doc["job_id"] for doc in docs} == {"a"}
+    assert by_job.size({"job_id": "a"}) == 10
+
+    # The unique email/job index narrows to one document.
+    docs, size = db.candidates._plan({"job_id": "a", "email": "c4@example.com"})
+    assert size == 1
+    assert [doc["name"] for doc in docs] == ["Candidate 4"]
+
+    # `$in` conditions use the index too; unindexed fields scan everything.
+    assert db.candidates._plan({"job_id": {"$in": ["a", "b", "z"]}})[1] == 20
+    assert db.candidates._plan({"email": "c4@example.com"})[1] == 40
+
+
+def test_planner_looks_up_ids_directly(db):
+    _candidates(db, 5)
+    doc = next(iter(db.candidates._plan({})[0]))
+    assert list(db.candidates._plan({"_id": doc["_id"]})[0]) == [doc]
+    assert db.candidates._plan({"_id": {"$in": [doc["_id"], str(doc["_id"])]}})[1] == 1
+
+
+def test_indexed_queries_match_a_scan(db):
+    _candidates(db, 40)
+
+    async def query():
+        await db.candidates.update_many({"job_id": "b"}, {"$set": {"status": "Rejected"}})
+        await db.candidates.update_one({"email": "c0@example.com", "job_id": "a"}, {"$set": {"job_id": "b"}})
+        await db.candidates.delete_one({"email": "c2@example.com", "job_id": "c"})
+        found = [doc["name"] async for doc in db.candidates.find({"job_id": "b", "status": "Rejected"})]
+        counted = await db.candidates.count_documents({"job_id": "b", "status": "Rejected"})
+        return found, counted
+
+    found, counted = asyncio.run(query())
+    # Index entries follow updates, so the moved candidate is found by its new job.
+    assert "Candidate 0" not in found
+    assert len(found) == counted == 10
+    assert db.candidates._plan({"job_id": "b"})[1] == 11
+    assert db.candidates._plan({"job_id": "c"})[1] == 9
+
+
+def test_unique_index_rejects_a_second_application(db):
+    _candidates(db, 2)
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(db.candidates.insert_one({"name": "Again", "email": "c1@example.com", "job_id": "b"}))
+    # The same email may apply to another job.
+    asyncio.run(db.candidates.insert_one({"name": "Other job", "email": "c1@example.com", "job_id": "a"}))
+    assert db.candidates._plan({"email": "c1@example.com", "job_id": {"$in": ["a", "b"]}})[1] == 2
+
+
+def test_hash_index_buckets_grow_and_shrink():
+    index = HashIndex(["status"])
+    index.add("1", {"status": "Open"})
+    index.add("2", {"status": "Open"})
+    index.add("3", {"status": "Closed"})
+    assert index.size({"status": "Open"}) == 2
+    assert index.size({"status": {"$in": ["Open", "Closed"]}}) == 3
+    index.remove("1", {"status": "Open"})
+    assert [doc for doc in index.lookup({"status": "Open"})] == [{"status": "Open"}]
+    index.remove("2", {"status": "Open"})
+    assert index.size({"status": "Open"}) == 0
+    assert index.covers({"status": "Open"})
+    assert not index.covers({"status": {"$ne": "Open"}})
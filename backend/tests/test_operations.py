@@ -0,0 +1,88 @@
+"""Background deletion of jobs with their candidates and resume files."""
+import os
+from datetime import datetime
+
+from app import uploads
+from app.database import get_database
+from app.operations import job_deletions
+from helpers import age, apply, create_job, stored_path, wait_for_deletion
+
+
+def test_job_deletion_cascades_in_chunks(client, monkeypatch):
+    chunks = []
+    delete_chunk = job_deletions._delete_chunk
+
+    async def counted(job_id):
+        removed = await delete_chunk(job_id)
+        chunks.append(removed)
+        return removed
+
+    monkeypatch.setattr(job_deletions, "chunk_size", 2)
+    monkeypatch.setattr(job_deletions, "_delete_chunk", counted)
+    job_id = create_job(client)
+    other_job = create_job(client, job_title="Data Engineer")
+    resumes = [b"%PDF-1.4 cascade shared", b"%PDF-1.4 cascade shared", b"%PDF-1.4 cascade own",
+               b"%PDF-1.4 cascade other job", b"%PDF-1.4 cascade shared"]
+    for i, resume in enumerate(resumes):
+        assert apply(client, job_id, f"c{i}@example.com", resume=resume).status_code == 201
+    # The other job's candidate keeps its copy of a shared resume.
+    assert apply(client, other_job, "c3@example.com", resume=resumes[3]).status_code == 201
+
+    response = client.delete(f"/api/jobs/{job_id}")
+    assert response.status_code == 202
+    assert response.json()["total_candidates"] == 5
+    progress = wait_for_deletion(client, job_id)
+    assert progress["status"] == "Completed"
+    assert (progress["deleted_candidates"], progress["released_files"]) == (5, 2)
+    assert [count for count, _ in chunks] == [2, 2, 1, 0]
+
+    assert not os.path.exists(stored_path(resumes[0]))
+    assert not os.path.exists(stored_path(resumes[2]))
+    assert os.path.exists(stored_path(resumes[3]))
+    assert [c["job_id"] for c in client.get("/api/candidates").json()] == [other_job]
+
+
+def test_files_left_by_an_interrupted_deletion_are_collected(client, monkeypatch):
+    resume = b"%PDF-1.4 interrupted deletion"
+    job_id = create_job(client)
+    assert apply(client, job_id, "a@example.com", resume=resume).status_code == 201
+
+    # The process stopped after the chunk's candidates were deleted.
+    async def interrupted(db, path):
+        return False
+
+    monkeypatch.setattr(uploads, "release", interrupted)
+    client.delete(f"/api/jobs/{job_id}")
+    progress = wait_for_deletion(client, job_id)
+    assert (progress["status"], progress["released_files"]) == ("Completed", 0)
+    assert os.path.exists(stored_path(resume))
+
+    age(stored_path(resume))
+    client.post("/api/resumes/gc")
+    assert not os.path.exists(stored_path(resume))
+
+
+def test_deletion_interrupted_before_the_job_is_resumed(client):
+    job_id = create_job(client)
+    for i in range(3):
+        resume = f"%PDF-1.4 resumed {i}".encode()
+        assert apply(client, job_id, f"c{i}@example.com", resume=resume).status_code == 201
+    db = get_database()
+    now = datetime.utcnow()
+    # Recorded by submit(), which stopped before deleting the job.
+    operation = {
+        "type": "delete_job", "job_id": job_id, "status": "Running",
+        "total_candidates": 3, "deleted_candidates": 0, "released_files": 0,
+        "started_at": now, "updated_at": now, "finished_at": None, "error": None
+    }
+
+    async def finish():
+        result = await db.operations.insert_one(operation)
+        await job_deletions._run(await db.operations.find_one({"_id": result.inserted_id}))
+
+    # On the app's event loop, which also runs its resume processing.
+    client.portal.call(finish)
+    assert client.get(f"/api/jobs/{job_id}").status_code == 404
+    progress = client.get(f"/api/jobs/{job_id}/deletion").json()
+    assert (progress["status"], progress["deleted_candidates"], progress["released_files"]) == ("Completed", 3, 3)
+    assert client.get("/api/candidates").json() == []
@@ -0,0 +1,143 @@
+"""Limit/skip and keyset cursor pagination of list endpoints on each storage backend."""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import get_database
+from app.pagination import NEXT_CURSOR_HEADER
+
+START = datetime(2024, 1, 1, 9, 0)
+
+
+def _candidates(db, applied_offsets, names=None, statuses=None):
+    """Insert candidates applying at START plus the given minutes."""
+    async def insert():
+        for i, minutes in enumerate(applied_offsets):
+            applied_at = START + timedelta(minutes=minutes)
+            await db.candidates.insert_one({
+                "name": names[i] if names else f"Candidate {i}",
+                "email": f"c{i}@example.com",
+                "phone": "9876543210",
+                "job_id": "job-a" if i % 2 else "job-b",
+                "resume_filename": None,
+                "status": statuses[i] if statuses else "Applied",
+                "applied_at": applied_at,
+                "updated_at": applied_at
+            })
+    asyncio.run(insert())
+
+
+def _pages(client, path, limit, **params):
+    """Follow next-page cursors from the first page; returns the pages' ids."""
+    pages, cursor = [], None
+    while True:
+        query = {**params, "limit": limit}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(path, params=query)
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        assert len(pages) <= 50, "cursor does not advance"
+
+
+def test_cursor_pages_through_ties_on_the_sort_key(api):
+    # Three candidates share each timestamp, so page boundaries fall inside ties.
+    _candidates(get_database(), [0, 0, 0, 5, 5, 5, 10, 10, 10, 15])
+    everything = [item["id"] for item in api.get("/api/candidates").json()]
+    assert len(everything) == 10
+
+    for limit in (1, 2, 3, 4):
+        pages = _pages(api, "/api/candidates", limit)
+        assert [i for page in pages for i in page] == everything
+        assert all(len(page) == limit for page in pages[:-1])
+
+    # Newest first, ties broken by id in the same direction.
+    items = api.get("/api/candidates").json()
+    keys = [(item["applied_at"], item["id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_limit_and_skip_match_the_full_list(api):
+    _candidates(get_database(), [0, 1, 1, 2, 3, 3, 3])
+    everything = [item["id"] for item in api.get("/api/candidates").json()]
+    window = api.get("/api/candidates", params={"limit": 3, "skip": 2}).json()
+    assert [item["id"] for item in window] == everything[2:5]
+
+
+def test_invalid_cursor_is_rejected(api):
+    response = api.get("/api/candidates", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_cursor_from_another_sort_is_rejected(api):
+    _candidates(get_database(), [0, 1, 2, 3])
+    cursor = api.get("/api/candidates", params={"limit": 2}).headers[NEXT_CURSOR_HEADER]
+    for params in ({"sort": "name"}, {"sort": "applied_at"}, {"sort": "-applied_at,name"}):
+        response = api.get("/api/candidates", params={**params, "limit": 2, "cursor": cursor})
+        assert response.status_code == 400, params
+        assert response.json()["detail"] == "Invalid pagination cursor"
+    # The same sort, spelled out, accepts it.
+    response = api.get("/api/candidates", params={"sort": "-applied_at", "limit": 2, "cursor": cursor})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_compound_sort_pages_through_full_ties(api):
+    names = ["Ann", "Bob", "Ann", "Cid", "Bob", "Ann", "Ann", "Bob"]
+    statuses = ["Applied", "Rejected", "Applied", "Applied", "Rejected", "Rejected", "Applied", "Applied"]
+    _candidates(get_database(), [0] * len(names), names, statuses)
+    items = api.get("/api/candidates", params={"sort": "status,-name"}).json()
+    # Candidates equal on every sort field are ordered by id.
+    keys = [(item["status"], item["name"]) for item in items]
+    by_name_descending = sorted(keys, key=lambda key: key[1], reverse=True)
+    assert keys == sorted(by_name_descending, key=lambda key: key[0])
+    for group in _groups(items):
+        ids = [item["id"] for item in group]
+        assert ids == sorted(ids)
+
+    everything = [item["id"] for item in items]
+    for limit in (1, 2, 3):
+        pages = _pages(api, "/api/candidates", limit, sort="status,-name")
+        assert [i for page in pages for i in page] == everything
+
+
+def test_filtered_sort_pages_match_the_full_list(api):
+    names = [f"Name {i % 4}" for i in range(12)]
+    statuses = ["Rejected" if i % 3 else "Applied" for i in range(12)]
+    _candidates(get_database(), list(range(12)), names, statuses)
+    params = {"sort": "name", "status": "Rejected", "name": "name"}
+    items = api.get("/api/candidates", params=params).json()
+    assert len(items) == 8
+    assert [item["name"] for item in items] == sorted(item["name"] for item in items)
+    pages = _pages(api, "/api/candidates", 3, **params)
+    assert [i for page in pages for i in page] == [item["id"] for item in items]
+
+
+def test_planner_walks_a_sorted_index_only_when_cheaper(db):
+    _candidates(db, list(range(40)))
+    by_name = [("name", 1)]
+    # No filter: the name index is walked and stops once the page is full.
+    assert db.candidates._ordered_scan({}, by_name, None, 5) is not None
+    # A selective filter without a limit: filtering first and sorting is cheaper.
+    assert db.candidates._ordered_scan({"job_id": "job-a"}, by_name, None, None) is None
+    # With a small page, walking the index is still cheaper.
+    assert db.candidates._ordered_scan({"job_id": "job-a"}, by_name, None, 1) is not None
+
+    async def first(limit):
+        cursor = db.candidates.find({"job_id": "job-a"}).sort(by_name).limit(limit)
+        return [doc["name"] async for doc in cursor]
+
+    everything = asyncio.run(first(0))
+    assert everything == sorted(everything) and len(everything) == 20
+    assert asyncio.run(first(1)) == everything[:1]
+    assert asyncio.run(first(15)) == everything[:15]
+
+
+def _groups(items):
+    groups = {}
+    for item in items:
+        groups.setdefault((item["status"], item["name"]), []).append(item)
+    return groups.values()
@@ -0,0 +1,65 @@
+"""Job search ranking and index maintenance."""
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.search import MIN_RECLAIMED_SLOTS, JobSearchIndex, build_job_index
+from helpers import create_job
+
+START = datetime(2024, 1, 1)
+
+
+def _job(title, days, **fields):
+    return {"_id": ObjectId(), "job_title": title, "skills": ["SQL"], "status": "Open",
+            "created_at": START + timedelta(days=days), **fields}
+
+
+def test_ties_rank_newest_created_first(client, db):
+    new = create_job(client, job_title="Data Engineer")
+    csv = ("job_title,department,skills,experience,salary,location,created_at\n"
+           "Data Analyst,Analytics,SQL,1 year,5 LPA,Pune,2019-01-01T00:00:00\n")
+    report = client.post("/api/jobs/import", files={"file": ("jobs.csv", csv)}).json()
+    assert report["imported"] == 1, report
+    old = next(job["id"] for job in client.get("/api/jobs/").json() if job["id"] != new)
+
+    ranked = [job["id"] for job in client.get("/api/jobs/search", params={"q": "data"}).json()["results"]]
+    assert ranked == [new, old]
+
+    # A restart rebuilds the index from the database in the same order.
+    asyncio.run(build_job_index(db))
+    assert [job["id"] for job in client.get("/api/jobs/search", params={"q": "data"}).json()["results"]] == ranked
+
+
+def test_out_of_order_jobs_are_ranked_by_creation():
+    index = JobSearchIndex()
+    jobs = [_job("Developer", days) for days in (5, 1, 9, 3)]
+    index.add_many(jobs[:2])
+    index.add(jobs[2])
+    index.add(jobs[3])
+    ids, total, _ = index.search("developer")
+    by_age = sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+    assert total == 4
+    assert ids == [str(job["_id"]) for job in by_age]
+
+    # Weight still ranks first: the title match beats newer skill matches.
+    lead = _job("SQL Lead", 0, skills=["Go"])
+    index.add(lead)
+    assert index.search("sql")[0][0] == str(lead["_id"])
+
+
+def test_removed_slots_are_reclaimed():
+    index = JobSearchIndex()
+    kept = _job("Keeper", 0, location="Pune")
+    index.add(kept)
+    for days in range(1, 5 * MIN_RECLAIMED_SLOTS):
+        job = _job("Temporary", days)
+        index.add(job)
+        index.remove(job["_id"])
+    assert len(index._ids) <= MIN_RECLAIMED_SLOTS + 2
+    assert index._all.bit_length() <= len(index._ids)
+    ids, total, facets = index.search("keeper")
+    assert (ids, total) == ([str(kept["_id"])], 1)
+    assert facets["location"] == {"Pune": 1}
+    assert index.search("temporary")[1] == 0
+
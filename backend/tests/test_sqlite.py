@@ -0,0 +1,190 @@
+"""SQL pushdown, keyset paging, write errors and connections of the SQLite backend."""
+import asyncio
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.sqlite import SQLiteDatabase
+
+START = datetime(2024, 1, 1, 9, 0)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "data.db"), 4)
+    asyncio.run(database.create_schema())
+    yield database
+    database.close()
+
+
+def _candidates(db, names, jobs=("a", "b"), applied=None):
+    async def insert():
+        for i, name in enumerate(names):
+            doc = {"name": name, "email": f"c{i}@example.com", "job_id": jobs[i % len(jobs)], "status": "Applied"}
+            if applied is not None and applied[i] is not None:
+                doc["applied_at"] = START + timedelta(minutes=applied[i])
+            await db.candidates.insert_one(doc)
+    asyncio.run(insert())
+
+
+def _find(collection, query, sort=None, limit=None, after=None):
+    async def run():
+        cursor = collection.find(query)
+        if sort:
+            cursor.sort(sort)
+        if after is not None:
+            cursor.start_after(*after)
+        if limit:
+            cursor.limit(limit)
+        return [doc async for doc in cursor], cursor
+    return asyncio.run(run())
+
+
+def _plan(collection, query):
+    """SQLite's query plan for the SQL part of a query."""
+    where, params, _ = collection._where(query)
+    sql = f"SELECT _id, doc FROM {collection.name} WHERE " + " AND ".join(where)
+    rows = collection._store.connection().execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return " ".join(row[3] for row in rows)
+
+
+def test_indexed_conditions_run_in_sql(sqlite_db):
+    candidates = sqlite_db.candidates
+    where, _, residual = candidates._where({"job_id": "a", "status": {"$in": ["Applied"]}, "phone": "1"})
+    assert len(where) == 2
+    assert residual == {"phone": "1"}
+
+    assert "USING INDEX candidates_email_job_id" in _plan(candidates, {"email": "c1@example.com", "job_id": "b"})
+    assert "USING INDEX candidates_job_id_name__id" in _plan(candidates, {"job_id": "a", "name": {"$regex": "^An"}})
+    assert "USING INDEX candidates_status" in _plan(candidates, {"status": {"$in": ["Applied", "Rejected"]}})
+
+
+def test_name_prefixes_match_like_a_python_regex(sqlite_db):
+    names = ["Ann", "anna", "Bob", "ANNE", "50%_off", "50x off", "a_b", "axb", "Ålesund", "ålborg"]
+    _candidates(sqlite_db, names)
+    candidates = sqlite_db.candidates
+
+    def names_for(condition):
+        return sorted(doc["name"] for doc in _find(candidates, {"name": condition})[0])
+
+    # Case-insensitive prefixes become LIKE, with its wildcards escaped.
+    for prefix, expected in [("ann", ["ANNE", "Ann", "anna"]), ("50%", ["50%_off"]), ("a_", ["a_b"])]:
+        condition = {"$regex": "^" + re.escape(prefix), "$options": "i"}
+        where, _, residual = candidates._where({"name": condition})
+        assert residual == {} and "LIKE" in where[0]
+        assert names_for(condition) == expected
+
+    # LIKE folds ASCII case only, so other prefixes are checked in Python.
+    condition = {"$regex": "^å", "$options": "i"}
+    assert candidates._where({"name": condition})[2] == {"name": condition}
+    assert names_for(condition) == ["Ålesund", "ålborg"]
+
+    # Case-sensitive prefixes are a range on the column.
+    assert names_for({"$regex": "^An"}) == ["Ann"]
+    assert names_for({"$regex": "nn"}) == ["Ann", "anna"]
+
+
+@pytest.mark.parametrize("sort", [
+    [("applied_at", -1)],
+    [("applied_at", 1)],
+    [("job_id", 1), ("applied_at", -1)],
+    [("job_id", -1), ("name", 1)]
+])
+def test_keyset_pages_match_order_by(sqlite_db, sort):
+    # Ties and missing dates put page boundaries inside runs of equal keys.
+    applied = [0, 0, None, 5, 5, None, 5, 10, 0, None, 10]
+    _candidates(sqlite_db, [f"N{i % 3}" for i in range(len(applied))], applied=applied)
+    everything, _ = _find(sqlite_db.candidates, {}, sort)
+    assert len(everything) == len(applied)
+
+    for limit in (1, 2, 3):
+        paged, after = [], None
+        while True:
+            page, cursor = _find(sqlite_db.candidates, {}, sort, limit, after)
+            paged += page
+            if len(page) < limit:
+                break
+            after = cursor.position(page[-1])
+        assert [doc["_id"] for doc in paged] == [doc["_id"] for doc in everything]
+
+
+def test_duplicate_applications_raise_and_roll_back(sqlite_db):
+    _candidates(sqlite_db, ["A", "B"])
+    candidates = sqlite_db.candidates
+    version = asyncio.run(candidates.cache_version())
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(candidates.insert_one({"name": "Again", "email": "c1@example.com", "job_id": "b"}))
+    batch = [{"name": "New", "email": "new@example.com", "job_id": "a"},
+             {"name": "Again", "email": "c0@example.com", "job_id": "a"}]
+    with pytest.raises(BulkWriteError):
+        asyncio.run(candidates.insert_many(batch))
+
+    # Neither the batch's first document nor a version bump was kept.
+    assert asyncio.run(candidates.count_documents({})) == 2
+    assert asyncio.run(candidates.cache_version()) == version
+    # The same email may apply to another job.
+    asyncio.run(candidates.insert_one({"name": "Other job", "email": "c1@example.com", "job_id": "a"}))
+    assert asyncio.run(candidates.count_documents({"email": "c1@example.com"})) == 2
+
+
+def test_indexed_updates_and_deletes_match_a_scan(sqlite_db):
+    _candidates(sqlite_db, [f"Candidate {i}" for i in range(40)], jobs=("a", "b", "c", "d"))
+    candidates = sqlite_db.candidates
+
+    async def query():
+        await candidates.update_many({"job_id": "b"}, {"$set": {"status": "Rejected"}})
+        await candidates.update_one({"email": "c0@example.com", "job_id": "a"}, {"$set": {"job_id": "b"}})
+        await candidates.delete_one({"email": "c2@example.com", "job_id": "c"})
+        found = [doc["name"] async for doc in candidates.find({"job_id": "b", "status": "Rejected"})]
+        counted = await candidates.count_documents({"job_id": "b", "status": "Rejected"})
+        return found, counted, await candidates.count_documents({"job_id": "b"})
+
+    found, counted, in_job = asyncio.run(query())
+    # Indexed columns follow the documents, so the moved candidate is found by its new job.
+    assert "Candidate 0" not in found
+    assert len(found) == counted == 10
+    assert in_job == 11
+    assert asyncio.run(candidates.count_documents({"job_id": "c"})) == 9
+
+
+def test_each_thread_has_its_own_connection(sqlite_db):
+    store = sqlite_db._store
+    seen = {}
+
+    def connect(name):
+        conn = store.connection()
+        assert store.connection() is conn
+        seen[name] = conn
+
+    threads = [threading.Thread(target=connect, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connect("main")
+    assert len({id(conn) for conn in seen.values()}) == 4
+    assert seen["main"].execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        seen[0].execute("SELECT 1")
+
+
+def test_cache_version_counts_writes_from_every_process(sqlite_db, tmp_path):
+    # A second database on the same file stands in for another worker process.
+    other = SQLiteDatabase(str(tmp_path / "data.db"), 1)
+    try:
+        asyncio.run(other.create_schema())
+        before = asyncio.run(sqlite_db.jobs.cache_version())
+        asyncio.run(other.jobs.insert_one({"job_title": "Data Engineer", "status": "Open"}))
+        asyncio.run(other.jobs.update_many({"status": "Open"}, {"$set": {"status": "Closed"}}))
+        assert asyncio.run(sqlite_db.jobs.cache_version()) == before + 2
+        # Other tables keep their own counters.
+        assert asyncio.run(sqlite_db.candidates.cache_version()) == 0
+    finally:
+        other.close()
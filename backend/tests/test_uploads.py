@@ -0,0 +1,90 @@
+"""Content-addressed resume storage, its references and garbage collection."""
+import asyncio
+import io
+import os
+
+from fastapi import UploadFile
+
+from app import uploads
+from app.database import get_database
+from app.routers import candidates as candidates_router
+from helpers import age, apply, create_job, stored_path
+
+
+def test_identical_uploads_share_one_pinned_file():
+    content = b"%PDF-1.4 shared upload"
+
+    async def store():
+        return [await uploads.store_upload(UploadFile(io.BytesIO(content), filename="cv.pdf"), ".PDF")
+                for _ in range(2)]
+
+    first, second = asyncio.run(store())
+    assert first.path == second.path == stored_path(content)
+    assert (first.created, second.created) == (True, False)
+    assert os.listdir(os.path.dirname(first.path)) == [os.path.basename(first.path)]
+    # Each upload holds a pin until its candidate is saved.
+    assert uploads._pinned[first.path] == 2
+    uploads.unpin(first.path)
+    uploads.unpin(second.path)
+    assert first.path not in uploads._pinned
+    os.remove(first.path)
+
+
+def test_a_shared_resume_outlives_all_but_its_last_candidate(client):
+    content = b"%PDF-1.4 two applications"
+    job_id = create_job(client)
+    other_job = create_job(client, job_title="Data Engineer")
+    first = apply(client, job_id, "a@example.com", resume=content).json()["id"]
+    second = apply(client, other_job, "a@example.com", resume=content).json()["id"]
+    path = stored_path(content)
+    assert os.path.exists(path)
+    assert path not in uploads._pinned
+
+    assert client.delete(f"/api/candidate/{first}").status_code == 204
+    assert os.path.exists(path)
+    assert client.delete(f"/api/candidate/{second}").status_code == 204
+    assert not os.path.exists(path)
+
+
+def test_a_failed_application_leaves_no_file(client, monkeypatch):
+    content = b"%PDF-1.4 unknown job"
+    response = apply(client, "0" * 24, "a@example.com", resume=content)
+    assert response.status_code == 404
+    assert not os.path.exists(stored_path(content))
+
+    # The job is deleted while the resume uploads.
+    job_id = create_job(client)
+    store_upload = candidates_router.store_upload
+
+    async def store_then_delete(*args, **kwargs):
+        stored = await store_upload(*args, **kwargs)
+        await get_database().jobs.delete_many({})
+        return stored
+
+    monkeypatch.setattr(candidates_router, "store_upload", store_then_delete)
+    response = apply(client, job_id, "b@example.com", resume=content)
+    assert response.status_code == 404
+    assert not os.path.exists(stored_path(content))
+    assert stored_path(content) not in uploads._pinned
+    assert client.get("/api/candidates").json() == []
+
+
+def test_garbage_collection_keeps_referenced_and_recent_files(client):
+    referenced, orphan, recent = b"%PDF-1.4 kept", b"%PDF-1.4 orphan", b"%PDF-1.4 recent"
+    job_id = create_job(client)
+    assert apply(client, job_id, "a@example.com", resume=referenced).status_code == 201
+    for content in (orphan, recent):
+        path = stored_path(content)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+    age(stored_path(referenced))
+    age(stored_path(orphan))
+
+    response = client.post("/api/resumes/gc")
+    assert response.status_code == 200
+    assert response.json()["removed"] >= 1
+    assert os.path.exists(stored_path(referenced))
+    assert not os.path.exists(stored_path(orphan))
+    # Within the grace period a file may belong to an application in flight.
+    assert os.path.exists(stored_path(recent))
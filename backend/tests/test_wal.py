@@ -0,0 +1,240 @@
+"""Write-ahead log replay, crash recovery, snapshot loading and the shared log."""
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app import database
+from app.analytics import funnel_index
+from app.search import job_index
+from app.wal import SharedLog, WriteAheadLog, read_records
+
+
+def _log(path, count):
+    wal = WriteAheadLog(str(path))
+    wal.open()
+    for i in range(count):
+        wal.append({"op": "insert", "collection": "jobs", "doc": {"_id": str(i)}})
+    wal.close()
+
+
+def _replayed(path, snapshot_seq=0):
+    wal = WriteAheadLog(str(path))
+    records = list(wal.replay(snapshot_seq))
+    return wal, [record["seq"] for record in records]
+
+
+def test_replay_skips_records_in_the_snapshot(tmp_path):
+    path = tmp_path / "data.wal"
+    _log(path, 5)
+    wal, seqs = _replayed(path, snapshot_seq=3)
+    assert seqs == [4, 5]
+    assert wal.seq == 5
+
+
+def test_replay_truncates_a_torn_tail(tmp_path):
+    path = tmp_path / "data.wal"
+    _log(path, 3)
+    committed = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'0badc0de {"seq":4,"op":"ins')
+    wal, seqs = _replayed(path)
+    assert seqs == [1, 2, 3]
+    assert path.stat().st_size == committed
+
+    # Appends continue after the last committed record.
+    wal.open(wal.seq)
+    wal.append({"op": "delete", "collection": "jobs", "_id": "0"})
+    wal.close()
+    assert [record["seq"] for record in read_records(str(path))] == [1, 2, 3, 4]
+
+
+def test_replay_stops_at_a_record_failing_its_checksum(tmp_path):
+    path = tmp_path / "data.wal"
+    _log(path, 4)
+    lines = path.read_bytes().splitlines(keepends=True)
+    lines[2] = lines[2].replace(b'"_id":"2"', b'"_id":"X"')
+    path.write_bytes(b"".join(lines))
+    _, seqs = _replayed(path)
+    # Nothing after a corrupt record was acknowledged, so it is dropped too.
+    assert seqs == [1, 2]
+    assert path.read_bytes() == b"".join(lines[:2])
+
+
+def test_replay_reads_a_rotated_segment_first(tmp_path):
+    path = tmp_path / "data.wal"
+    wal = WriteAheadLog(str(path))
+    wal.open()
+    wal.append({"op": "insert", "collection": "jobs", "doc": {"_id": "a"}})
+    assert wal.rotate() == 1
+    wal.append({"op": "insert", "collection": "jobs", "doc": {"_id": "b"}})
+    wal.close()
+    _, seqs = _replayed(path)
+    assert seqs == [1, 2]
+
+
+def test_concurrent_writes_share_fsyncs(db, tmp_path, monkeypatch):
+    wal = WriteAheadLog(str(tmp_path / "data.wal"))
+    wal.open()
+    monkeypatch.setattr(database, "_wal", wal)
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+
+    async def write():
+        await asyncio.gather(*[db.jobs.insert_one({"job_title": f"Job {i}"}) for i in range(50)])
+
+    asyncio.run(write())
+    assert wal.synced == wal.seq == 50
+    assert 1 <= len(synced) < 50
+    wal.close()
+    assert len(list(read_records(wal.path))) == 50
+
+
+def _shared(path):
+    log = SharedLog(str(path))
+    log.open()
+    return log
+
+
+def _write(log, *ids):
+    """Append job inserts as a worker does: under the lock, caught up first."""
+    assert log.lock()
+    try:
+        log.read_new(repair=True)
+        for job_id in ids:
+            log.append({"op": "insert", "collection": "jobs", "doc": {"_id": job_id}})
+    finally:
+        log.unlock()
+
+
+def _ids(records):
+    return [record["doc"]["_id"] for record in records]
+
+
+def test_shared_log_orders_interleaved_writers(tmp_path):
+    path = tmp_path / "data.wal"
+    first, second = _shared(path), _shared(path)
+    _write(first, "a")
+    _write(second, "b", "c")
+    _write(first, "d")
+    # Each writer caught up before appending, so sequence numbers never repeat.
+    assert [record["seq"] for record in read_records(str(path))] == [1, 2, 3, 4]
+    assert first.seq == second.seq + 1 == 4
+    assert second.changed()
+    assert _ids(second.read_new()) == ["d"]
+    assert not second.changed()
+
+    # The lock is exclusive between the two.
+    assert first.lock()
+    assert not second.lock(blocking=False)
+    first.unlock()
+    assert second.lock(blocking=False)
+    second.unlock()
+    first.close()
+    second.close()
+
+
+def test_shared_log_follows_a_rotation(tmp_path):
+    path = tmp_path / "data.wal"
+    writer, follower = _shared(path), _shared(path)
+    _write(writer, "a")
+    assert writer.lock()
+    writer.append({"op": "insert", "collection": "jobs", "doc": {"_id": "b"}})
+    writer.rotate()
+    writer.append({"op": "insert", "collection": "jobs", "doc": {"_id": "c"}})
+    writer.unlock()
+
+    # The follower finishes the rotated segment, then moves to the new one by inode.
+    assert follower.changed()
+    assert _ids(follower.read_new()) == ["a", "b", "c"]
+    assert follower._inode == os.stat(path).st_ino
+    _write(follower, "d")
+    assert _ids(writer.read_new()) == ["d"]
+
+    # A record appended just before a rotation the follower is about to notice.
+    read_segment = follower._read_segment
+
+    def racing(repair):
+        records = read_segment(repair)
+        if racing.once:
+            racing.once = False
+            _write(writer, "e")
+            assert writer.lock()
+            writer.rotate()
+            writer.unlock()
+            _write(writer, "f")
+        return records
+
+    racing.once = True
+    follower._read_segment = racing
+    assert _ids(follower.read_new()) == ["e", "f"]
+    writer.close()
+    follower.close()
+
+
+def test_shared_log_repairs_a_torn_tail_under_the_lock(tmp_path):
+    path = tmp_path / "data.wal"
+    writer, follower = _shared(path), _shared(path)
+    _write(writer, "a")
+    committed = path.stat().st_size
+    # A worker that crashed mid-append left half a record.
+    with open(path, "ab") as f:
+        f.write(b'0badc0de {"seq":2,"op":"ins')
+
+    # Readers without the lock leave it alone; it may still be being written.
+    assert _ids(follower.read_new()) == ["a"]
+    assert path.stat().st_size > committed
+    _write(follower, "b")
+    assert [record["seq"] for record in read_records(str(path))] == [1, 2]
+    assert _ids(writer.read_new()) == ["b"]
+    writer.close()
+    follower.close()
+
+
+def test_followed_records_update_search_funnels_and_counters(db, tmp_path, monkeypatch):
+    path = tmp_path / "data.wal"
+    local, other = _shared(path), _shared(path)
+    monkeypatch.setattr(database, "_wal", local)
+    monkeypatch.setattr(database, "SHARED", True)
+    job_id, candidate_id = str(ObjectId()), str(ObjectId())
+    now = datetime(2024, 1, 1).isoformat()
+
+    # Another worker creates a job and an application.
+    assert other.lock()
+    other.append({"op": "insert", "collection": "jobs", "doc": {
+        "_id": job_id, "job_title": "Zymurgist", "skills": ["Brewing"], "status": "Open", "created_at": now
+    }})
+    other.append({"op": "insert", "collection": "candidates", "doc": {
+        "_id": candidate_id, "name": "Asha", "email": "asha@example.com", "job_id": job_id,
+        "status": "Applied", "applied_at": now, "updated_at": now
+    }})
+    other.unlock()
+    database._follow()
+    assert job_index.search("zymurgist")[0] == [job_id]
+    assert funnel_index.funnel(job_id).total == 1
+    assert asyncio.run(db.candidates.count_documents({"job_id": job_id})) == 1
+
+    assert other.lock()
+    other.append({"op": "delete", "collection": "candidates", "_id": candidate_id})
+    other.append({"op": "delete", "collection": "jobs", "_id": job_id})
+    other.unlock()
+    database._follow()
+    assert job_index.search("zymurgist")[1] == 0
+    assert funnel_index.funnel(job_id).total == 0
+    assert asyncio.run(db.candidates.count_documents({"job_id": job_id})) == 0
+    local.close()
+    other.close()
+
+
+@pytest.mark.parametrize("content", [b'{"jobs": [{"_id": "a"', b'{"jobs": [{"job_title": "no id"}]}', b"[]"])
+def test_unreadable_snapshot_refuses_to_load(db, tmp_path, monkeypatch, content):
+    path = tmp_path / "data.json"
+    path.write_bytes(content)
+    monkeypatch.setattr(database, "DATA_FILE", str(path))
+    with pytest.raises(RuntimeError, match="Cannot load"):
+        database._load_data()
+    # The file is left for the operator to recover.
+    assert path.read_bytes() == content
@@ -69,7 +69,7 @@ function CandidateTable({ candidates, onStatusUpdate }) {
                   <div className="text-sm text-gray-500">{candidate.phone}</div>
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap">
-                  {candidate.resume_filename ? <span className="text-sm text-primary-600">📄 {candidate.resume_filename}</span> : <span className="text-sm text-gray-400">No resume</span>}
+                  {candidate.resume_filename ? <a href={candidateApi.resumeUrl(candidate.id)} className="text-sm text-primary-600 hover:underline">📄 {candidate.resume_filename}</a> : <span className="text-sm text-gray-400">No resume</span>}
                 </td>
                 <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">{new Date(candidate.applied_at).toLocaleDateString()}</td>
                 <td className="px-6 py-4 whitespace-nowrap">
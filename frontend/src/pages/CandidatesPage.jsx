@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useParams, Link } from 'react-router-dom'
-import { jobApi, candidateApi } from '../services/api'
+import { jobApi, candidateApi, eventsApi, applyChange } from '../services/api'
 import CandidateTable from '../components/CandidateTable'
 
 function CandidatesPage() {
@@ -12,6 +12,16 @@ function CandidatesPage() {
 
   useEffect(() => { fetchData() }, [jobId])
 
+  // Load once, then apply changes as they happen
+  useEffect(() => eventsApi.subscribe({
+    jobId,
+    onChange: (change) => {
+      if (change.collection === 'candidates') setCandidates((list) => applyChange(list, change))
+      else if (change.op === 'update') setJob((current) => current && { ...current, ...change.data })
+    },
+    onReset: fetchData,
+  }), [jobId])
+
   const fetchData = async () => {
     try {
       setLoading(true)
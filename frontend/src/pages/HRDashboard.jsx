@@ -1,22 +1,45 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
-import { jobApi, candidateApi } from '../services/api'
+import { jobApi, candidateApi, statsApi, eventsApi, applyChange } from '../services/api'
 import JobCard from '../components/JobCard'
 
 function HRDashboard() {
   const [jobs, setJobs] = useState([])
   const [candidates, setCandidates] = useState([])
+  const [stats, setStats] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
 
+  const statsTimer = useRef(null)
+
   useEffect(() => { fetchData() }, [])
 
+  // Apply job and application changes as they happen; the counts are
+  // refetched at most once a second
+  useEffect(() => {
+    const unsubscribe = eventsApi.subscribe({
+      onChange: (change) => {
+        if (change.collection === 'jobs') setJobs((list) => applyChange(list, change))
+        else setCandidates((list) => applyChange(list, change).slice(0, 5))
+        if (!statsTimer.current) {
+          statsTimer.current = setTimeout(async () => {
+            statsTimer.current = null
+            try { setStats((await statsApi.get()).data) } catch (err) { /* kept until the next change */ }
+          }, 1000)
+        }
+      },
+      onReset: fetchData,
+    })
+    return () => { unsubscribe(); clearTimeout(statsTimer.current) }
+  }, [])
+
   const fetchData = async () => {
     try {
       setLoading(true)
-      const [jobsResponse, candidatesResponse] = await Promise.all([jobApi.getAll(), candidateApi.getAll()])
+      const [jobsResponse, candidatesResponse, statsResponse] = await Promise.all([jobApi.getAll(), candidateApi.getAll({ limit: 5 }), statsApi.get()])
       setJobs(jobsResponse.data)
       setCandidates(candidatesResponse.data)
+      setStats(statsResponse.data)
     } catch (err) {
       setError('Failed to load data')
     } finally {
@@ -27,9 +50,9 @@ function HRDashboard() {
   if (loading) return <div className="flex justify-center items-center h-64"><div className="animate-spin rounded-full h-12 w-12 border-t-2 border-b-2 border-primary-600"></div></div>
   if (error) return <div className="text-center py-12"><p className="text-red-600">{error}</p><button onClick={fetchData} className="mt-4 px-4 py-2 bg-primary-600 text-white rounded-md">Retry</button></div>
 
-  const openJobs = jobs.filter((j) => j.status === 'Open').length
-  const selectedCandidates = candidates.filter((c) => c.status === 'Selected').length
-  const interviewCandidates = candidates.filter((c) => c.status === 'Interview').length
+  const openJobs = stats.open_jobs
+  const selectedCandidates = stats.candidates_by_status.Selected
+  const interviewCandidates = stats.candidates_by_status.Interview
 
   return (
     <div>
@@ -41,9 +64,9 @@ function HRDashboard() {
         <Link to="/jobs/create" className="px-6 py-3 bg-kite-blue text-white rounded-md font-medium hover:bg-primary-700 shadow-lg">+ Post New Job</Link>
       </div>
       <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-8">
-        <div className="bg-white rounded-lg shadow-md p-4 border-l-4 border-kite-blue"><p className="text-sm text-gray-500">Total Jobs</p><p className="text-2xl font-bold text-kite-blue">{jobs.length}</p></div>
+        <div className="bg-white rounded-lg shadow-md p-4 border-l-4 border-kite-blue"><p className="text-sm text-gray-500">Total Jobs</p><p className="text-2xl font-bold text-kite-blue">{stats.total_jobs}</p></div>
         <div className="bg-green-50 rounded-lg shadow-md p-4 border-l-4 border-green-500"><p className="text-sm text-green-600">Open Jobs</p><p className="text-2xl font-bold text-green-700">{openJobs}</p></div>
-        <div className="bg-kite-light rounded-lg shadow-md p-4 border-l-4 border-kite-blue"><p className="text-sm text-kite-blue">Total Candidates</p><p className="text-2xl font-bold text-kite-blue">{candidates.length}</p></div>
+        <div className="bg-kite-light rounded-lg shadow-md p-4 border-l-4 border-kite-blue"><p className="text-sm text-kite-blue">Total Candidates</p><p className="text-2xl font-bold text-kite-blue">{stats.total_candidates}</p></div>
         <div className="bg-emerald-50 rounded-lg shadow-md p-4 border-l-4 border-emerald-500"><p className="text-sm text-emerald-600">Selected</p><p className="text-2xl font-bold text-emerald-700">{selectedCandidates}</p></div>
       </div>
       <div className="bg-white rounded-lg shadow-md p-6 mb-8 border-t-4 border-kite-blue">
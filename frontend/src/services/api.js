@@ -11,11 +11,14 @@ const api = axios.create({
 
 // Job APIs
 export const jobApi = {
-  getAll: () => api.get('/jobs/'),
+  getAll: (params) => api.get('/jobs/', { params }),
   getById: (id) => api.get(`/jobs/${id}`),
+  search: (params) => api.get('/jobs/search', { params }),
   create: (jobData) => api.post('/jobs/', jobData),
+  createBulk: (jobs) => api.post('/jobs/bulk', jobs),
   update: (id, jobData) => api.put(`/jobs/${id}`, jobData),
   delete: (id) => api.delete(`/jobs/${id}`),
+  getDeletion: (id) => api.get(`/jobs/${id}/deletion`),
 }
 
 // Candidate APIs
@@ -23,11 +26,53 @@ export const candidateApi = {
   apply: (formData) => api.post('/apply', formData, {
     headers: { 'Content-Type': 'multipart/form-data' },
   }),
-  getByJob: (jobId) => api.get(`/candidates/${jobId}`),
-  getAll: () => api.get('/candidates'),
+  getByJob: (jobId, params) => api.get(`/candidates/${jobId}`, { params }),
+  getAll: (params) => api.get('/candidates', { params }),
   getById: (id) => api.get(`/candidate/${id}`),
+  getProcessing: (id) => api.get(`/candidate/${id}/processing`),
+  getHistory: (id) => api.get(`/candidate/${id}/history`),
+  delete: (id) => api.delete(`/candidate/${id}`),
+  resumeUrl: (id) => `${API_BASE_URL}/candidate/${id}/resume`,
+  jobResumesUrl: (jobId) => `${API_BASE_URL}/candidates/${jobId}/resumes`,
+  exportUrl: (params = {}) =>
+    `${API_BASE_URL}/candidates/export?${new URLSearchParams(params)}`,
   updateStatus: (candidateId, status) => 
     api.put(`/candidate/status/${candidateId}`, { status }),
+  updateStatusBulk: (candidateIds, status) =>
+    api.put('/candidates/status', { candidate_ids: candidateIds, status }),
+}
+
+// Statistics APIs
+export const statsApi = {
+  get: () => api.get('/stats'),
+  getProcessing: () => api.get('/stats/processing'),
+  getByJob: (jobId) => api.get(`/stats/${jobId}`),
+}
+
+// Hiring-funnel APIs; `params` takes a `job_id` or a `department`
+export const analyticsApi = {
+  getFunnel: (params) => api.get('/analytics/funnel', { params }),
+  getDepartmentFunnels: () => api.get('/analytics/funnel/departments'),
+}
+
+// Change events, streamed with Server-Sent Events. EventSource reconnects by
+// itself and resumes after the last event it received; `onReset` means
+// changes were missed and the data should be loaded again.
+export const eventsApi = {
+  subscribe: ({ jobId, onChange, onReset }) => {
+    const query = jobId ? `?job_id=${encodeURIComponent(jobId)}` : ''
+    const source = new EventSource(`${API_BASE_URL}/events${query}`)
+    source.addEventListener('change', (event) => onChange(JSON.parse(event.data)))
+    source.addEventListener('reset', () => onReset && onReset())
+    return () => source.close()
+  },
+}
+
+// Apply a change event to a list of documents, newest first
+export const applyChange = (list, change) => {
+  if (change.op === 'insert') return list.some((item) => item.id === change.id) ? list : [change.data, ...list]
+  if (change.op === 'update') return list.map((item) => (item.id === change.id ? { ...item, ...change.data } : item))
+  return list.filter((item) => item.id !== change.id)
 }
 
 export default api